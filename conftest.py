@@ -0,0 +1,98 @@
+"""
+Shared pytest fixtures for the OC Lettings Site project.
+
+Fixtures defined here apply to the tests of every application.
+"""
+import pytest
+from django.contrib.auth.models import User
+
+from lettings.models import Address, Letting
+from oc_lettings_site import log_aggregation
+from profiles.models import Profile
+
+# Number of lettings and of profiles of the test catalogue
+CATALOGUE_SIZE = 3
+
+
+def create_catalogue(size=CATALOGUE_SIZE):
+    """
+    Create lettings with IDs 1 to ``size`` and as many profiles.
+
+    Letting ``i`` is titled ``Letting i`` at ``i Street i``, and profile
+    ``i`` belongs to ``user{i}`` with ``City i`` as favorite city.
+
+    Args:
+        size (int): Number of lettings and of profiles.
+    """
+    for i in range(1, size + 1):
+        address = Address.objects.create(
+            number=i, street=f'Street {i}', city='Test City',
+            state='TS', zip_code=10000 + i, country_iso_code='TST'
+        )
+        Letting.objects.create(id=i, title=f'Letting {i}', address=address)
+        user = User.objects.create_user(username=f'user{i}', email=f'user{i}@example.com')
+        Profile.objects.create(user=user, favorite_city=f'City {i}')
+
+
+@pytest.fixture
+def catalogue(db):
+    """Create the test catalogue in the test transaction."""
+    create_catalogue()
+
+
+@pytest.fixture
+def live_catalogue(transactional_db):
+    """Create the test catalogue, committed for servers and other threads."""
+    create_catalogue()
+
+
+@pytest.fixture
+def shared_cache_dir(tmp_path_factory):
+    """Return an empty directory for the shared caches of a test."""
+    return tmp_path_factory.mktemp('shared_cache')
+
+
+@pytest.fixture(autouse=True)
+def isolated_shared_cache(settings, shared_cache_dir):
+    """
+    Point the shared caches to an empty directory for each test.
+
+    Generation markers, rate limit buckets and cached sitemaps written by a
+    test are then read neither by another test, nor by a later run, nor by
+    a server of the same host.
+    """
+    settings.CACHES = {
+        **settings.CACHES,
+        'shared': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': str(shared_cache_dir),
+        },
+        'generations': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': str(shared_cache_dir / 'generations'),
+            'TIMEOUT': None,
+        },
+        'rate_limit': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': str(shared_cache_dir / 'rate_limit'),
+        },
+    }
+
+
+@pytest.fixture(autouse=True)
+def membership_built_in_request(settings):
+    """Build the membership indexes in the test thread, which sees its transaction."""
+    settings.MEMBERSHIP_BACKGROUND_BUILD = False
+
+
+@pytest.fixture(autouse=True)
+def query_budgets_enforced(settings):
+    """Fail the requests over their query budget, whatever DEBUG is."""
+    settings.QUERY_BUDGET = {**settings.QUERY_BUDGET, 'RAISE': True}
+
+
+@pytest.fixture(autouse=True, scope='session')
+def aggregated_warnings_reported():
+    """Report the warnings suppressed by the tests while the output is captured."""
+    yield
+    log_aggregation.flush_all()
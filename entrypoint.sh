@@ -17,5 +17,16 @@ python load_fixtures.py
 echo "Collecting static files..."
 python manage.py collectstatic --noinput --clear
 
+if [ "$STATIC_EXPORT_SERVE" = "True" ]; then
+    echo "Exporting static pages..."
+    python manage.py export_static
+fi
+
+if [ "$WARM_CACHE" != "False" ]; then
+    echo "Warming caches..."
+    python manage.py warm_cache --top "${WARM_CACHE_TOP:-100}" ${SITE_URL:+--base-url "$SITE_URL"} \
+        || echo "WARNING: cache warming failed, starting anyway"
+fi
+
 echo "Setup complete. Starting server..."
 exec "$@"
@@ -6,14 +6,45 @@ a web-based administrative interface for managing addresses and lettings.
 The admin interface allows authorized users to create, read, update, and
 delete address and letting records through a user-friendly web interface.
 
+Both tables may hold millions of rows, so the admins derive from
+``ScalableModelAdmin``: estimated counts, searches on indexed columns only,
+an autocomplete widget instead of a ``<select>`` of every address, and
+deletions of the selected rows in batches (see ``lettings.bulk``).
+
 Registered Models:
     Address: For managing property addresses
     Letting: For managing rental property listings
 """
 from django.contrib import admin
 
+from oc_lettings_site.admin_tools import ScalableModelAdmin
+from .bulk import delete_addresses, delete_lettings
 from .models import Address, Letting
 
-# Register models with Django admin
-admin.site.register(Address)
-admin.site.register(Letting)
+
+@admin.register(Address)
+class AddressAdmin(ScalableModelAdmin):
+    """Admin of the addresses, searchable by ID, ZIP code or city."""
+
+    list_display = ('id', 'number', 'street', 'city', 'state', 'zip_code')
+    search_fields = ('id', 'zip_code', 'city')
+    sortable_by = ('id', 'updated_at')
+    bulk_delete_note = 'Their lettings will be deleted too.'
+
+    def bulk_delete(self, queryset):
+        return delete_addresses(queryset)
+
+
+@admin.register(Letting)
+class LettingAdmin(ScalableModelAdmin):
+    """Admin of the lettings, with their address fetched in the same query."""
+
+    list_display = ('id', 'title', 'address', 'updated_at')
+    list_select_related = ('address',)
+    search_fields = ('id', 'address__zip_code', 'address__city')
+    sortable_by = ('id', 'updated_at')
+    autocomplete_fields = ('address',)
+    bulk_delete_note = 'Their addresses will be deleted too.'
+
+    def bulk_delete(self, queryset):
+        return delete_lettings(queryset)
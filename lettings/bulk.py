@@ -0,0 +1,161 @@
+"""
+Memory-bounded bulk deletion of lettings and addresses.
+
+``QuerySet.delete()`` loads every object and its cascades into memory and
+deletes them one by one with signals, which does not scale to thousands of
+lettings. These functions instead walk the primary keys in batches, and
+delete each batch with plain ``DELETE ... WHERE id IN`` statements in its
+own transaction, so memory and lock durations stay bounded whatever the
+number of rows.
+
+- Deleting addresses deletes their lettings first (``on_delete=CASCADE``).
+- Deleting lettings also deletes their addresses, which no other letting
+  can use (``OneToOneField``), unless asked not to.
+- ``delete_orphan_addresses`` reclaims the addresses left without letting.
+
+No signal is sent: the letting counter is updated in each batch
+transaction, and the membership index is rebuilt once at the end instead
+of reacting to every row.
+
+Functions:
+    delete_lettings: Delete lettings, and their addresses
+    delete_addresses: Delete addresses and their lettings
+    delete_orphan_addresses: Delete the addresses left without letting
+"""
+import logging
+
+from django.db import connections, transaction
+
+from oc_lettings_site import counters
+from .membership import letting_ids
+from .models import Address, Letting
+
+# Configure logger for this module
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 500
+
+
+def _delete_ids(cursor, connection, model, column, ids):
+    """Delete the rows of a model whose column value is in ``ids``."""
+    if not ids:
+        return 0
+    quote = connection.ops.quote_name
+    placeholders = ', '.join(['%s'] * len(ids))
+    cursor.execute(
+        f'DELETE FROM {quote(model._meta.db_table)} '
+        f'WHERE {quote(model._meta.get_field(column).column)} IN ({placeholders})',
+        list(ids),
+    )
+    return cursor.rowcount
+
+
+def _batches(queryset, fields, batch_size):
+    """
+    Yield the rows of a queryset in batches, in primary key order.
+
+    Each batch is read with a keyset query (``id > last id``), so rows
+    deleted by earlier batches are never skipped nor read again.
+    """
+    last = None
+    while True:
+        page = queryset.order_by('id')
+        if last is not None:
+            page = page.filter(id__gt=last)
+        rows = list(page.values_list('id', *fields)[:batch_size])
+        if not rows:
+            return
+        yield rows
+        last = rows[-1][0]
+
+
+def _run(queryset, fields, delete_batch, batch_size, progress):
+    """Delete a queryset batch by batch, then rebuild the membership index."""
+    using = queryset.db
+    connection = connections[using]
+    # Each ID is a query parameter, limited to 999 by older SQLite versions
+    batch_size = min(batch_size, connection.features.max_query_params or batch_size)
+    counts = {'lettings': 0, 'addresses': 0}
+    for rows in _batches(queryset, fields, batch_size):
+        with transaction.atomic(using=using), connection.cursor() as cursor:
+            deleted = delete_batch(cursor, connection, rows)
+            counters.add(Letting, -deleted.get('lettings', 0), using=using)
+        for name, count in deleted.items():
+            counts[name] += count
+        if progress is not None:
+            progress(counts)
+    letting_ids.invalidate(using)
+    logger.info("Bulk deleted %d letting(s) and %d address(es)",
+                counts['lettings'], counts['addresses'])
+    return counts
+
+
+def delete_lettings(queryset, batch_size=DEFAULT_BATCH_SIZE, delete_addresses=True,
+                    progress=None):
+    """
+    Delete lettings in batches, and their addresses.
+
+    Args:
+        queryset (QuerySet): Lettings to delete.
+        batch_size (int): Lettings deleted per transaction.
+        delete_addresses (bool): Also delete the addresses of the lettings.
+        progress (callable): Called with the counts after each batch.
+
+    Returns:
+        dict: Number of ``lettings`` and ``addresses`` deleted.
+    """
+    def delete_batch(cursor, connection, rows):
+        return {
+            'lettings': _delete_ids(cursor, connection, Letting, 'id',
+                                    [row[0] for row in rows]),
+            'addresses': _delete_ids(cursor, connection, Address, 'id',
+                                     [row[1] for row in rows]) if delete_addresses else 0,
+        }
+
+    return _run(queryset, ['address_id'], delete_batch, batch_size, progress)
+
+
+def delete_addresses(queryset, batch_size=DEFAULT_BATCH_SIZE, progress=None):
+    """
+    Delete addresses in batches, and their lettings.
+
+    Args:
+        queryset (QuerySet): Addresses to delete.
+        batch_size (int): Addresses deleted per transaction.
+        progress (callable): Called with the counts after each batch.
+
+    Returns:
+        dict: Number of ``lettings`` and ``addresses`` deleted.
+    """
+    def delete_batch(cursor, connection, rows):
+        ids = [row[0] for row in rows]
+        # Lettings first, as they reference the addresses
+        return {
+            'lettings': _delete_ids(cursor, connection, Letting, 'address', ids),
+            'addresses': _delete_ids(cursor, connection, Address, 'id', ids),
+        }
+
+    return _run(queryset, [], delete_batch, batch_size, progress)
+
+
+def delete_orphan_addresses(queryset, batch_size=DEFAULT_BATCH_SIZE, progress=None):
+    """
+    Delete the addresses of a queryset that no letting uses.
+
+    Args:
+        queryset (QuerySet): Addresses to consider, such as all of them.
+        batch_size (int): Addresses deleted per transaction.
+        progress (callable): Called with the counts after each batch.
+
+    Returns:
+        dict: Number of ``lettings`` (0) and ``addresses`` deleted.
+    """
+    orphans = queryset.filter(letting__isnull=True)
+
+    def delete_batch(cursor, connection, rows):
+        # Skip the addresses given a letting since the batch was read
+        ids = list(orphans.filter(id__in=[row[0] for row in rows])
+                   .values_list('id', flat=True))
+        return {'addresses': _delete_ids(cursor, connection, Address, 'id', ids)}
+
+    return _run(orphans, [], delete_batch, batch_size, progress)
@@ -0,0 +1,18 @@
+"""
+Membership index of the existing letting IDs.
+
+The letting detail view consults ``letting_ids`` before querying the
+database, so requests for unknown IDs are answered 404 without any query.
+See ``oc_lettings_site.membership`` for the invalidation rules.
+"""
+from oc_lettings_site.membership import IdBitmap, MembershipIndex
+
+from .models import Letting
+
+
+def _letting_ids():
+    """Return an iterator over the existing letting IDs."""
+    return Letting.objects.values_list('id', flat=True).iterator()
+
+
+letting_ids = MembershipIndex('lettings.letting', _letting_ids, IdBitmap)
@@ -0,0 +1,56 @@
+# Generated by Django 4.2.30 on 2026-10-19 14:02
+
+import django.core.validators
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+import oc_lettings_site.fields
+
+
+class Migration(migrations.Migration):
+    """Créer directement le schéma final sur une base neuve"""
+
+    # Les bases existantes gardent les migrations remplacées : le transfert
+    # depuis oc_lettings_site n'a rien à copier sur une base neuve
+    replaces = [
+        ('lettings', '0001_initial'),
+        ('lettings', '0002_transfer_data'),
+        ('lettings', '0003_updated_at'),
+        ('lettings', '0004_search_indexes'),
+    ]
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Address',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('number', models.PositiveIntegerField(validators=[django.core.validators.MaxValueValidator(9999)])),
+                ('street', models.CharField(max_length=64)),
+                ('city', models.CharField(db_index=True, max_length=64)),
+                ('state', models.CharField(max_length=2, validators=[django.core.validators.MinLengthValidator(2)])),
+                ('zip_code', models.PositiveIntegerField(db_index=True, validators=[django.core.validators.MaxValueValidator(99999)])),
+                ('country_iso_code', models.CharField(max_length=3, validators=[django.core.validators.MinLengthValidator(3)])),
+                ('updated_at', oc_lettings_site.fields.ModificationDateTimeField(db_index=True, default=django.utils.timezone.now, editable=False)),
+            ],
+            options={
+                'verbose_name_plural': 'addresses',
+            },
+        ),
+        migrations.CreateModel(
+            name='Letting',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('title', models.CharField(max_length=256)),
+                ('address', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, to='lettings.address')),
+                ('updated_at', oc_lettings_site.fields.ModificationDateTimeField(db_index=True, default=django.utils.timezone.now, editable=False)),
+            ],
+            options={
+                'verbose_name_plural': 'lettings',
+            },
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 4.2.30 on 2026-10-19 11:15
+
+from django.db import migrations
+import django.utils.timezone
+import oc_lettings_site.fields
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lettings', '0002_transfer_data'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='address',
+            options={'verbose_name_plural': 'addresses'},
+        ),
+        migrations.AlterModelOptions(
+            name='letting',
+            options={'verbose_name_plural': 'lettings'},
+        ),
+        migrations.AddField(
+            model_name='address',
+            name='updated_at',
+            field=oc_lettings_site.fields.ModificationDateTimeField(db_index=True, default=django.utils.timezone.now, editable=False),
+        ),
+        migrations.AddField(
+            model_name='letting',
+            name='updated_at',
+            field=oc_lettings_site.fields.ModificationDateTimeField(db_index=True, default=django.utils.timezone.now, editable=False),
+        ),
+    ]
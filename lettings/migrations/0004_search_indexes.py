@@ -0,0 +1,24 @@
+# Generated by Django 4.2.30 on 2026-10-19 11:38
+
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lettings', '0003_updated_at'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='address',
+            name='city',
+            field=models.CharField(db_index=True, max_length=64),
+        ),
+        migrations.AlterField(
+            model_name='address',
+            name='zip_code',
+            field=models.PositiveIntegerField(db_index=True, validators=[django.core.validators.MaxValueValidator(99999)]),
+        ),
+    ]
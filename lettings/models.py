@@ -12,6 +12,9 @@ Models:
 from django.db import models
 from django.core.validators import MaxValueValidator, MinLengthValidator
 
+from oc_lettings_site.fields import ModificationDateTimeField
+from oc_lettings_site.models import CountedModel
+
 
 class Address(models.Model):
     """
@@ -23,17 +26,21 @@ class Address(models.Model):
     Attributes:
         number (PositiveIntegerField): Street number (1-9999)
         street (CharField): Street name (max 64 characters)
-        city (CharField): City name (max 64 characters)
+        city (CharField): City name (max 64 characters, indexed)
         state (CharField): State code (exactly 2 characters)
-        zip_code (PositiveIntegerField): ZIP code (1-99999)
+        zip_code (PositiveIntegerField): ZIP code (1-99999, indexed)
         country_iso_code (CharField): ISO country code (exactly 3 characters)
+        updated_at (ModificationDateTimeField): Date of the last change
     """
     number = models.PositiveIntegerField(validators=[MaxValueValidator(9999)])
     street = models.CharField(max_length=64)
-    city = models.CharField(max_length=64)
+    city = models.CharField(max_length=64, db_index=True)
     state = models.CharField(max_length=2, validators=[MinLengthValidator(2)])
-    zip_code = models.PositiveIntegerField(validators=[MaxValueValidator(99999)])
+    zip_code = models.PositiveIntegerField(
+        validators=[MaxValueValidator(99999)], db_index=True
+    )
     country_iso_code = models.CharField(max_length=3, validators=[MinLengthValidator(3)])
+    updated_at = ModificationDateTimeField()
 
     class Meta:
         """Meta configuration for Address model."""
@@ -49,7 +56,7 @@ class Address(models.Model):
         return f'{self.number} {self.street}'
 
 
-class Letting(models.Model):
+class Letting(CountedModel):
     """
     Model representing a property letting.
 
@@ -60,9 +67,11 @@ class Letting(models.Model):
     Attributes:
         title (CharField): Descriptive title for the letting (max 256 characters)
         address (OneToOneField): Reference to the associated Address object
+        updated_at (ModificationDateTimeField): Date of the last change
     """
     title = models.CharField(max_length=256)
     address = models.OneToOneField(Address, on_delete=models.CASCADE)
+    updated_at = ModificationDateTimeField()
 
     class Meta:
         """Meta configuration for Letting model."""
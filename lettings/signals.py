@@ -0,0 +1,45 @@
+"""
+Signal handlers for the lettings application.
+
+Functions:
+    letting_saved: Record a saved letting in the membership index and counter
+    letting_deleted: Count a deleted letting out
+"""
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from oc_lettings_site import counters
+from .membership import letting_ids
+from .models import Letting
+
+
+@receiver(post_save, sender=Letting)
+def letting_saved(sender, instance, created, using, **kwargs):
+    """
+    Record a saved letting in the membership index, and count it if new.
+
+    Deleted lettings are left in the index: a false positive only costs
+    the query the index was meant to avoid.
+
+    Args:
+        sender (type): The Letting model.
+        instance (Letting): The saved letting.
+        created (bool): Whether the letting was just inserted.
+        using (str): Database alias used for the save.
+    """
+    letting_ids.add(instance.id, using=using)
+    if created:
+        counters.add(sender, 1, using=using)
+
+
+@receiver(post_delete, sender=Letting)
+def letting_deleted(sender, instance, using, **kwargs):
+    """
+    Count a deleted letting out, in the transaction of the deletion.
+
+    Args:
+        sender (type): The Letting model.
+        instance (Letting): The deleted letting.
+        using (str): Database alias used for the deletion.
+    """
+    counters.add(sender, -1, using=using)
@@ -0,0 +1,117 @@
+"""
+Tests for the lettings admin.
+
+This module checks that the admin pages of addresses and lettings run a
+bounded number of queries, never list every address in a form, and
+delete the selected rows in batches.
+"""
+import pytest
+from django.contrib.auth.models import User
+from django.urls import reverse
+
+from lettings.models import Address, Letting
+
+
+@pytest.fixture
+def admin_client(db, client):
+    """Return a client logged in as a superuser."""
+    client.force_login(User.objects.create_superuser('admin', password=None))
+    return client
+
+
+@pytest.fixture
+def lettings(db):
+    """Create ten lettings with their addresses."""
+    return [
+        Letting.objects.create(
+            title=f'Letting {i}',
+            address=Address.objects.create(
+                number=i + 1, street='Main Street', city='Austin', state='TX',
+                zip_code=73301, country_iso_code='USA'
+            ),
+        )
+        for i in range(10)
+    ]
+
+
+class TestLettingsAdmin:
+    """Test cases for the address and letting admins."""
+
+    def test_letting_changelist(self, admin_client, lettings, django_assert_max_num_queries):
+        """Test that the addresses are fetched with the lettings."""
+        with django_assert_max_num_queries(5):
+            response = admin_client.get(reverse('admin:lettings_letting_changelist'))
+
+        assert response.status_code == 200
+        assert b'Letting 9' in response.content
+
+    def test_address_changelist_search(self, admin_client, lettings):
+        """Test the search of addresses by ZIP code."""
+        response = admin_client.get(reverse('admin:lettings_address_changelist'),
+                                    {'q': '73301'})
+
+        assert response.status_code == 200
+        assert response.context['cl'].result_count == 10
+
+    def test_letting_form_autocomplete(self, admin_client, lettings):
+        """Test that the letting form does not list every address."""
+        url = reverse('admin:lettings_letting_change', args=[lettings[0].id])
+
+        content = admin_client.get(url).content.decode()
+
+        assert 'admin-autocomplete' in content
+        assert '10 Main Street' not in content
+
+    def test_address_autocomplete(self, admin_client, lettings):
+        """Test the autocomplete search of the addresses."""
+        response = admin_client.get(reverse('admin:autocomplete'), {
+            'app_label': 'lettings', 'model_name': 'letting',
+            'field_name': 'address', 'term': 'Austin',
+        })
+
+        assert response.status_code == 200
+        assert len(response.json()['results']) == 10
+
+    def test_bulk_delete_replaces_delete_selected(self, admin_client, lettings):
+        """Test that the default delete action is replaced by the batched one."""
+        response = admin_client.get(reverse('admin:lettings_letting_changelist'))
+
+        actions = [name for name, _ in response.context['action_form'].fields['action'].choices]
+        assert 'bulk_delete_selected' in actions
+        assert 'delete_selected' not in actions
+
+    def test_bulk_delete_confirmation(self, admin_client, lettings):
+        """Test that the confirmation page counts the selection without listing it."""
+        response = admin_client.post(reverse('admin:lettings_letting_changelist'), {
+            'action': 'bulk_delete_selected',
+            '_selected_action': [lettings[0].id, lettings[1].id],
+        })
+
+        content = response.content.decode()
+        assert 'delete the 2 selected lettings' in content
+        assert 'Letting 0' not in content
+        assert Letting.objects.count() == 10
+
+    def test_bulk_delete_lettings(self, admin_client, lettings):
+        """Test that confirmed lettings are deleted with their addresses."""
+        response = admin_client.post(reverse('admin:lettings_letting_changelist'), {
+            'action': 'bulk_delete_selected',
+            '_selected_action': [lettings[0].id, lettings[1].id],
+            'post': 'yes',
+        }, follow=True)
+
+        assert 'Deleted 2 lettings, 2 addresses.' in response.content.decode()
+        assert Letting.objects.count() == 8
+        assert Address.objects.count() == 8
+
+    def test_bulk_delete_addresses_across(self, admin_client, lettings):
+        """Test the deletion of every address matching a search."""
+        admin_client.post(reverse('admin:lettings_address_changelist') + '?q=Austin', {
+            'action': 'bulk_delete_selected',
+            '_selected_action': [lettings[0].address_id],
+            'select_across': '1',
+            'post': 'yes',
+        })
+
+        assert not Address.objects.exists()
+        assert not Letting.objects.exists()
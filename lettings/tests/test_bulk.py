@@ -0,0 +1,167 @@
+"""
+Tests for the bulk deletion of lettings and addresses.
+
+This module checks the batched deletions, the reclaiming of orphaned
+addresses, the membership index kept consistent and the bulk_delete
+management command.
+"""
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db.models.signals import post_delete, pre_delete
+
+from lettings import bulk
+from lettings.membership import letting_ids
+from lettings.models import Address, Letting
+
+
+def make_address(number, city='Austin'):
+    """Create an address in a city."""
+    return Address.objects.create(
+        number=number, street='Main Street', city=city, state='TX',
+        zip_code=73301, country_iso_code='USA'
+    )
+
+
+@pytest.fixture
+def lettings(db):
+    """Create ten lettings, half of them in Dallas."""
+    return [
+        Letting.objects.create(title=f'Letting {i}',
+                               address=make_address(i + 1, 'Dallas' if i % 2 else 'Austin'))
+        for i in range(10)
+    ]
+
+
+class TestBulkDelete:
+    """Test cases for the bulk deletion functions."""
+
+    def test_delete_lettings(self, lettings, django_assert_max_num_queries):
+        """Test that lettings and their addresses are deleted in batches."""
+        kept = make_address(99)
+
+        with django_assert_max_num_queries(20):
+            counts = bulk.delete_lettings(Letting.objects.filter(address__city='Austin'),
+                                          batch_size=2)
+
+        assert counts == {'lettings': 5, 'addresses': 5}
+        assert set(Letting.objects.values_list('title', flat=True)) == {
+            f'Letting {i}' for i in range(1, 10, 2)
+        }
+        assert Address.objects.count() == 6
+        assert Address.objects.filter(id=kept.id).exists()
+
+    def test_delete_lettings_keep_addresses(self, lettings):
+        """Test that the addresses may be kept."""
+        counts = bulk.delete_lettings(Letting.objects.all(), delete_addresses=False)
+
+        assert counts == {'lettings': 10, 'addresses': 0}
+        assert Address.objects.count() == 10
+
+    def test_delete_addresses(self, lettings):
+        """Test that deleting addresses deletes their lettings."""
+        counts = bulk.delete_addresses(Address.objects.filter(city='Dallas'), batch_size=3)
+
+        assert counts == {'lettings': 5, 'addresses': 5}
+        assert not Letting.objects.filter(address__city='Dallas').exists()
+        assert Letting.objects.count() == 5
+
+    def test_delete_orphan_addresses(self, lettings):
+        """Test that only the addresses without letting are deleted."""
+        orphans = [make_address(100 + i) for i in range(3)]
+
+        counts = bulk.delete_orphan_addresses(Address.objects.all(), batch_size=2)
+
+        assert counts == {'lettings': 0, 'addresses': 3}
+        assert not Address.objects.filter(id__in=[a.id for a in orphans]).exists()
+        assert Address.objects.count() == 10
+
+    def test_no_signals(self, lettings):
+        """Test that no deletion signal is sent per row."""
+        received = []
+
+        def receiver(**kwargs):
+            received.append(kwargs['instance'])
+
+        pre_delete.connect(receiver)
+        post_delete.connect(receiver)
+        try:
+            bulk.delete_lettings(Letting.objects.all())
+        finally:
+            pre_delete.disconnect(receiver)
+            post_delete.disconnect(receiver)
+
+        assert received == []
+
+    def test_membership_index_invalidated(self, lettings):
+        """Test that deleted lettings leave the membership index."""
+        assert letting_ids.might_contain(lettings[0].id)
+
+        bulk.delete_lettings(Letting.objects.filter(id=lettings[0].id))
+
+        assert not letting_ids.might_contain(lettings[0].id)
+        assert letting_ids.might_contain(lettings[1].id)
+
+    def test_nothing_to_delete(self, db):
+        """Test an empty queryset."""
+        assert bulk.delete_lettings(Letting.objects.all()) == {'lettings': 0, 'addresses': 0}
+
+
+@pytest.mark.django_db
+class TestBulkDeleteCommand:
+    """Test cases for the bulk_delete management command."""
+
+    def test_delete_lettings_by_id(self, lettings, capsys):
+        """Test the deletion of lettings by ID."""
+        call_command('bulk_delete', 'lettings', ids=[lettings[0].id, lettings[1].id])
+
+        assert Letting.objects.count() == 8
+        assert Address.objects.count() == 8
+        assert 'Deleted 2 lettings and 2 addresses' in capsys.readouterr().out
+
+    def test_delete_addresses_by_filter(self, lettings):
+        """Test the deletion of addresses matching a filter."""
+        call_command('bulk_delete', 'addresses', filter=['city=Dallas'], batch_size=2)
+
+        assert not Address.objects.filter(city='Dallas').exists()
+        assert Letting.objects.count() == 5
+
+    def test_delete_all_keep_addresses(self, lettings):
+        """Test the deletion of every letting, keeping the addresses."""
+        call_command('bulk_delete', 'lettings', '--all', '--keep-addresses')
+
+        assert not Letting.objects.exists()
+        assert Address.objects.count() == 10
+
+    def test_orphans(self, lettings):
+        """Test the deletion of the orphaned addresses."""
+        make_address(100)
+
+        call_command('bulk_delete', 'addresses', '--orphans')
+
+        assert Address.objects.count() == 10
+        assert Letting.objects.count() == 10
+
+    def test_dry_run(self, lettings, capsys):
+        """Test that a dry run only counts the rows."""
+        make_address(100)
+
+        call_command('bulk_delete', 'addresses', '--orphans', '--dry-run')
+
+        assert '1 addresses would be deleted' in capsys.readouterr().out
+        assert Address.objects.count() == 11
+
+    @pytest.mark.parametrize('args, message', [
+        (['lettings'], 'Give --ids'),
+        (['lettings', '--orphans'], 'only applies to addresses'),
+        (['lettings', '--filter', 'city'], 'expected FIELD=VALUE'),
+        (['lettings', '--filter', 'nope=1'], 'Invalid filter'),
+        (['addresses', '--filter', 'zip_code=abc'], 'Invalid filter'),
+        (['lettings', '--all', '--batch-size', '0'], 'at least 1'),
+    ])
+    def test_invalid_options(self, lettings, args, message):
+        """Test that invalid options are rejected before any deletion."""
+        with pytest.raises(CommandError, match=message):
+            call_command('bulk_delete', *args)
+
+        assert Letting.objects.count() == 10
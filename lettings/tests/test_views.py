@@ -55,8 +55,9 @@ class TestLettingsViews:
         assert response.status_code == 200
         assert 'lettings_list' in response.context
         assert len(response.context['lettings_list']) == 2
-        assert letting1 in response.context['lettings_list']
-        assert letting2 in response.context['lettings_list']
+        assert (letting1.id, 'First Property') in response.context['lettings_list']
+        assert (letting2.id, 'Second Property') in response.context['lettings_list']
+        assert response.context['lettings_list'][0].title == 'First Property'
         assert 'First Property' in response.content.decode()
         assert 'Second Property' in response.content.decode()
 
@@ -105,3 +106,22 @@ class TestLettingsViews:
         assert response.status_code == 200
         assert 'lettings_list' in response.context
         assert len(response.context['lettings_list']) == 0
+
+    @pytest.mark.django_db
+    def test_unknown_letting_answered_without_query(self, client, django_assert_num_queries):
+        """Test that the membership index answers 404 for unknown IDs."""
+        address = Address.objects.create(
+            number=1, street='Known Street', city='Test City',
+            state='TS', zip_code=12345, country_iso_code='TST'
+        )
+        letting = Letting.objects.create(title='Known', address=address)
+        # Build the index before counting the queries
+        client.get(reverse('lettings:letting', kwargs={'letting_id': 10 ** 6}))
+
+        with django_assert_num_queries(0):
+            response = client.get(reverse('lettings:letting',
+                                          kwargs={'letting_id': 10 ** 6 + 1}))
+
+        assert response.status_code == 404
+        assert client.get(reverse('lettings:letting',
+                                  kwargs={'letting_id': letting.id})).status_code == 200
@@ -10,14 +10,21 @@ Functions:
     letting: Display detailed information for a specific letting
 """
 import logging
+from django.conf import settings
 from django.shortcuts import render, get_object_or_404
 from django.http import Http404
+from oc_lettings_site import counters
+from oc_lettings_site.query_budget import query_budget
+from oc_lettings_site.streaming import stream_list
+from .membership import letting_ids
 from .models import Letting
 
 # Configure logger for this module
 logger = logging.getLogger(__name__)
 
 
+# Counter and rows, plus a count while the counter is missing
+@query_budget(3)
 def index(request):
     """
     Display a list of all available lettings.
@@ -32,8 +39,10 @@ def index(request):
 
     Returns:
         HttpResponse: Rendered HTML response displaying the lettings list.
-                     Includes context with 'lettings_list' containing all
-                     Letting objects ordered by default model ordering.
+                     Includes context with 'lettings_list' containing an
+                     ``(id, title)`` named tuple per letting.
+                     Streamed, head first, when ``STREAMING_RENDER`` is
+                     enabled.
                      Status code 200 (OK) on success.
     """
     try:
@@ -42,8 +51,16 @@ def index(request):
         user_agent = request.META.get('HTTP_USER_AGENT', 'unknown')
         logger.info(f"Lettings index accessed from IP: {client_ip}, User-Agent: {user_agent}")
 
-        lettings_list = Letting.objects.all()
-        lettings_count = lettings_list.count()
+        # Named tuples of the listed columns: no model instance per row
+        lettings_list = Letting.objects.values_list('id', 'title', named=True)
+        # Head sent at once, rows read and rendered chunk by chunk
+        if settings.STREAMING_RENDER:
+            logger.info("Lettings index page streamed")
+            return stream_list(request, 'lettings/index.html', 'lettings_list', lettings_list,
+                               'lettings/index_rows.html')
+
+        # Read from the maintained counter instead of counting the table
+        lettings_count = counters.value(Letting)
 
         # Log the number of lettings returned
         logger.debug(f"Retrieved {lettings_count} lettings for index page")
@@ -60,6 +77,8 @@ def index(request):
         raise
 
 
+# One query, plus one when the membership index is built in the request
+@query_budget(2)
 def letting(request, letting_id):
     """
     Display detailed information for a specific letting.
@@ -87,8 +106,12 @@ def letting(request, letting_id):
         client_ip = request.META.get('REMOTE_ADDR', 'unknown')
         logger.info(f"Letting detail accessed: ID={letting_id}, IP={client_ip}")
 
+        # Unknown IDs are answered without querying the database
+        if not letting_ids.might_contain(letting_id):
+            raise Http404(f"No letting with ID={letting_id}")
+
         # Attempt to get the letting - this may raise Http404
-        letting = get_object_or_404(Letting, id=letting_id)
+        letting = get_object_or_404(Letting.objects.select_related('address'), id=letting_id)
 
         # Log successful retrieval with letting details
         logger.info(f"Letting found: ID={letting_id}, Title='{letting.title}', "
@@ -105,7 +128,7 @@ def letting(request, letting_id):
 
     except Http404:
         # Log 404 errors with relevant information
-        logger.warning(f"Letting not found: ID={letting_id}, IP={client_ip}")
+        logger.warning("Letting not found: ID=%s, IP=%s", letting_id, client_ip)
         raise
 
     except Exception as e:
@@ -2,6 +2,10 @@
 """
 Script to load existing data fixtures for the OC Lettings application.
 Run this after migrations to populate the database with production data.
+
+A streamed NDJSON dump (fixtures.ndjson, optionally .gz or .xz, produced by
+``manage.py dumpdata_ndjson``) is preferred over fixtures.json when present,
+as it is loaded in batches without reading the whole file in memory.
 """
 import os
 import sys
@@ -16,8 +20,31 @@ from django.core.management import call_command  # noqa: E402
 from django.contrib.auth.models import User  # noqa: E402
 
 
+NDJSON_FIXTURES = ('fixtures.ndjson', 'fixtures.ndjson.gz', 'fixtures.ndjson.xz')
+
+
+def find_ndjson_fixtures():
+    """Return the path of the first NDJSON dump found next to this script."""
+    for name in NDJSON_FIXTURES:
+        path = Path(__file__).parent / name
+        if path.exists():
+            return path
+    return None
+
+
 def load_fixtures():
-    """Load data from fixtures.json if it exists."""
+    """Load data from a streamed NDJSON dump or from fixtures.json if it exists."""
+    ndjson_path = find_ndjson_fixtures()
+    if ndjson_path is not None:
+        print(f"📦 Streaming existing data from {ndjson_path.name}...")
+        try:
+            call_command('loaddata_ndjson', str(ndjson_path), verbosity=2)
+            print(f"Total users: {User.objects.count()}")
+        except Exception as e:
+            print(f"Error loading fixtures: {e}")
+            sys.exit(1)
+        return
+
     fixtures_path = Path(__file__).parent / 'fixtures.json'
 
     if not fixtures_path.exists():
@@ -0,0 +1,211 @@
+"""
+Admin helpers keeping the changelists fast on tables of millions of rows.
+
+A default changelist runs ``COUNT(*)`` twice (filtered and total), sorts
+and searches on any column, and the change forms render a ``<select>`` of
+every related row. ``ScalableModelAdmin`` avoids all of these:
+
+- ``EstimatedCountPaginator`` reads the size of unfiltered tables from
+  their maintained counter (``oc_lettings_site.counters``) or, for large
+  tables without one, from the database statistics instead of counting
+  them, and the total count is never shown.
+- Searches only use the lookups listed in ``search_fields`` (exact or
+  prefix lookups on indexed columns), each in its own indexed subquery,
+  and skip the fields a search term cannot match, such as an ID for a
+  word.
+- Lists are sorted on indexed columns only, with a small page size.
+- When the admin defines ``bulk_delete``, the "delete selected" action,
+  which loads every selected object and its cascades, is replaced by one
+  deleting in batches of SQL statements.
+
+Functions:
+    estimate_count: Row count of a table from the database statistics
+
+Classes:
+    EstimatedCountPaginator: Paginator estimating the count of large tables
+    ScalableModelAdmin: ModelAdmin defaults for large tables
+"""
+import logging
+
+from django.contrib import admin, messages
+from django.contrib.admin.helpers import ACTION_CHECKBOX_NAME
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Max, Q
+from django.db.models.constants import LOOKUP_SEP
+from django.template.response import TemplateResponse
+from django.utils.functional import cached_property
+from django.utils.text import smart_split, unescape_string_literal
+
+from oc_lettings_site import counters
+
+# Configure logger for this module
+logger = logging.getLogger(__name__)
+
+# Tables with fewer rows than this are counted exactly
+ESTIMATE_THRESHOLD = 100000
+
+
+def estimate_count(queryset):
+    """
+    Return the approximate row count of an unfiltered queryset.
+
+    PostgreSQL and MySQL keep an estimate of the row count of every table.
+    SQLite has none, so the largest integer primary key is used: it is read
+    from the index and only overestimates after deletions.
+
+    Args:
+        queryset (QuerySet): The queryset to count.
+
+    Returns:
+        int: The estimate, or None if the queryset is filtered or no
+             estimate is available.
+    """
+    if queryset.query.where or queryset.query.is_sliced:
+        return None
+    model = queryset.model
+    connection = connections[queryset.db]
+    table = model._meta.db_table
+    if connection.vendor == 'postgresql':
+        sql = 'SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass'
+    elif connection.vendor == 'mysql':
+        sql = ('SELECT table_rows FROM information_schema.tables '
+               'WHERE table_schema = DATABASE() AND table_name = %s')
+    elif model._meta.pk.get_internal_type() in ('AutoField', 'BigAutoField', 'IntegerField'):
+        return model._default_manager.using(queryset.db).aggregate(last=Max('pk'))['last'] or 0
+    else:
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [table])
+        row = cursor.fetchone()
+    # PostgreSQL answers -1 for tables never analyzed
+    return row[0] if row and row[0] is not None and row[0] >= 0 else None
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator using a maintained or estimated count for unfiltered tables.
+
+    Filtered querysets (searches) and small tables without counter are
+    counted exactly. With an overestimated count, the last pages may be
+    empty.
+    """
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        unfiltered = not (queryset.query.where or queryset.query.is_sliced)
+        if unfiltered and counters.counter_name(queryset.model) is not None:
+            return counters.value(queryset.model, using=queryset.db)
+        estimate = estimate_count(self.object_list)
+        if estimate is not None and estimate >= ESTIMATE_THRESHOLD:
+            return estimate
+        return super().count
+
+
+def _search_field(model, lookup):
+    """Return the model field a search lookup applies to."""
+    opts, field = model._meta, None
+    for part in lookup.split(LOOKUP_SEP):
+        try:
+            field = opts.pk if part == 'pk' else opts.get_field(part)
+        except FieldDoesNotExist:
+            break
+        if field.is_relation:
+            opts = field.related_model._meta
+    return field
+
+
+class ScalableModelAdmin(admin.ModelAdmin):
+    """
+    ModelAdmin defaults for tables of millions of rows.
+
+    ``search_fields`` must hold complete lookups on indexed columns, such
+    as ``id`` or ``user__username``: the ``^``, ``=`` and ``@`` prefixes
+    and the default ``icontains`` lookup would scan the whole table.
+
+    Subclasses may define ``bulk_delete(queryset)``, deleting a queryset in
+    batches and returning the number of rows deleted by model, and
+    ``bulk_delete_note``, telling which related rows are deleted too.
+    """
+
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    list_per_page = 50
+    list_max_show_all = 200
+    ordering = ('-id',)
+    sortable_by = ('id',)
+    actions = ['bulk_delete_selected']
+    bulk_delete = None
+    bulk_delete_note = ''
+
+    def get_search_results(self, request, queryset, search_term):
+        """
+        Filter the queryset on the search terms, skipping mismatching fields.
+
+        Every term must match one of the ``search_fields`` lookups; a term
+        no field can hold (a word for an ID) does not match that field.
+
+        Returns:
+            tuple: Filtered queryset, and whether it may contain duplicates.
+        """
+        search_fields = self.get_search_fields(request)
+        if not (search_fields and search_term):
+            return queryset, False
+        for bit in smart_split(search_term):
+            if bit.startswith(('"', "'")) and bit[0] == bit[-1]:
+                bit = unescape_string_literal(bit)
+            term_query = Q()
+            for lookup in search_fields:
+                try:
+                    _search_field(self.model, lookup).to_python(bit)
+                except ValidationError:
+                    continue
+                # A subquery per lookup lets each use its index, where an OR
+                # across joined tables would scan
+                matches = self.model._default_manager.filter(**{lookup: bit})
+                term_query |= Q(pk__in=matches.values('pk'))
+            if not term_query:
+                return queryset.none(), False
+            queryset = queryset.filter(term_query)
+        return queryset, False
+
+    def get_actions(self, request):
+        """Offer the batched delete action instead of the default one."""
+        actions = super().get_actions(request)
+        if self.bulk_delete is None:
+            actions.pop('bulk_delete_selected', None)
+        else:
+            actions.pop('delete_selected', None)
+        return actions
+
+    @admin.action(permissions=['delete'],
+                  description='Delete selected %(verbose_name_plural)s in batches')
+    def bulk_delete_selected(self, request, queryset):
+        """
+        Confirm, then delete the selected objects with ``bulk_delete``.
+
+        The confirmation page shows the number of selected objects instead
+        of listing them with their related objects.
+
+        Returns:
+            TemplateResponse: The confirmation page, or None once deleted.
+        """
+        if request.POST.get('post'):
+            counts = self.bulk_delete(queryset)
+            summary = ', '.join(f'{count} {name}' for name, count in counts.items())
+            self.message_user(request, f'Deleted {summary}.', messages.SUCCESS)
+            return None
+        context = {
+            **self.admin_site.each_context(request),
+            'title': 'Are you sure?',
+            'opts': self.model._meta,
+            'count': queryset.count(),
+            'cascade_note': self.bulk_delete_note,
+            'selected': request.POST.getlist(ACTION_CHECKBOX_NAME),
+            'select_across': request.POST.get('select_across', '0'),
+            'action': 'bulk_delete_selected',
+            'action_checkbox_name': ACTION_CHECKBOX_NAME,
+        }
+        return TemplateResponse(request, 'admin/bulk_delete_confirmation.html', context)
@@ -0,0 +1,296 @@
+"""
+Benchmark suite of the site views.
+
+Every URL pattern of ``oc_lettings_site.urls`` (with sampled IDs and
+usernames for the detail pages) and every admin changelist is requested
+through the Django test client against a synthetic catalogue. For each
+case the report gives the latency percentiles, the number of queries and
+the peak memory allocated while handling a request.
+
+Results are plain JSON with the commit they were measured on, so runs can
+be stored and compared across commits (see ``compare``).
+
+Functions:
+    build_cases: Paths requested for every view
+    url_pattern_names: Names of the project URL patterns
+    run_benchmark: Measure every case
+    compare: Relative change of the latencies between two reports
+"""
+import datetime
+import logging
+import platform
+import random
+import statistics
+import subprocess
+import time
+import tracemalloc
+
+import django
+from django.conf import settings
+from django.contrib import admin
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLPattern, URLResolver, get_resolver, reverse
+
+from lettings.models import Letting
+from profiles.models import Profile
+
+# Configure logger for this module
+logger = logging.getLogger(__name__)
+
+BENCH_ADMIN_USERNAME = 'bench-admin'
+
+# Distinct objects requested for each detail view
+SAMPLE_SIZE = 20
+
+
+def percentile(values, fraction):
+    """
+    Return a percentile with linear interpolation between closest ranks.
+
+    Args:
+        values (list): Measured values.
+        fraction (float): Percentile between 0 and 1.
+
+    Returns:
+        float: The percentile, 0 for an empty list.
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * fraction
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def _sample(queryset, field, rng):
+    """Return up to ``SAMPLE_SIZE`` values of a field, spread over the table."""
+    count = queryset.count()
+    if not count:
+        return []
+    offsets = sorted(rng.sample(range(count), min(SAMPLE_SIZE, count)))
+    return [queryset.order_by('pk').values_list(field, flat=True)[offset] for offset in offsets]
+
+
+def build_cases(seed=0):
+    """
+    Return the paths requested for every benchmarked view.
+
+    Args:
+        seed (int): Seed used to sample the detail pages.
+
+    Returns:
+        dict: Lists of paths by case name; admin cases start with ``admin:``.
+    """
+    rng = random.Random(seed)
+    letting_ids = _sample(Letting.objects.all(), 'id', rng)
+    usernames = _sample(Profile.objects.all(), 'user__username', rng)
+    cases = {
+        'index': [reverse('index')],
+        'lettings:index': [reverse('lettings:index')],
+        'lettings:letting': [
+            reverse('lettings:letting', kwargs={'letting_id': i}) for i in letting_ids
+        ],
+        'profiles:index': [reverse('profiles:index')],
+        'profiles:profile': [
+            reverse('profiles:profile', kwargs={'username': u}) for u in usernames
+        ],
+        'sitemap': [reverse('sitemap')],
+        'sitemap-section': [
+            reverse('sitemap-section', kwargs={'section': section, 'number': 0})
+            for section in ('lettings', 'profiles')
+        ],
+        'not-found': [f'/lettings/{10 ** 9 + i}/' for i in range(SAMPLE_SIZE)],
+        'admin:index': [reverse('admin:index')],
+    }
+    for model in admin.site._registry:
+        name = f'admin:{model._meta.app_label}_{model._meta.model_name}_changelist'
+        cases[name] = [reverse(name)]
+    return {name: paths for name, paths in cases.items() if paths}
+
+
+def url_pattern_names():
+    """
+    Return the names of the project URL patterns, outside the admin.
+
+    Returns:
+        list: Pattern names, namespaced like ``lettings:index``.
+    """
+    names = []
+    for pattern in get_resolver().url_patterns:
+        if isinstance(pattern, URLPattern) and pattern.name:
+            names.append(pattern.name)
+        elif isinstance(pattern, URLResolver) and pattern.namespace != 'admin':
+            names.extend(
+                f'{pattern.namespace}:{child.name}' for child in pattern.url_patterns
+                if isinstance(child, URLPattern) and child.name
+            )
+    return names
+
+
+def uncovered_patterns(cases):
+    """
+    Return the named project URL patterns no case requests.
+
+    Args:
+        cases (dict): Cases returned by ``build_cases``.
+
+    Returns:
+        list: Names of the patterns missing from the benchmark.
+    """
+    return [name for name in url_pattern_names() if name not in cases]
+
+
+def fetch(client, path):
+    """
+    Request a page and read its whole body.
+
+    Args:
+        client (Client): Test client used for the request.
+        path (str): Path of the page.
+
+    Returns:
+        int: The status code.
+    """
+    response = client.get(path)
+    # Streamed pages run their queries and render their rows as they are sent
+    if response.streaming:
+        for _ in response.streaming_content:
+            pass
+    return response.status_code
+
+
+def measure(client, paths, iterations):
+    """
+    Measure the requests of one case.
+
+    The paths are requested once first (warming caches), then
+    ``iterations`` times in a round robin. Memory is traced during a
+    separate pass, as tracing slows requests down.
+
+    Args:
+        client (Client): Test client used for the requests.
+        paths (list): Paths of the case.
+        iterations (int): Number of timed requests.
+
+    Returns:
+        dict: Latency percentiles (ms), queries per request, peak memory
+              (KiB) and the status codes returned.
+    """
+    statuses = set()
+    for path in paths:
+        statuses.add(fetch(client, path))
+
+    latencies, queries = [], []
+    for i in range(iterations):
+        path = paths[i % len(paths)]
+        with CaptureQueriesContext(connection) as captured:
+            start = time.perf_counter()
+            fetch(client, path)
+            latencies.append((time.perf_counter() - start) * 1000)
+        queries.append(len(captured))
+
+    peaks = []
+    for path in paths[:5]:
+        tracemalloc.start()
+        fetch(client, path)
+        peaks.append(tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+
+    return {
+        'requests': iterations,
+        'p50_ms': round(percentile(latencies, 0.50), 3),
+        'p95_ms': round(percentile(latencies, 0.95), 3),
+        'p99_ms': round(percentile(latencies, 0.99), 3),
+        'mean_ms': round(statistics.fmean(latencies), 3) if latencies else 0.0,
+        'queries': round(statistics.fmean(queries), 2) if queries else 0.0,
+        'max_queries': max(queries, default=0),
+        'peak_memory_kib': round(max(peaks) / 1024, 1),
+        'statuses': sorted(statuses),
+    }
+
+
+def git_commit():
+    """
+    Return the commit of the working tree, if any.
+
+    Returns:
+        str: Abbreviated commit hash, or None outside a git checkout.
+    """
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=settings.BASE_DIR,
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmark(rows, iterations=50, cases=None, seed=0, progress=None):
+    """
+    Measure every case against the current database.
+
+    Args:
+        rows (int): Catalogue size, recorded in the report.
+        iterations (int): Number of timed requests per case.
+        cases (list): Names of the cases to run, all when None.
+        seed (int): Seed used to sample the detail pages.
+        progress (callable): Called with each case name and its results.
+
+    Returns:
+        dict: ``meta`` information and ``results`` by case name.
+    """
+    admin_user = User.objects.filter(username=BENCH_ADMIN_USERNAME).first()
+    if admin_user is None:
+        admin_user = User.objects.create_superuser(BENCH_ADMIN_USERNAME, password=None)
+
+    all_cases = build_cases(seed)
+    missing = uncovered_patterns(all_cases)
+    if missing:
+        logger.warning("Benchmark does not cover the URL patterns: %s", ', '.join(missing))
+
+    visitor, staff = Client(), Client()
+    staff.force_login(admin_user)
+    results = {}
+    for name, paths in all_cases.items():
+        if cases and name not in cases:
+            continue
+        client = staff if name.startswith('admin:') else visitor
+        results[name] = measure(client, paths, iterations)
+        if progress is not None:
+            progress(name, results[name])
+
+    return {
+        'meta': {
+            'commit': git_commit(),
+            'date': datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds'),
+            'rows': rows,
+            'iterations': iterations,
+            'database': connection.vendor,
+            'python': platform.python_version(),
+            'django': django.get_version(),
+        },
+        'results': results,
+    }
+
+
+def compare(previous, current):
+    """
+    Return the relative change of the median latency of every case.
+
+    Args:
+        previous (dict): Earlier report.
+        current (dict): Later report.
+
+    Returns:
+        dict: Change ratios by case name (-0.25 means 25% faster).
+    """
+    changes = {}
+    for name, result in current['results'].items():
+        before = previous.get('results', {}).get(name)
+        if before and before['p50_ms']:
+            changes[name] = round(result['p50_ms'] / before['p50_ms'] - 1, 3)
+    return changes
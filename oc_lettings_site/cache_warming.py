@@ -0,0 +1,253 @@
+"""
+Cache warming after a deploy.
+
+A new release starts cold: the SQLite file is not in the page cache of
+the host, so the first wave of visitors waits for the tables and indexes
+to be read from disk. ``warm_site`` renders beforehand, with the site
+views:
+
+- the home page and the list pages, which read the whole lettings and
+  profiles tables;
+- the sitemap index and chunks, with the last modification dates by chunk
+  (the aggregates of the site), when the public URL of the site is known,
+  since it is part of their cache keys;
+- the ``top`` most popular letting and profile pages, ranked by their
+  hits in the tail of the access log (``Letting detail accessed`` lines,
+  logged at INFO level and never aggregated), completed with the most
+  recently updated rows when the log knows too few of them.
+
+Pages are rendered by a bounded thread pool, each thread using its own
+database connection. Caches local to a process (the ``default`` and
+``template_fragments`` caches in their default configuration, membership
+indexes, pre-rendered pages) are filled by each worker itself: sitemaps
+are only warmed when the cache holding them (``shared``) is not local.
+
+Functions:
+    popular_details: Rank the detail pages by their hits in the access log
+    warm_paths: Render pages in a thread pool
+    warm_site: Warm the pages of the site and report the coverage
+"""
+import logging
+import os
+import re
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import connections
+from django.http import Http404
+from django.test import RequestFactory
+from django.urls import resolve, reverse
+
+from lettings.membership import letting_ids
+from lettings.models import Letting
+from oc_lettings_site import stampede
+from oc_lettings_site.sitemaps import SECTIONS
+from profiles.membership import usernames
+from profiles.models import Profile
+
+# Configure logger for this module
+logger = logging.getLogger(__name__)
+
+# Bytes read from the end of the access log
+DEFAULT_LOG_BYTES = 10 * 1024 * 1024
+
+DEFAULT_TOP = 100
+
+DEFAULT_WORKERS = 4
+
+LIST_PATHS = ['/', '/lettings/', '/profiles/']
+
+# Client address of the warming requests, so their own hits are not counted
+WARMING_ADDR = 'cache-warming'
+
+# Detail page hits in the log
+DETAIL_PATTERNS = {
+    'lettings': re.compile(r"Letting detail accessed: ID=(\d+), IP=(\S+)"),
+    'profiles': re.compile(r"Profile detail accessed: username='([^']+)', IP=(\S+)"),
+}
+
+
+def _detail_path(section, value):
+    """Return the path of a letting or profile page."""
+    if section == 'lettings':
+        return reverse('lettings:letting', kwargs={'letting_id': int(value)})
+    return reverse('profiles:profile', kwargs={'username': value})
+
+
+def _read_tail(path, max_bytes):
+    """Return the complete lines of the last ``max_bytes`` of a file."""
+    try:
+        with open(path, 'rb') as stream:
+            size = stream.seek(0, os.SEEK_END)
+            stream.seek(max(0, size - max_bytes))
+            data = stream.read()
+    except OSError:
+        return []
+    lines = data.decode('utf-8', errors='replace').splitlines()
+    # The first line is cut unless the whole file was read
+    return lines[1:] if size > max_bytes else lines
+
+
+def popular_details(log_path, max_bytes=DEFAULT_LOG_BYTES):
+    """
+    Rank the letting and profile pages by their hits in the access log.
+
+    Args:
+        log_path (str): Log file written by the ``file`` handler.
+        max_bytes (int): Bytes read from the end of the file.
+
+    Returns:
+        Counter: Hits by page path.
+    """
+    hits = Counter()
+    for line in _read_tail(log_path, max_bytes):
+        for section, pattern in DETAIL_PATTERNS.items():
+            for value, client in pattern.findall(line):
+                if client != WARMING_ADDR:
+                    hits[_detail_path(section, value)] += 1
+    return hits
+
+
+def _recent_details(count):
+    """Return the paths of the most recently updated lettings and profiles."""
+    lettings = Letting.objects.order_by('-updated_at').values_list('id', flat=True)[:count]
+    profiles = (
+        Profile.objects.order_by('-updated_at').values_list('user__username', flat=True)[:count]
+    )
+    return ([_detail_path('lettings', value) for value in lettings]
+            + [_detail_path('profiles', value) for value in profiles])
+
+
+def _warm(factory, path, host, secure):
+    """
+    Render a page with its view.
+
+    Returns:
+        tuple: HTTP status (404 for missing pages, None on error) and seconds.
+    """
+    started = time.perf_counter()
+    request = factory.get(path, HTTP_HOST=host, secure=secure, REMOTE_ADDR=WARMING_ADDR)
+    request.user = AnonymousUser()
+    match = resolve(path)
+    try:
+        response = match.func(request, *match.args, **match.kwargs)
+        # Streamed pages are rendered, and cached, as they are consumed
+        if response.streaming:
+            for _ in response.streaming_content:
+                pass
+        status = response.status_code
+    except Http404:
+        status = 404
+    except Exception:
+        logger.exception("Cache warming failed for %s", path)
+        status = None
+    return status, time.perf_counter() - started
+
+
+def warm_paths(paths, workers=DEFAULT_WORKERS, base_url=None):
+    """
+    Render pages in a thread pool.
+
+    Args:
+        paths (list): URL paths of the pages.
+        workers (int): Number of threads, 1 to render in the calling thread.
+        base_url (str, optional): Public URL of the site, such as
+                                  ``https://example.com``; the first entry
+                                  of ``ALLOWED_HOSTS`` otherwise.
+
+    Returns:
+        dict: ``(status, seconds)`` by path.
+    """
+    if base_url:
+        parts = urlsplit(base_url)
+        host, secure = parts.netloc, parts.scheme == 'https'
+    else:
+        host = next((h for h in settings.ALLOWED_HOSTS if h not in ('*', '') and h[0] != '.'),
+                    'localhost')
+        secure = False
+    factory = RequestFactory()
+    if workers <= 1:
+        return {path: _warm(factory, path, host, secure) for path in paths}
+
+    def warm_in_thread(path):
+        try:
+            return _warm(factory, path, host, secure)
+        finally:
+            # Pool threads open their own connections, close them
+            connections.close_all()
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return dict(zip(paths, executor.map(warm_in_thread, paths)))
+
+
+def _sitemap_paths():
+    """Return the paths of the sitemap index and of every sitemap chunk."""
+    paths = [reverse('sitemap')]
+    for section in SECTIONS.values():
+        paths += [reverse('sitemap-section', kwargs={'section': section.name, 'number': number})
+                  for number, _ in section.chunks()]
+    return paths
+
+
+def warm_site(top=DEFAULT_TOP, workers=DEFAULT_WORKERS, base_url=None, log_path=None,
+              max_log_bytes=DEFAULT_LOG_BYTES, lists=True):
+    """
+    Warm the pages of the site and report the coverage.
+
+    Args:
+        top (int): Number of detail pages warmed.
+        workers (int): Number of threads.
+        base_url (str, optional): Public URL of the site; the sitemaps are
+                                  only warmed when it is given and the
+                                  ``shared`` cache is not local.
+        log_path (str, optional): Access log, the ``file`` logging handler
+                                  by default.
+        max_log_bytes (int): Bytes read from the end of the log.
+        lists (bool): Also warm the home and list pages.
+
+    Returns:
+        dict: ``pages`` (status and seconds by path), ``warmed`` and
+              ``failed`` counts, ``hit_coverage`` (share of the logged
+              detail hits whose page was warmed, None without hits) and
+              ``seconds``.
+    """
+    started = time.perf_counter()
+    if log_path is None:
+        log_path = settings.LOGGING['handlers']['file']['filename']
+    hits = popular_details(log_path, max_log_bytes)
+    details = [path for path, _ in hits.most_common(top)]
+    if len(details) < top:
+        chosen = set(details)
+        details += [path for path in _recent_details(top) if path not in chosen][
+            :top - len(details)]
+
+    # Sitemaps cached in the memory of this process would be lost on exit
+    sitemap_cache = caches[stampede.STAMPEDE_CACHE]
+    sitemaps = base_url and not isinstance(sitemap_cache, (LocMemCache, DummyCache))
+    if base_url and not sitemaps:
+        logger.info("Sitemaps not warmed: the shared cache is local to each process")
+    paths = (LIST_PATHS if lists else []) + (_sitemap_paths() if sitemaps else []) + details
+    # Build the membership indexes once, rather than in every thread at once
+    letting_ids.build()
+    usernames.build()
+    pages = warm_paths(paths, workers=workers, base_url=base_url)
+
+    total_hits = sum(hits.values())
+    covered = sum(hits[path] for path in details)
+    report = {
+        'pages': pages,
+        'warmed': sum(1 for status, _ in pages.values() if status == 200),
+        'failed': sum(1 for status, _ in pages.values() if status is None),
+        'hit_coverage': covered / total_hits if total_hits else None,
+        'seconds': time.perf_counter() - started,
+    }
+    logger.info("Cache warmed: %d of %d pages in %.1fs",
+                report['warmed'], len(pages), report['seconds'])
+    return report
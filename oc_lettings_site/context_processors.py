@@ -0,0 +1,48 @@
+"""
+Template context processors for the OC Lettings Site project.
+
+Functions:
+    layout: Add the version key of the cached layout fragments
+"""
+import functools
+import hashlib
+from pathlib import Path
+
+from django.conf import settings
+
+
+@functools.lru_cache(maxsize=None)
+def layout_cache_version():
+    """
+    Return the version key of the cached ``base.html`` fragments.
+
+    ``LAYOUT_CACHE_VERSION`` is used when set (e.g. to the release id).
+    Otherwise the version is a hash of the layout template and of the static
+    files manifest, computed once per worker, so a deploy changing either
+    never serves fragments rendered by the previous release.
+
+    Returns:
+        str: Version appended to the fragment cache keys.
+    """
+    if settings.LAYOUT_CACHE_VERSION:
+        return settings.LAYOUT_CACHE_VERSION
+    digest = hashlib.md5(usedforsecurity=False)
+    for path in (Path(settings.BASE_DIR) / 'templates' / 'base.html',
+                 Path(settings.STATIC_ROOT) / 'staticfiles.json'):
+        if path.exists():
+            digest.update(path.read_bytes())
+    return digest.hexdigest()[:12]
+
+
+def layout(request):
+    """
+    Add the layout fragments cache version to the template context.
+
+    Args:
+        request (HttpRequest): The Django HTTP request object.
+
+    Returns:
+        dict: ``layout_cache_version`` for the ``{% cache %}`` tags of
+              ``base.html``.
+    """
+    return {'layout_cache_version': layout_cache_version()}
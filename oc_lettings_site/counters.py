@@ -0,0 +1,149 @@
+"""
+Maintained row counts of the lettings and profiles.
+
+``COUNT(*)`` reads a whole table (or index) on SQLite and PostgreSQL, which
+the index pages, the admin and monitoring would otherwise run on every
+request. The ``Counter`` table instead holds the row count of each model
+of ``COUNTED_MODELS``, read with a primary key lookup:
+
+- Saves and deletes update the counter from signal handlers, in the
+  transaction of the change: Django deletes in a transaction, and the
+  counted models (``CountedModel``) save in one.
+- The bulk paths sending no signals (``generate_data``, the NDJSON load,
+  the bulk deletes) call ``add`` inside each batch transaction.
+- ``reconcile`` counts the rows again and repairs any drift, such as
+  rows changed with raw SQL; the ``reconcile_counters`` command runs it.
+
+A missing counter (after a ``flush``) is answered with a ``COUNT(*)``
+until it is reconciled.
+
+Functions:
+    counter_name: Return the counter name of a model
+    add: Add to the counter of a model
+    value: Return the row count of a model
+    values: Return the row counts of every counted model
+    reconcile: Count the rows and repair the counters
+"""
+import logging
+
+from django.apps import apps
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.db.models import F
+
+from .models import Counter
+
+# Configure logger for this module
+logger = logging.getLogger(__name__)
+
+# Models whose rows are counted
+COUNTED_MODELS = ('lettings.Letting', 'profiles.Profile')
+
+
+def counter_name(model):
+    """
+    Return the counter name of a model.
+
+    Args:
+        model (type): Model class, concrete or historical.
+
+    Returns:
+        str: Lower case model label, or None if the model is not counted.
+    """
+    name = model._meta.label_lower
+    return name if name in {label.lower() for label in COUNTED_MODELS} else None
+
+
+def add(model, delta, using=DEFAULT_DB_ALIAS):
+    """
+    Add to the counter of a model, with a single ``UPDATE``.
+
+    Call it in the transaction inserting or deleting the rows. Models not
+    counted and missing counters are ignored.
+
+    Args:
+        model (type): Model whose rows were inserted or deleted.
+        delta (int): Rows inserted, negative for rows deleted.
+        using (str): Database alias.
+    """
+    name = counter_name(model)
+    if name is None or not delta:
+        return
+    Counter.objects.using(using).filter(name=name).update(value=F('value') + delta)
+
+
+def value(model, using=DEFAULT_DB_ALIAS):
+    """
+    Return the row count of a model from its counter.
+
+    Args:
+        model (type): A model of ``COUNTED_MODELS``.
+        using (str): Database alias.
+
+    Returns:
+        int: Number of rows of the model.
+
+    Raises:
+        ValueError: If the model is not counted.
+    """
+    name = counter_name(model)
+    if name is None:
+        raise ValueError(f"{model._meta.label} has no counter")
+    count = (
+        Counter.objects.using(using).filter(name=name)
+        .values_list('value', flat=True).first()
+    )
+    if count is None:
+        logger.warning("Counter %s is missing, run reconcile_counters", name)
+        count = model._default_manager.using(using).count()
+    return count
+
+
+def values(using=DEFAULT_DB_ALIAS):
+    """
+    Return the row counts of every counted model, with one query.
+
+    Args:
+        using (str): Database alias.
+
+    Returns:
+        dict: Count by counter name; missing counters are left out.
+    """
+    return dict(Counter.objects.using(using).values_list('name', 'value'))
+
+
+def reconcile(models=None, using=DEFAULT_DB_ALIAS, dry_run=False):
+    """
+    Count the rows of models and repair their counters.
+
+    The counter row is locked (on databases supporting it) before the rows
+    are counted, so changes committed meanwhile wait and then apply their
+    own delta to the repaired value.
+
+    Args:
+        models (list): Models to reconcile, all of ``COUNTED_MODELS`` when None.
+        using (str): Database alias.
+        dry_run (bool): Only report the drift.
+
+    Returns:
+        dict: ``(stored, counted)`` by counter name, ``stored`` being None
+              for a missing counter.
+    """
+    if models is None:
+        models = [apps.get_model(label) for label in COUNTED_MODELS]
+    report = {}
+    for model in models:
+        name = counter_name(model)
+        with transaction.atomic(using=using):
+            stored = (
+                Counter.objects.using(using).select_for_update().filter(name=name)
+                .values_list('value', flat=True).first()
+            )
+            counted = model._default_manager.using(using).count()
+            if stored != counted and not dry_run:
+                Counter.objects.using(using).update_or_create(
+                    name=name, defaults={'value': counted}
+                )
+        if stored != counted:
+            logger.warning("Counter %s drifted: %s stored, %d counted", name, stored, counted)
+        report[name] = (stored, counted)
+    return report
@@ -0,0 +1,523 @@
+"""
+CSS tree-shaking against the project templates.
+
+The theme stylesheet (``static/css/styles.css``) ships the whole of
+Bootstrap and the SB UI Kit while our templates use a small fraction of it.
+This module scans the project templates for the classes, ids, tags and
+attributes they use, drops every rule whose selectors cannot match, and
+writes two minified stylesheets:
+
+* the purged stylesheet, loaded without blocking rendering;
+* a critical subset covering the layout chrome and the page headers,
+  small enough to be inlined in ``base.html``.
+
+The parser is deliberately small: it understands comments, strings,
+statement and block at-rules (``@media``/``@supports`` are purged
+recursively, ``@font-face`` is kept, unused ``@keyframes`` are dropped),
+which is all the theme uses.
+
+Functions:
+    collect_usage: Gather the selectors tokens used by a set of templates
+    purge_stylesheet: Purge and minify a stylesheet for a given usage
+    build: Write the purged and critical stylesheets and report sizes
+"""
+import gzip
+import re
+from pathlib import Path
+
+from django.apps import apps
+from django.conf import settings
+
+# At-rules whose block contains rules to purge recursively
+GROUPING_AT_RULES = {'media', 'supports', 'document', 'layer', 'container'}
+
+# Template subdirectories overriding admin pages, which never load the theme
+EXCLUDED_TEMPLATE_DIRS = {'admin'}
+
+_COMMENT_RE = re.compile(r'("(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\')|/\*(!?).*?\*/', re.S)
+_STRING_RE = re.compile(r'"(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\'')
+_WHITESPACE_RE = re.compile(r'\s+')
+# Tokens around which whitespace is dropped when minifying
+_SELECTOR_TOKENS = re.compile(r'\s*([>+~,])\s*')
+_VALUE_TOKENS = re.compile(r'\s*(,)\s*')
+
+_ATTRIBUTE_SELECTOR_RE = re.compile(r'\[\s*([-\w]+)[^\]]*\]')
+_PARENS_RE = re.compile(r'\([^()]*\)')
+_PSEUDO_RE = re.compile(r'::?[-\w]+')
+_CLASS_SELECTOR_RE = re.compile(r'\.((?:\\.|[-\w])+)')
+_ID_SELECTOR_RE = re.compile(r'#((?:\\.|[-\w])+)')
+_TAG_SELECTOR_RE = re.compile(r'(?:^|[\s>+~])([a-zA-Z][-\w]*)')
+_ESCAPE_RE = re.compile(r'\\(.)')
+
+_TEMPLATE_SYNTAX_RE = re.compile(r'{%.*?%}|{{.*?}}|{#.*?#}', re.S)
+_BLOCK_CONTENT_RE = re.compile(r'{%\s*block\s+content\s*%}')
+_HTML_TAG_RE = re.compile(r'<([a-zA-Z][-\w]*)([^>]*)>', re.S)
+_HTML_ATTRIBUTE_RE = re.compile(
+    r'([-\w:]+)(?:\s*=\s*(?:"([^"]*)"|\'([^\']*)\'|([^\s>]+)))?'
+)
+_ANIMATION_RE = re.compile(r'(?:^|;)\s*(?:-webkit-)?animation(?:-name)?\s*:([^;]*)')
+
+
+class Rule:
+    """A style rule: a selector list and its declarations."""
+
+    def __init__(self, selector, declarations):
+        self.selector = selector
+        self.declarations = declarations
+
+
+class AtRule:
+    """
+    An at-rule.
+
+    Attributes:
+        prelude (str): The at-rule up to its block, e.g. ``@media (...)``.
+        children (list, optional): Nested nodes of a grouping at-rule.
+        block (str, optional): Raw block of other at-rules (``@font-face``).
+    """
+
+    def __init__(self, prelude, children=None, block=None):
+        self.prelude = prelude
+        self.children = children
+        self.block = block
+
+    @property
+    def name(self):
+        """Return the lower-cased at-rule name, without the ``@``."""
+        return re.split(r'[\s(]', self.prelude[1:], maxsplit=1)[0].lower()
+
+
+class Usage:
+    """
+    Selector tokens found in markup.
+
+    Attributes:
+        classes (set): CSS classes used in ``class`` attributes.
+        ids (set): Element ids.
+        tags (set): Lower-cased tag names.
+        attributes (set): Lower-cased attribute names.
+    """
+
+    def __init__(self, classes=()):
+        self.classes = set(classes)
+        self.ids = set()
+        self.tags = {'html', 'body'}
+        self.attributes = set()
+
+    def add_markup(self, markup):
+        """
+        Record the tokens used by an HTML or template source.
+
+        Template tags and variables are blanked out first, so literal class
+        names around ``{% if %}`` branches are all collected.
+
+        Args:
+            markup (str): HTML or Django template source.
+        """
+        markup = _TEMPLATE_SYNTAX_RE.sub(' ', markup)
+        for tag, attributes in _HTML_TAG_RE.findall(markup):
+            self.tags.add(tag.lower())
+            for name, *values in _HTML_ATTRIBUTE_RE.findall(attributes):
+                name = name.lower()
+                value = ''.join(values)
+                self.attributes.add(name)
+                if name == 'class':
+                    self.classes.update(value.split())
+                elif name == 'id':
+                    self.ids.update(value.split())
+
+    def matches(self, selector):
+        """
+        Tell whether a single (non-list) selector may match the markup.
+
+        Pseudo-classes, pseudo-elements and the content of functional
+        pseudo-classes such as ``:not()`` are ignored, so the check errs on
+        the side of keeping rules.
+
+        Args:
+            selector (str): A complex selector, without commas.
+
+        Returns:
+            bool: False if the selector requires a token never used.
+        """
+        attributes = {name.lower() for name in _ATTRIBUTE_SELECTOR_RE.findall(selector)}
+        selector = _ATTRIBUTE_SELECTOR_RE.sub('', selector)
+        previous = None
+        while previous != selector:
+            previous, selector = selector, _PARENS_RE.sub('', selector)
+        selector = _PSEUDO_RE.sub('', selector)
+        classes = {_ESCAPE_RE.sub(r'\1', c) for c in _CLASS_SELECTOR_RE.findall(selector)}
+        ids = {_ESCAPE_RE.sub(r'\1', i) for i in _ID_SELECTOR_RE.findall(selector)}
+        tags = {tag.lower() for tag in _TAG_SELECTOR_RE.findall(selector)}
+        return (
+            classes <= self.classes
+            and ids <= self.ids
+            and tags <= self.tags
+            and attributes <= self.attributes
+        )
+
+
+def _skip_string(css, i):
+    """Return the index just after the string starting at ``css[i]``."""
+    quote = css[i]
+    i += 1
+    while i < len(css):
+        if css[i] == '\\':
+            i += 2
+        elif css[i] == quote:
+            return i + 1
+        else:
+            i += 1
+    return len(css)
+
+
+def _scan(css, i, stops):
+    """Return the index of the first stop character outside strings and parens."""
+    depth = 0
+    while i < len(css):
+        char = css[i]
+        if char in '"\'':
+            i = _skip_string(css, i)
+            continue
+        if char == '(':
+            depth += 1
+        elif char == ')':
+            depth -= 1
+        elif depth <= 0 and char in stops:
+            return i
+        i += 1
+    return len(css)
+
+
+def _block_end(css, i):
+    """Return the index of the ``}`` closing the block opened before ``css[i]``."""
+    depth = 1
+    while i < len(css):
+        i = _scan(css, i, '{}')
+        if i >= len(css):
+            break
+        depth += 1 if css[i] == '{' else -1
+        if depth == 0:
+            return i
+        i += 1
+    return len(css)
+
+
+def _split_top_level(text, separator):
+    """Split on a separator found outside strings and parentheses."""
+    parts = []
+    i = 0
+    while i <= len(text):
+        j = _scan(text, i, separator)
+        parts.append(text[i:j])
+        i = j + 1
+    return parts
+
+
+def strip_comments(css):
+    """
+    Remove comments from a stylesheet.
+
+    Returns:
+        tuple: ``(css, licenses)`` where ``licenses`` lists the preserved
+               ``/*! ... */`` comments.
+    """
+    licenses = []
+
+    def replace(match):
+        if match.group(1):
+            return match.group(1)
+        if match.group(2):
+            licenses.append(match.group(0))
+        return ' '
+
+    return _COMMENT_RE.sub(replace, css), licenses
+
+
+def parse(css):
+    """
+    Parse a comment-free stylesheet into rules and at-rules.
+
+    Args:
+        css (str): Stylesheet source, see :func:`strip_comments`.
+
+    Returns:
+        list: :class:`Rule` and :class:`AtRule` nodes.
+    """
+    nodes = []
+    i = 0
+    while i < len(css):
+        if css[i].isspace() or css[i] == '}':
+            i += 1
+            continue
+        j = _scan(css, i, '{;}')
+        prelude = css[i:j].strip()
+        if j >= len(css) or css[j] != '{':
+            if prelude.startswith('@'):
+                nodes.append(AtRule(prelude))
+            i = j + 1
+            continue
+        end = _block_end(css, j + 1)
+        body = css[j + 1:end]
+        if prelude.startswith('@'):
+            node = AtRule(prelude)
+            if node.name in GROUPING_AT_RULES:
+                node.children = parse(body)
+            else:
+                node.block = body
+            nodes.append(node)
+        else:
+            nodes.append(Rule(prelude, body))
+        i = end + 1
+    return nodes
+
+
+def purge(nodes, usage):
+    """
+    Drop the rules and selectors that cannot match the given usage.
+
+    Args:
+        nodes (list): Parsed stylesheet, see :func:`parse`.
+        usage (Usage): Tokens used by the markup.
+
+    Returns:
+        list: New list of nodes; grouping at-rules left empty are removed.
+    """
+    kept = []
+    for node in nodes:
+        if isinstance(node, Rule):
+            selectors = [
+                selector for selector in _split_top_level(node.selector, ',')
+                if usage.matches(selector.strip())
+            ]
+            if selectors:
+                kept.append(Rule(','.join(selectors), node.declarations))
+        elif node.children is not None:
+            children = purge(node.children, usage)
+            if children:
+                kept.append(AtRule(node.prelude, children=children))
+        else:
+            kept.append(node)
+    return _drop_unused_keyframes(kept)
+
+
+def _animation_names(nodes):
+    """Return the identifiers used in animation declarations."""
+    names = set()
+    for node in nodes:
+        if isinstance(node, Rule):
+            for value in _ANIMATION_RE.findall(node.declarations):
+                names.update(re.findall(r'[-\w]+', value))
+        elif node.children is not None:
+            names |= _animation_names(node.children)
+    return names
+
+
+def _drop_unused_keyframes(nodes):
+    """Remove ``@keyframes`` blocks no kept rule refers to."""
+    names = _animation_names(nodes)
+    return [
+        node for node in nodes
+        if not (isinstance(node, AtRule) and node.name.endswith('keyframes')
+                and node.prelude.split(None, 1)[-1].strip() not in names)
+    ]
+
+
+def _collapse(text, pattern=None):
+    """Collapse whitespace outside strings, optionally tightening around tokens."""
+    parts = []
+    last = 0
+    for match in _STRING_RE.finditer(text):
+        parts.append((text[last:match.start()], False))
+        parts.append((match.group(0), True))
+        last = match.end()
+    parts.append((text[last:], False))
+    result = []
+    for part, is_string in parts:
+        if not is_string:
+            part = _WHITESPACE_RE.sub(' ', part)
+            if pattern is not None:
+                part = pattern.sub(r'\1', part)
+        result.append(part)
+    return ''.join(result).strip()
+
+
+def _minify_declarations(text):
+    """Minify a declaration block."""
+    declarations = []
+    for declaration in _split_top_level(text, ';'):
+        name, colon, value = declaration.partition(':')
+        if colon and name.strip():
+            declarations.append(f'{name.strip()}:{_collapse(value, _VALUE_TOKENS)}')
+    return ';'.join(declarations)
+
+
+def serialize(nodes):
+    """
+    Serialize nodes back to minified CSS.
+
+    Args:
+        nodes (list): :class:`Rule` and :class:`AtRule` nodes.
+
+    Returns:
+        str: Minified stylesheet.
+    """
+    parts = []
+    for node in nodes:
+        if isinstance(node, Rule):
+            selector = _collapse(node.selector, _SELECTOR_TOKENS)
+            parts.append(f'{selector}{{{_minify_declarations(node.declarations)}}}')
+        elif node.children is not None:
+            parts.append(f'{_collapse(node.prelude)}{{{serialize(node.children)}}}')
+        elif node.block is not None:
+            if '{' in node.block:
+                block = serialize(parse(node.block))
+            else:
+                block = _minify_declarations(node.block)
+            parts.append(f'{_collapse(node.prelude)}{{{block}}}')
+        else:
+            parts.append(f'{_collapse(node.prelude)};')
+    return ''.join(parts)
+
+
+def project_template_dirs():
+    """
+    Return the template directories of the project itself.
+
+    Both the ``TEMPLATES`` ``DIRS`` and the ``templates`` directory of the
+    applications living in ``BASE_DIR`` are returned; third-party templates
+    (the admin) use their own stylesheets, and so do the project overrides
+    of admin templates, skipped by ``collect_usage``.
+
+    Returns:
+        list: ``Path`` objects of existing directories.
+    """
+    dirs = [Path(d) for config in settings.TEMPLATES for d in config.get('DIRS', [])]
+    base_dir = Path(settings.BASE_DIR)
+    for app_config in apps.get_app_configs():
+        path = Path(app_config.path)
+        if base_dir in path.parents:
+            dirs.append(path / 'templates')
+    return [d for d in dirs if d.is_dir()]
+
+
+def critical_markup(source):
+    """
+    Return the above-the-fold part of a template.
+
+    For the layout (a template defining the ``content`` block without
+    extending another one) this is everything before the content block: the
+    head and the navbar. For pages it is the beginning of the content block
+    up to the end of the first ``<h1>``, i.e. the page header.
+
+    Args:
+        source (str): Template source.
+
+    Returns:
+        str: Markup considered visible without scrolling.
+    """
+    match = _BLOCK_CONTENT_RE.search(source)
+    if match is None:
+        return source
+    if '{% extends' not in source[:match.start()]:
+        return source[:match.start()]
+    return source[match.end():].split('</h1>', 1)[0]
+
+
+def collect_usage(template_dirs, safelist=(), critical=False):
+    """
+    Gather the tokens used by every ``.html`` template of the given directories.
+
+    Args:
+        template_dirs (Iterable[Path]): Directories to scan recursively,
+                                        except their ``EXCLUDED_TEMPLATE_DIRS``.
+        safelist (Iterable[str]): Classes added at runtime (JavaScript,
+                                  template tags) that must always be kept.
+        critical (bool): Only scan the above-the-fold part of each template.
+
+    Returns:
+        Usage: The collected tokens.
+    """
+    usage = Usage(safelist)
+    for directory in template_dirs:
+        for path in sorted(Path(directory).rglob('*.html')):
+            if path.relative_to(directory).parts[0] in EXCLUDED_TEMPLATE_DIRS:
+                continue
+            source = path.read_text(encoding='utf-8')
+            usage.add_markup(critical_markup(source) if critical else source)
+    return usage
+
+
+def purge_stylesheet(css, usage, keep_licenses=True):
+    """
+    Purge and minify a stylesheet.
+
+    Args:
+        css (str): Source stylesheet.
+        usage (Usage): Tokens used by the markup.
+        keep_licenses (bool): Keep ``/*! ... */`` comments, after ``@charset``.
+
+    Returns:
+        str: The minified stylesheet.
+    """
+    css, licenses = strip_comments(css)
+    nodes = purge(parse(css), usage)
+    charset = [n for n in nodes if isinstance(n, AtRule) and n.name == 'charset']
+    others = [n for n in nodes if n not in charset]
+    header = serialize(charset) if keep_licenses else ''
+    if keep_licenses:
+        header += '\n'.join(licenses) + ('\n' if licenses else '')
+    return header + serialize(others) + '\n'
+
+
+def _sizes(text):
+    """Return the raw and gzip-compressed sizes of a text, in bytes."""
+    data = text.encode('utf-8')
+    return {'bytes': len(data), 'gzip_bytes': len(gzip.compress(data, 9))}
+
+
+def build(source=None, output=None, critical_output=None, template_dirs=None, safelist=None,
+          markup_dirs=None):
+    """
+    Write the purged and critical stylesheets and report the size reduction.
+
+    Arguments default to the ``CSS_PURGE`` setting.
+
+    Args:
+        source (Path, optional): Theme stylesheet.
+        output (Path, optional): Purged stylesheet to write.
+        critical_output (Path, optional): Critical subset to write.
+        template_dirs (list, optional): Directories to scan.
+        safelist (list, optional): Classes always kept.
+        markup_dirs (list, optional): Directories of ``.svg`` markup inserted
+                                      by template tags (icons), only taken
+                                      into account for the full stylesheet.
+
+    Returns:
+        dict: Sizes (raw and gzip) of the ``source``, ``purged`` and
+              ``critical`` stylesheets.
+    """
+    options = settings.CSS_PURGE
+    source = Path(source or options['SOURCE'])
+    output = Path(output or options['OUTPUT'])
+    critical_output = Path(critical_output or options['CRITICAL_OUTPUT'])
+    template_dirs = template_dirs if template_dirs is not None else project_template_dirs()
+    safelist = safelist if safelist is not None else options.get('SAFELIST', [])
+    markup_dirs = markup_dirs if markup_dirs is not None else options.get('MARKUP_DIRS', [])
+
+    css = source.read_text(encoding='utf-8')
+    usage = collect_usage(template_dirs, safelist)
+    for directory in markup_dirs:
+        for path in sorted(Path(directory).rglob('*.svg')):
+            usage.add_markup(path.read_text(encoding='utf-8'))
+    purged = purge_stylesheet(css, usage)
+    critical = purge_stylesheet(
+        css, collect_usage(template_dirs, safelist, critical=True), keep_licenses=False
+    )
+    output.write_text(purged, encoding='utf-8')
+    critical_output.write_text(critical, encoding='utf-8')
+    return {
+        'source': _sizes(css),
+        'purged': _sizes(purged),
+        'critical': _sizes(critical),
+    }
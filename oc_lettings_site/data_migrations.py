@@ -0,0 +1,201 @@
+"""
+Batched copy of rows between models, for data migrations.
+
+Splitting an application moves its rows to the models of the new
+applications. Copying them with a ``create()`` per row, and a query per
+foreign key, takes hours on large tables. ``copy_rows`` instead reads the
+source with a chunked ``iterator()`` over a ``values_list()`` projection
+(foreign keys are copied as raw IDs, never fetched) and writes them with
+``bulk_create``, one transaction per batch, keeping the primary keys.
+
+Copies are resumable: rows are copied in primary key order, so a copy
+interrupted after some committed batches restarts after the largest
+primary key already in the target. Migrations using ``CopyModels`` must be
+declared ``atomic = False`` for the batches to be committed as they go.
+
+Functions:
+    copy_rows: Copy the rows of a model into another, in batches
+    delete_rows: Delete every row of a model, in batches
+
+Classes:
+    CopyModels: Migration operation copying the rows of pairs of models
+"""
+import logging
+
+from django.core.management.color import no_style
+from django.db import DEFAULT_DB_ALIAS, connections, router, transaction
+from django.db.migrations.operations.base import Operation
+from django.db.models import Max
+
+from oc_lettings_site import membership
+
+# Configure logger for this module
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 2000
+
+
+def _copied_fields(source, target):
+    """Return the attnames of the concrete target fields the source also has."""
+    source_fields = {field.attname for field in source._meta.concrete_fields}
+    return [field.attname for field in target._meta.concrete_fields
+            if field.attname in source_fields]
+
+
+def _flush(target, fields, rows, using):
+    """Insert a batch of value tuples into the target model."""
+    with transaction.atomic(using=using):
+        target._default_manager.using(using).bulk_create(
+            [target(**dict(zip(fields, row))) for row in rows]
+        )
+
+
+def copy_rows(source, target, batch_size=DEFAULT_BATCH_SIZE, using=DEFAULT_DB_ALIAS,
+              progress=None):
+    """
+    Copy the rows of a model into another, keeping their primary keys.
+
+    Every concrete field of the target found in the source (by attname,
+    such as ``address_id``) is copied; other target fields get their
+    default. Rows whose primary key is not above the largest one of the
+    target are considered copied by an earlier, interrupted run.
+
+    Args:
+        source (type): Model read, usually from ``apps.get_model()``.
+        target (type): Model written.
+        batch_size (int): Rows per ``iterator()`` chunk, insert and transaction.
+        using (str): Database alias.
+        progress (callable, optional): Called with ``(copied, total)`` after
+                                      each committed batch.
+
+    Returns:
+        int: Number of rows copied by this run.
+
+    Raises:
+        ValueError: If the source has no primary key field to copy.
+    """
+    pk = target._meta.pk.attname
+    fields = _copied_fields(source, target)
+    if pk not in fields:
+        raise ValueError(f"{source._meta.label} has no {pk} field to copy")
+    resume_after = target._default_manager.using(using).aggregate(last=Max('pk'))['last']
+    rows = source._default_manager.using(using).order_by('pk')
+    if resume_after is not None:
+        rows = rows.filter(pk__gt=resume_after)
+        logger.info("Resuming the copy of %s after ID %s", source._meta.label, resume_after)
+    total = rows.count()
+
+    copied, batch = 0, []
+    for row in rows.values_list(*fields).iterator(chunk_size=batch_size):
+        batch.append(row)
+        if len(batch) >= batch_size:
+            _flush(target, fields, batch, using)
+            copied += len(batch)
+            batch = []
+            if progress is not None:
+                progress(copied, total)
+    if batch:
+        _flush(target, fields, batch, using)
+        copied += len(batch)
+        if progress is not None:
+            progress(copied, total)
+
+    # Explicit primary keys were inserted, move the sequences past them
+    connection = connections[using]
+    sequence_sql = connection.ops.sequence_reset_sql(no_style(), [target])
+    if sequence_sql:
+        with connection.cursor() as cursor:
+            for sql in sequence_sql:
+                cursor.execute(sql)
+    # bulk_create sends no signals, rebuild the membership indexes
+    membership.invalidate(using)
+    logger.info("Copied %d row(s) from %s to %s",
+                copied, source._meta.label, target._meta.label)
+    return copied
+
+
+def delete_rows(model, batch_size=DEFAULT_BATCH_SIZE, using=DEFAULT_DB_ALIAS):
+    """
+    Delete every row of a model, one primary key batch per transaction.
+
+    Args:
+        model (type): Model emptied.
+        batch_size (int): Rows deleted per transaction.
+        using (str): Database alias.
+
+    Returns:
+        int: Number of rows deleted.
+    """
+    manager = model._default_manager.using(using)
+    deleted = 0
+    while True:
+        ids = list(manager.order_by('pk').values_list('pk', flat=True)[:batch_size])
+        if not ids:
+            break
+        with transaction.atomic(using=using):
+            deleted += manager.filter(pk__in=ids).delete()[0]
+    membership.invalidate(using)
+    return deleted
+
+
+def _log_progress(source, target):
+    """Return a progress callback logging the copy of a model."""
+    def progress(copied, total):
+        logger.info("%s -> %s: %d/%d rows", source, target, copied, total)
+    return progress
+
+
+class CopyModels(Operation):
+    """
+    Migration operation copying the rows of pairs of models.
+
+    Pairs are copied in order, so referenced models come first; reversing
+    the operation empties the targets in the opposite order.
+
+    Example:
+        ``CopyModels([('oc_lettings_site.Address', 'lettings.Address')])``
+    """
+
+    reduces_to_sql = False
+    reversible = True
+
+    def __init__(self, pairs, batch_size=DEFAULT_BATCH_SIZE):
+        """
+        Initialize the operation.
+
+        Args:
+            pairs (list): ``(source, target)`` model labels.
+            batch_size (int): Rows per batch.
+        """
+        self.pairs = [tuple(pair) for pair in pairs]
+        self.batch_size = batch_size
+
+    def deconstruct(self):
+        kwargs = {}
+        if self.batch_size != DEFAULT_BATCH_SIZE:
+            kwargs['batch_size'] = self.batch_size
+        return self.__class__.__name__, [self.pairs], kwargs
+
+    def state_forwards(self, app_label, state):
+        pass
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        using = schema_editor.connection.alias
+        if not router.allow_migrate(using, app_label):
+            return
+        for source, target in self.pairs:
+            copy_rows(from_state.apps.get_model(source), from_state.apps.get_model(target),
+                      batch_size=self.batch_size, using=using,
+                      progress=_log_progress(source, target))
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        using = schema_editor.connection.alias
+        if not router.allow_migrate(using, app_label):
+            return
+        for _, target in reversed(self.pairs):
+            delete_rows(from_state.apps.get_model(target), batch_size=self.batch_size,
+                        using=using)
+
+    def describe(self):
+        return "Copy rows of " + ", ".join(f"{source} to {target}"
+                                           for source, target in self.pairs)
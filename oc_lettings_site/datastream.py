@@ -0,0 +1,254 @@
+"""
+Streaming dump and load of the application data.
+
+This module provides a memory-bounded alternative to Django's ``dumpdata`` /
+``loaddata`` pair for the catalogue (users, addresses, lettings and profiles).
+Data is written as NDJSON: one JSON object per line, using the same record
+layout as Django's JSON serializer (``model``, ``pk`` and ``fields``), so a
+line can be read and inserted without ever holding the whole document in
+memory.
+
+Files whose name ends with ``.gz`` or ``.xz`` are transparently compressed
+and decompressed.
+
+Functions:
+    open_stream: Open a (possibly compressed) NDJSON file in text mode
+    resolve_models: Resolve model labels and sort them in dependency order
+    dump_models: Stream the rows of the given models to an NDJSON file
+    load_records: Insert NDJSON records in batches inside chunked transactions
+"""
+import gzip
+import json
+import lzma
+from itertools import groupby
+
+from django.apps import apps
+from django.core.management.color import no_style
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+
+from oc_lettings_site import counters, membership
+
+# Models handled by default, any order: they are sorted by dependency
+DEFAULT_MODELS = (
+    'auth.user',
+    'lettings.address',
+    'lettings.letting',
+    'profiles.profile',
+)
+
+DEFAULT_BATCH_SIZE = 1000
+DEFAULT_CHUNK_SIZE = 20000
+
+
+def open_stream(path, mode='rt'):
+    """
+    Open an NDJSON file, compressed according to its extension.
+
+    Args:
+        path (str): Path of the file. A ``.gz`` suffix selects gzip and a
+                   ``.xz`` suffix selects LZMA compression.
+        mode (str): Text mode, ``'rt'`` for reading or ``'wt'`` for writing.
+
+    Returns:
+        TextIO: File object yielding or accepting text lines.
+    """
+    path = str(path)
+    if path.endswith('.gz'):
+        return gzip.open(path, mode, encoding='utf-8')
+    if path.endswith('.xz'):
+        return lzma.open(path, mode, encoding='utf-8')
+    return open(path, mode, encoding='utf-8')
+
+
+def resolve_models(labels=DEFAULT_MODELS):
+    """
+    Resolve model labels and sort them so that dependencies come first.
+
+    Args:
+        labels (Iterable[str]): Model labels such as ``'lettings.letting'``.
+                               Models are ordered from their foreign keys,
+                               keeping the given order otherwise.
+
+    Returns:
+        list: Model classes, each one after the models it references.
+
+    Raises:
+        LookupError: If a label does not match an installed model.
+    """
+    remaining = [apps.get_model(label) for label in labels]
+    ordered = []
+    while remaining:
+        for model in remaining:
+            targets = {
+                field.related_model for field in model._meta.concrete_fields
+                if field.is_relation and field.related_model is not model
+            }
+            if not targets.intersection(remaining):
+                break
+        else:
+            # Circular references: keep the requested order for the rest
+            model = remaining[0]
+        ordered.append(model)
+        remaining.remove(model)
+    return ordered
+
+
+def _data_fields(model):
+    """Return the concrete, non primary key fields stored for a model."""
+    return [field for field in model._meta.concrete_fields if not field.primary_key]
+
+
+def dump_models(stream, models, batch_size=DEFAULT_BATCH_SIZE, using=DEFAULT_DB_ALIAS):
+    """
+    Write every row of the given models to a stream, one record per line.
+
+    Rows are read with a chunked ``iterator()`` over a ``values_list()``
+    projection ordered by primary key, so no model instance is built and
+    memory use does not depend on the table size. Many-to-many relations
+    (user groups and permissions) are not exported.
+
+    Args:
+        stream (TextIO): Writable text stream, see :func:`open_stream`.
+        models (list): Model classes, already in dependency order.
+        batch_size (int): Number of rows fetched from the database at once.
+        using (str): Database alias to read from.
+
+    Returns:
+        dict: Number of rows written per model label.
+    """
+    encoder = DjangoJSONEncoder(ensure_ascii=False)
+    counts = {}
+    for model in models:
+        label = model._meta.label_lower
+        fields = _data_fields(model)
+        rows = (
+            model._default_manager.using(using)
+            .order_by('pk')
+            .values_list('pk', *[field.attname for field in fields])
+            .iterator(chunk_size=batch_size)
+        )
+        count = 0
+        for row in rows:
+            record = {
+                'model': label,
+                'pk': row[0],
+                'fields': {field.name: value for field, value in zip(fields, row[1:])},
+            }
+            stream.write(encoder.encode(record))
+            stream.write('\n')
+            count += 1
+        counts[label] = count
+    return counts
+
+
+def _read_records(stream):
+    """Yield the decoded records of an NDJSON stream, skipping blank lines."""
+    for line_number, line in enumerate(stream, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError as e:
+            raise ValueError(f"Invalid JSON on line {line_number}: {e}") from e
+
+
+def _build_instance(model, fields_by_name, record):
+    """Build an unsaved model instance from a decoded record."""
+    values = {}
+    for name, value in record['fields'].items():
+        field = fields_by_name.get(name)
+        if field is None:
+            # Unknown or many-to-many field, as in the stock fixtures
+            continue
+        values[field.attname] = field.to_python(value)
+    return model(pk=record['pk'], **values)
+
+
+def _batches(stream, batch_size):
+    """
+    Group consecutive records of the same model into bounded batches.
+
+    Yields:
+        tuple: ``(model_label, records)`` with at most ``batch_size`` records.
+    """
+    for label, records in groupby(_read_records(stream), key=lambda r: r['model']):
+        batch = []
+        for record in records:
+            batch.append(record)
+            if len(batch) >= batch_size:
+                yield label, batch
+                batch = []
+        if batch:
+            yield label, batch
+
+
+def load_records(stream, batch_size=DEFAULT_BATCH_SIZE, chunk_size=DEFAULT_CHUNK_SIZE,
+                 using=DEFAULT_DB_ALIAS, progress=None):
+    """
+    Insert the records of an NDJSON stream into the database.
+
+    Records are grouped in ``bulk_create`` batches of ``batch_size`` rows and
+    committed every ``chunk_size`` rows, so memory stays bounded whatever the
+    size of the input. As with ``loaddata``, constraint checks are disabled
+    while inserting and foreign keys are verified once everything is loaded,
+    which lets the file list dependent rows before the rows they reference.
+
+    Args:
+        stream (TextIO): Readable text stream, see :func:`open_stream`.
+        batch_size (int): Number of rows per ``INSERT`` statement.
+        chunk_size (int): Number of rows per transaction.
+        using (str): Database alias to write to.
+        progress (callable, optional): Called with ``(label, count)`` after
+                                      each committed chunk.
+
+    Returns:
+        dict: Number of rows inserted per model label.
+
+    Raises:
+        LookupError: If a record refers to an unknown model.
+        ValueError: If a line is not valid JSON.
+        django.db.IntegrityError: If a foreign key is left dangling.
+    """
+    connection = connections[using]
+    models = {}
+    counts = {}
+    batches = _batches(stream, batch_size)
+    with connection.constraint_checks_disabled():
+        exhausted = False
+        while not exhausted:
+            inserted = 0
+            with transaction.atomic(using=using):
+                while inserted < chunk_size:
+                    try:
+                        label, records = next(batches)
+                    except StopIteration:
+                        exhausted = True
+                        break
+                    if label not in models:
+                        model = apps.get_model(label)
+                        models[label] = (model, {f.name: f for f in _data_fields(model)})
+                    model, fields_by_name = models[label]
+                    objs = [_build_instance(model, fields_by_name, r) for r in records]
+                    model._default_manager.using(using).bulk_create(objs)
+                    counters.add(model, len(objs), using=using)
+                    counts[label] = counts.get(label, 0) + len(objs)
+                    inserted += len(objs)
+            if progress is not None and inserted:
+                progress(label, counts[label])
+
+    # Constraint checks were disabled, verify the foreign keys now
+    loaded = [model for model, _ in models.values()]
+    connection.check_constraints(table_names=[model._meta.db_table for model in loaded])
+
+    # Explicit primary keys were inserted, move the sequences past them
+    sequence_sql = connection.ops.sequence_reset_sql(no_style(), loaded)
+    if sequence_sql:
+        with connection.cursor() as cursor:
+            for sql in sequence_sql:
+                cursor.execute(sql)
+
+    # bulk_create sends no signals, rebuild the membership indexes
+    membership.invalidate(using)
+    return counts
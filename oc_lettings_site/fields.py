@@ -0,0 +1,31 @@
+"""
+Custom model fields for the OC Lettings Site project.
+
+Classes:
+    ModificationDateTimeField: Timestamp refreshed at every save
+"""
+from django.db import models
+from django.utils import timezone
+
+
+class ModificationDateTimeField(models.DateTimeField):
+    """
+    Date and time of the last modification of a row.
+
+    Behaves like ``DateTimeField(auto_now=True)`` (refreshed by ``save()`` and
+    ``bulk_create()``, not by ``QuerySet.update()``), but also defaults to
+    the current time. ``auto_now`` fields cannot have a default, so fixtures
+    written before the field existed could not be loaded: ``loaddata`` saves
+    rows in raw mode, without calling ``pre_save()``.
+    """
+
+    def __init__(self, *args, **kwargs):
+        kwargs.setdefault('default', timezone.now)
+        kwargs.setdefault('editable', False)
+        kwargs.setdefault('db_index', True)
+        super().__init__(*args, **kwargs)
+
+    def pre_save(self, model_instance, add):
+        value = timezone.now()
+        setattr(model_instance, self.attname, value)
+        return value
@@ -0,0 +1,59 @@
+"""
+Generation markers shared by the workers.
+
+Workers keep state derived from the database (the membership indexes in
+memory, the sitemap chunks in the shared cache) and must learn when another
+worker changed the data behind it. Each kind of state has a named marker in
+the ``generations`` cache, replaced on every change:
+
+- Markers are random values, never counters: a marker lost (an emptied
+  cache directory) then written again can not match a generation a worker
+  already knows.
+- A missing marker is read as None, not as a first generation.
+- The ``generations`` cache only holds these few keys, written when the
+  data changes, so no per-request traffic culls them.
+
+Functions:
+    current: Return the current generation of a name
+    bump: Start a new generation of a name
+"""
+import uuid
+
+from django.core.cache import caches
+
+# Cache alias holding the markers, never culled
+GENERATION_CACHE = 'generations'
+KEY_PREFIX = 'generation'
+
+
+def _key(name):
+    """Return the cache key of the marker of a name."""
+    return f'{KEY_PREFIX}:{name}'
+
+
+def current(name):
+    """
+    Return the current generation of a name.
+
+    Args:
+        name (str): Name of the state, such as ``membership:lettings``.
+
+    Returns:
+        str: Marker replaced on every change, None if never set or lost.
+    """
+    return caches[GENERATION_CACHE].get(_key(name))
+
+
+def bump(name):
+    """
+    Start a new generation of a name, seen by every worker.
+
+    Args:
+        name (str): Name of the state.
+
+    Returns:
+        str: The new marker.
+    """
+    marker = uuid.uuid4().hex
+    caches[GENERATION_CACHE].set(_key(name), marker, timeout=None)
+    return marker
@@ -0,0 +1,362 @@
+"""
+HTTP load generator for a locally started server.
+
+Load tests replay weighted scenarios, each a sequence of requests such as
+home page, lettings index, then a letting. Scenario files are JSON:
+
+.. code-block:: json
+
+    {"scenarios": [
+        {"name": "browse", "weight": 5, "steps": [
+            {"name": "home", "path": "/"},
+            {"name": "letting", "path": "/lettings/{letting_id}/"}
+        ]},
+        {"name": "scan", "weight": 1, "steps": [
+            {"name": "missing", "path": "/lettings/{missing_letting_id}/",
+             "expect": 404}
+        ]}
+    ]}
+
+Paths may use the placeholders of ``PLACEHOLDERS``, drawn once per
+scenario run from the values given to ``run_load``. A response whose status
+differs from ``expect`` (200 by default), or a failed connection, counts
+as an error.
+
+Workers are threads keeping one HTTP connection alive each. The request
+rate is capped by handing out send slots ``1 / rate`` seconds apart.
+
+Functions:
+    load_scenarios: Read and validate a scenario file
+    sample_values: Draw placeholder values from the database
+    run_load: Replay the scenarios against a server
+    start_server: Start a server process and wait until it answers
+"""
+import http.client
+import json
+import logging
+import random
+import shlex
+import string
+import subprocess
+import threading
+import time
+from pathlib import Path
+from urllib.parse import urlsplit
+
+from django.db.models import Max, Min
+
+from lettings.models import Letting
+from oc_lettings_site.benchmark import percentile
+from profiles.models import Profile
+
+# Configure logger for this module
+logger = logging.getLogger(__name__)
+
+PLACEHOLDERS = ('letting_id', 'username', 'missing_letting_id', 'missing_username')
+
+# Seconds before a request is abandoned
+REQUEST_TIMEOUT = 30
+
+DEFAULT_SCENARIOS = Path(__file__).resolve().parent / 'loadtest_scenarios.json'
+
+
+def load_scenarios(path):
+    """
+    Read a scenario file.
+
+    Args:
+        path (str | Path): JSON scenario file.
+
+    Returns:
+        list: Scenarios, each with ``name``, ``weight`` and ``steps``.
+
+    Raises:
+        ValueError: If the file is not a valid scenario file.
+    """
+    with open(path) as stream:
+        scenarios = json.load(stream).get('scenarios')
+    if not scenarios:
+        raise ValueError(f"{path} defines no scenarios")
+    for scenario in scenarios:
+        if not scenario.get('steps'):
+            raise ValueError(f"Scenario {scenario.get('name')!r} has no steps")
+        if scenario.setdefault('weight', 1) <= 0:
+            raise ValueError(f"Scenario {scenario.get('name')!r} needs a positive weight")
+        for step in scenario['steps']:
+            step.setdefault('name', step['path'])
+            step.setdefault('expect', 200)
+    return scenarios
+
+
+def _sample_ids(queryset, count, rng):
+    """Return up to ``count`` existing IDs drawn over the whole table."""
+    bounds = queryset.aggregate(low=Min('id'), high=Max('id'))
+    if bounds['low'] is None:
+        return []
+    candidates = range(bounds['low'], bounds['high'] + 1)
+    drawn = rng.sample(candidates, min(count, len(candidates)))
+    return sorted(queryset.filter(id__in=drawn).values_list('id', flat=True))
+
+
+def sample_values(count=1000, seed=0):
+    """
+    Draw placeholder values from the database.
+
+    Args:
+        count (int): Maximum number of values per placeholder.
+        seed (int): Seed of the draws.
+
+    Returns:
+        dict: Lists of values by placeholder name.
+    """
+    rng = random.Random(seed)
+    letting_ids = _sample_ids(Letting.objects.all(), count, rng)
+    profile_ids = _sample_ids(Profile.objects.all(), count, rng)
+    usernames = list(
+        Profile.objects.filter(id__in=profile_ids).values_list('user__username', flat=True)
+    )
+    return {
+        'letting_id': letting_ids,
+        'username': usernames,
+        # Far above any real ID, but below the converter limits
+        'missing_letting_id': [10 ** 9 + rng.randrange(10 ** 6) for _ in range(count)],
+        'missing_username': [f'missing-{rng.randrange(10 ** 9)}' for _ in range(count)],
+    }
+
+
+def _placeholders(scenario):
+    """Return the placeholder names used by the paths of a scenario."""
+    return {
+        field for step in scenario['steps']
+        for _, field, _, _ in string.Formatter().parse(step['path']) if field
+    }
+
+
+class _Pacer:
+    """Hand out send times ``1 / rate`` seconds apart, or none at all."""
+
+    def __init__(self, rate):
+        self.interval = 1 / rate if rate else 0
+        self.next_slot = time.perf_counter()
+        self.lock = threading.Lock()
+
+    def wait(self):
+        if not self.interval:
+            return
+        with self.lock:
+            slot = max(self.next_slot, time.perf_counter())
+            self.next_slot = slot + self.interval
+        delay = slot - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+
+
+class _Worker(threading.Thread):
+    """Thread replaying scenarios over one keep-alive connection."""
+
+    def __init__(self, number, url, scenarios, values, pacer, deadline, budget, seed):
+        super().__init__(name=f'loadtest-{number}', daemon=True)
+        self.host = urlsplit(url)
+        self.scenarios = scenarios
+        self.weights = [scenario['weight'] for scenario in scenarios]
+        self.values = values
+        self.pacer = pacer
+        self.deadline = deadline
+        self.budget = budget
+        self.rng = random.Random(f'{seed}:{number}')
+        self.connection = None
+        # (scenario, step, status or None, latency in seconds)
+        self.samples = []
+
+    def connect(self):
+        connection_class = (http.client.HTTPSConnection if self.host.scheme == 'https'
+                            else http.client.HTTPConnection)
+        self.connection = connection_class(self.host.hostname, self.host.port,
+                                           timeout=REQUEST_TIMEOUT)
+
+    def request(self, path):
+        """Send a GET request and return its status, None when it failed."""
+        if self.connection is None:
+            self.connect()
+        try:
+            self.connection.request('GET', self.host.path.rstrip('/') + path,
+                                    headers={'User-Agent': 'oc-lettings-loadtest'})
+            response = self.connection.getresponse()
+            response.read()
+            if response.will_close:
+                self.connection.close()
+                self.connection = None
+            return response.status
+        except (OSError, http.client.HTTPException) as e:
+            logger.debug("Load test request %s failed: %s", path, e)
+            self.connection.close()
+            self.connection = None
+            return None
+
+    def placeholder_values(self):
+        values = {}
+        for name in PLACEHOLDERS:
+            choices = self.values.get(name)
+            if choices:
+                values[name] = self.rng.choice(choices)
+        return values
+
+    def run(self):
+        try:
+            while self.run_scenario():
+                pass
+        finally:
+            if self.connection is not None:
+                self.connection.close()
+
+    def run_scenario(self):
+        """Replay a scenario; return False once the test is over."""
+        scenario = self.rng.choices(self.scenarios, weights=self.weights)[0]
+        values = self.placeholder_values()
+        for step in scenario['steps']:
+            if time.perf_counter() >= self.deadline or not self.budget.take():
+                return False
+            self.pacer.wait()
+            start = time.perf_counter()
+            status = self.request(step['path'].format(**values))
+            self.samples.append((scenario['name'], step, status, time.perf_counter() - start))
+            if status is None:
+                # The rest of the scenario depends on this page
+                break
+        return True
+
+
+class _Budget:
+    """Number of requests left to send, shared by the workers."""
+
+    def __init__(self, total):
+        self.left = total
+        self.lock = threading.Lock()
+
+    def take(self):
+        if self.left is None:
+            return True
+        with self.lock:
+            if self.left <= 0:
+                return False
+            self.left -= 1
+            return True
+
+
+def _summary(samples, elapsed):
+    """Return the statistics of some samples."""
+    latencies = [sample[3] * 1000 for sample in samples]
+    errors = sum(1 for _, step, status, _ in samples if status != step['expect'])
+    return {
+        'requests': len(samples),
+        'errors': errors,
+        'error_rate': round(errors / len(samples), 4) if samples else 0.0,
+        'throughput_rps': round(len(samples) / elapsed, 2) if elapsed else 0.0,
+        'p50_ms': round(percentile(latencies, 0.50), 3),
+        'p95_ms': round(percentile(latencies, 0.95), 3),
+        'p99_ms': round(percentile(latencies, 0.99), 3),
+        'max_ms': round(max(latencies, default=0.0), 3),
+    }
+
+
+def run_load(url, scenarios, values, concurrency=10, rate=0, duration=30,
+             requests=None, seed=0):
+    """
+    Replay weighted scenarios against a server.
+
+    Args:
+        url (str): Base URL of the server, such as ``http://127.0.0.1:8000``.
+        scenarios (list): Scenarios returned by ``load_scenarios``.
+        values (dict): Lists of values by placeholder name.
+        concurrency (int): Number of concurrent connections.
+        rate (float): Maximum requests per second, 0 for no limit.
+        duration (float): Maximum duration of the test in seconds.
+        requests (int): Maximum number of requests, None for no limit.
+        seed (int): Seed of the scenario and placeholder draws.
+
+    Returns:
+        dict: ``meta`` information, ``total`` statistics, statistics by
+              ``steps`` name and the count of each ``statuses``.
+
+    Raises:
+        ValueError: If no scenario has values for all its placeholders.
+    """
+    playable = []
+    for scenario in scenarios:
+        missing = [name for name in _placeholders(scenario) if not values.get(name)]
+        if missing:
+            logger.warning("Load test skips scenario %s: no values for %s",
+                           scenario['name'], ', '.join(sorted(missing)))
+        else:
+            playable.append(scenario)
+    if not playable:
+        raise ValueError("No scenario can be played with the given values")
+    scenarios = playable
+
+    started = time.perf_counter()
+    pacer, budget = _Pacer(rate), _Budget(requests)
+    workers = [
+        _Worker(number, url, scenarios, values, pacer, started + duration, budget, seed)
+        for number in range(concurrency)
+    ]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    elapsed = time.perf_counter() - started
+
+    samples = [sample for worker in workers for sample in worker.samples]
+    steps = {}
+    for sample in samples:
+        steps.setdefault(f'{sample[0]}:{sample[1]["name"]}', []).append(sample)
+    statuses = {}
+    for sample in samples:
+        key = str(sample[2]) if sample[2] is not None else 'connection error'
+        statuses[key] = statuses.get(key, 0) + 1
+    return {
+        'meta': {
+            'url': url, 'concurrency': concurrency, 'rate': rate,
+            'duration_s': round(elapsed, 3), 'seed': seed,
+            'scenarios': {scenario['name']: scenario['weight'] for scenario in scenarios},
+        },
+        'total': _summary(samples, elapsed),
+        'steps': {name: _summary(step_samples, elapsed)
+                  for name, step_samples in sorted(steps.items())},
+        'statuses': statuses,
+    }
+
+
+def start_server(command, url, timeout=30):
+    """
+    Start a server process and wait until it answers.
+
+    Args:
+        command (str): Shell-like command line, such as
+                       ``gunicorn oc_lettings_site.wsgi -w 4``.
+        url (str): Base URL the server answers on.
+        timeout (float): Seconds to wait for the first response.
+
+    Returns:
+        Popen: The server process.
+
+    Raises:
+        RuntimeError: If the server exits or does not answer in time.
+    """
+    process = subprocess.Popen(shlex.split(command))
+    host = urlsplit(url)
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Server exited with status {process.returncode}")
+        connection = http.client.HTTPConnection(host.hostname, host.port, timeout=1)
+        try:
+            connection.request('GET', host.path or '/')
+            connection.getresponse().read()
+            return process
+        except OSError:
+            time.sleep(0.2)
+        finally:
+            connection.close()
+    process.terminate()
+    process.wait()
+    raise RuntimeError(f"Server did not answer on {url} within {timeout}s")
@@ -0,0 +1,194 @@
+"""
+Aggregation of repeated log warnings for the OC Lettings Site project.
+
+A scanner requesting thousands of missing URLs produces the same few
+warnings over and over (``Not Found: %s``, ``404 Error: URL='%s' ...``), each
+one written to the log file and sent to Sentry. ``AggregatingFilter`` is
+attached to the logging handlers and lets through only the first records
+of each (logger, message template) pair during a time window, plus a cap on
+the total number of records per window. The suppressed records are counted
+and reported in a single summary warning when the window ends: a daemon
+timer, started by the first record suppressed in a window, reports it even
+when no record follows, and the windows still open are reported when the
+interpreter exits.
+
+Only warnings are aggregated: records below ``WARNING`` (the access log of
+the views, read back by the cache warming) and at ``ERROR`` level and above
+are never counted nor suppressed. Messages must be
+logged with ``%``-style arguments so that records differing only by their
+arguments share the same template.
+
+Classes:
+    AggregatingFilter: Deduplicating, rate-limiting logging filter
+
+Functions:
+    flush_all: Report the suppressed records of every open window
+"""
+import atexit
+import logging
+import threading
+import time
+import weakref
+from collections import Counter
+
+# Configure logger for this module
+logger = logging.getLogger(__name__)
+
+# Attribute marking the summary records, which are never filtered
+SUMMARY_ATTR = 'log_aggregation_summary'
+
+# Attribute caching the decision on a record shared by several handlers
+DECISION_ATTR = '_log_aggregation_allowed'
+
+# Filters whose open window is reported at exit
+_filters = weakref.WeakSet()
+
+
+@atexit.register
+def flush_all():
+    """Report the suppressed records of the windows still open, at exit."""
+    for aggregating in list(_filters):
+        aggregating.flush()
+
+
+class AggregatingFilter(logging.Filter):
+    """
+    Pass the first records of each message template per time window.
+
+    The same instance is usually shared by several handlers, so the decision
+    taken for a record is stored on it and reused by the other handlers.
+
+    Attributes:
+        window (float): Length of an aggregation window in seconds.
+        per_key (int): Records passed per (logger, template) and window.
+        max_events (int): Records passed per window, all templates included.
+        min_level (int): Records below this level always pass, uncounted.
+        max_level (int): Records at or above this level always pass.
+        summary_size (int): Number of templates detailed in the summary.
+    """
+
+    def __init__(self, window=60, per_key=1, max_events=100, min_level='WARNING',
+                 max_level='ERROR', summary_size=10, clock=time.monotonic):
+        super().__init__()
+        self.window = float(window)
+        self.per_key = int(per_key)
+        self.max_events = int(max_events)
+        self.min_level = (
+            min_level if isinstance(min_level, int) else logging.getLevelName(min_level)
+        )
+        self.max_level = (
+            max_level if isinstance(max_level, int) else logging.getLevelName(max_level)
+        )
+        self.summary_size = int(summary_size)
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._window_start = clock()
+        self._passed = 0
+        self._counts = Counter()
+        self._suppressed = Counter()
+        self._timer = None
+        _filters.add(self)
+
+    def filter(self, record):
+        """
+        Decide whether a record is emitted.
+
+        Args:
+            record (LogRecord): The record being handled.
+
+        Returns:
+            bool: False when the record is counted instead of emitted.
+        """
+        if not self.min_level <= record.levelno < self.max_level:
+            return True
+        if getattr(record, SUMMARY_ATTR, False):
+            return True
+        allowed = getattr(record, DECISION_ATTR, None)
+        if allowed is not None:
+            return allowed
+
+        key = (record.name, str(record.msg))
+        with self._lock:
+            summary = self._rotate() if self.clock() - self._window_start >= self.window else None
+            self._counts[key] += 1
+            allowed = self._counts[key] <= self.per_key and self._passed < self.max_events
+            if allowed:
+                self._passed += 1
+            else:
+                self._suppressed[key] += 1
+                self._schedule()
+
+        setattr(record, DECISION_ATTR, allowed)
+        if summary:
+            self._report(*summary)
+        return allowed
+
+    def flush(self):
+        """Close the current window, reporting its suppressed records."""
+        with self._lock:
+            summary = self._rotate()
+        if summary:
+            self._report(*summary)
+
+    def _schedule(self):
+        """Start the timer reporting the current window; lock held."""
+        if self._timer is not None:
+            return
+        delay = max(0.0, self._window_start + self.window - self.clock())
+        self._timer = threading.Timer(delay, self._expire)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _expire(self):
+        """Report the window once it ended, unless a record already did."""
+        with self._lock:
+            self._timer = None
+            if self.clock() - self._window_start >= self.window:
+                summary = self._rotate()
+            else:
+                summary = None
+                if self._suppressed:
+                    self._schedule()
+        if summary:
+            self._report(*summary)
+
+    def _rotate(self):
+        """
+        Start a new window; must be called with the lock held.
+
+        Returns:
+            tuple: ``(elapsed, suppressed)`` for the closed window, or None
+                   when no record was suppressed.
+        """
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        now = self.clock()
+        elapsed = now - self._window_start
+        suppressed = self._suppressed
+        self._window_start = now
+        self._passed = 0
+        self._counts = Counter()
+        self._suppressed = Counter()
+        return (elapsed, suppressed) if suppressed else None
+
+    def _report(self, elapsed, suppressed):
+        """
+        Log the summary of a closed window.
+
+        Args:
+            elapsed (float): Length of the closed window in seconds.
+            suppressed (Counter): Suppressed records by (logger, template).
+        """
+        details = '; '.join(
+            f"{name}: {template!r} x{count}"
+            for (name, template), count in suppressed.most_common(self.summary_size)
+        )
+        others = len(suppressed) - self.summary_size
+        if others > 0:
+            details += f"; and {others} other message(s)"
+        logger.warning(
+            "Suppressed %d repeated log record(s) in the last %.0fs: %s",
+            sum(suppressed.values()), elapsed, details,
+            extra={SUMMARY_ATTR: True},
+        )
@@ -0,0 +1,180 @@
+"""
+Management command measuring the rendering time of the site pages.
+
+Every page is rendered from in-memory rows, so only the template
+layer is measured, under three configurations: loaders reading and
+compiling the templates on each render, the cached loader, and the cached
+loader with the ``base.html`` fragments cached.
+
+Usage:
+    python manage.py bench_templates
+    python manage.py bench_templates --iterations 2000
+"""
+import time
+from collections import namedtuple
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.core.management.base import BaseCommand
+from django.template.backends.django import DjangoTemplates
+from django.test import RequestFactory, override_settings
+
+from lettings.models import Address, Letting
+from profiles.models import Profile
+
+FRAGMENTS_BACKEND = 'django.core.cache.backends.locmem.LocMemCache'
+DUMMY_BACKEND = 'django.core.cache.backends.dummy.DummyCache'
+
+LettingRow = namedtuple('LettingRow', ['id', 'title'])
+ProfileRow = namedtuple('ProfileRow', ['username'])
+
+
+def sample_pages(rows=10):
+    """
+    Build the template name and context of every page.
+
+    Args:
+        rows (int): Number of items listed on the index pages.
+
+    Returns:
+        list: ``(path, template_name, context)`` tuples.
+    """
+    lettings = [
+        Letting(id=i, title=f'Letting {i}', address=Address(
+            id=i, number=i, street=f'Street {i}', city='City', state='ST',
+            zip_code=10000 + i, country_iso_code='USA',
+        ))
+        for i in range(1, rows + 1)
+    ]
+    profiles = [
+        Profile(id=i, favorite_city='City', user=User(
+            id=i, username=f'user{i}', first_name='First', last_name='Last',
+            email=f'user{i}@example.com',
+        ))
+        for i in range(1, rows + 1)
+    ]
+    # The index views list named tuples of the displayed columns
+    letting_rows = [LettingRow(letting.id, letting.title) for letting in lettings]
+    profile_rows = [ProfileRow(profile.user.username) for profile in profiles]
+    return [
+        ('/', 'index.html', {}),
+        ('/lettings/', 'lettings/index.html', {'lettings_list': letting_rows}),
+        ('/lettings/1/', 'lettings/letting.html',
+         {'title': lettings[0].title, 'address': lettings[0].address}),
+        ('/profiles/', 'profiles/index.html', {'profiles_list': profile_rows}),
+        ('/profiles/user1/', 'profiles/profile.html', {'profile': profiles[0]}),
+    ]
+
+
+def build_engine(cached_loader):
+    """
+    Build a template engine configured like the project one.
+
+    Args:
+        cached_loader (bool): Whether compiled templates are kept in memory.
+
+    Returns:
+        DjangoTemplates: The template backend.
+    """
+    config = settings.TEMPLATES[0]
+    options = dict(config.get('OPTIONS', {}))
+    loaders = settings.TEMPLATE_LOADERS
+    options['loaders'] = (
+        [('django.template.loaders.cached.Loader', loaders)] if cached_loader else loaders
+    )
+    return DjangoTemplates({
+        'NAME': 'bench',
+        'DIRS': config.get('DIRS', []),
+        'APP_DIRS': False,
+        'OPTIONS': options,
+    })
+
+
+def measure(engine, pages, iterations):
+    """
+    Render every page repeatedly and return the mean time per page.
+
+    Args:
+        engine (DjangoTemplates): The template backend.
+        pages (list): Pages returned by ``sample_pages``.
+        iterations (int): Number of renders of each page.
+
+    Returns:
+        dict: Mean rendering time in microseconds, by page path.
+    """
+    factory = RequestFactory()
+    results = {}
+    for path, template_name, context in pages:
+        request = factory.get(path)
+        # Warm-up render, filling the loader and fragment caches
+        engine.get_template(template_name).render(context, request)
+        start = time.perf_counter()
+        for _ in range(iterations):
+            engine.get_template(template_name).render(context, request)
+        results[path] = (time.perf_counter() - start) / iterations * 1e6
+    return results
+
+
+def run(iterations=500, rows=10):
+    """
+    Measure the pages under each template caching configuration.
+
+    Args:
+        iterations (int): Number of renders of each page.
+        rows (int): Number of items listed on the index pages.
+
+    Returns:
+        dict: Mean rendering time per page in microseconds, by configuration.
+    """
+    pages = sample_pages(rows)
+    configurations = [
+        ('uncached', False, DUMMY_BACKEND),
+        ('cached loader', True, DUMMY_BACKEND),
+        ('cached loader + fragments', True, FRAGMENTS_BACKEND),
+    ]
+    report = {}
+    for name, cached_loader, backend in configurations:
+        fragments = {'BACKEND': backend, 'LOCATION': 'bench-templates'}
+        with override_settings(CACHES={**settings.CACHES, 'template_fragments': fragments}):
+            caches['template_fragments'].clear()
+            report[name] = measure(build_engine(cached_loader), pages, iterations)
+    return report
+
+
+class Command(BaseCommand):
+    """Report the rendering time of each page by template caching setup."""
+
+    help = (
+        "Benchmark the page templates without loader caching, with the "
+        "cached loader and with the cached layout fragments."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--iterations', type=int, default=500,
+            help="Number of renders of each page.",
+        )
+        parser.add_argument(
+            '--rows', type=int, default=10,
+            help="Number of items listed on the index pages.",
+        )
+
+    def handle(self, *args, **options):
+        report = run(options['iterations'], options['rows'])
+        names = list(report)
+        paths = list(report[names[0]])
+
+        self.stdout.write(f"{'page':<18}" + ''.join(f"{name:>28}" for name in names))
+        for path in paths:
+            self.stdout.write(
+                f"{path:<18}" + ''.join(f"{report[name][path]:>25.1f} µs" for name in names)
+            )
+        means = {name: sum(times.values()) / len(times) for name, times in report.items()}
+        self.stdout.write(
+            f"{'mean':<18}" + ''.join(f"{means[name]:>25.1f} µs" for name in names)
+        )
+        speedup = means[names[0]] / means[names[-1]]
+        self.stdout.write(self.style.SUCCESS(
+            f"Cached loader and fragments render pages {speedup:.1f}x faster"
+        ))
@@ -0,0 +1,106 @@
+"""
+Management command benchmarking every view against synthetic catalogues.
+
+A throwaway test database is created, seeded with a deterministic
+synthetic catalogue of each requested size, and every view is measured.
+The reports are written as JSON, optionally compared with a previous run.
+
+Usage:
+    python manage.py bench_views
+    python manage.py bench_views --rows 10000 100000 1000000 --output bench.json
+    python manage.py bench_views --compare previous.json
+"""
+import json
+import logging
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+from oc_lettings_site import synthetic
+from oc_lettings_site.benchmark import compare, run_benchmark
+
+
+class Command(BaseCommand):
+    """Measure the latency, queries and memory of every view."""
+
+    help = (
+        "Seed synthetic catalogues of the given sizes in a test database and "
+        "report p50/p95/p99 latency, query counts and peak memory per view."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--rows', type=int, nargs='+', default=[10000],
+            help="Catalogue sizes (lettings and profiles) to benchmark.",
+        )
+        parser.add_argument(
+            '--iterations', type=int, default=50,
+            help="Number of timed requests per view.",
+        )
+        parser.add_argument('--cases', nargs='+', help="Only run these cases.")
+        parser.add_argument(
+            '--seed', type=int, default=synthetic.DEFAULT_SEED,
+            help="Seed of the synthetic data and of the sampled pages.",
+        )
+        parser.add_argument(
+            '--output', default='bench_results.json',
+            help="JSON file receiving the reports.",
+        )
+        parser.add_argument('--compare', help="Previous JSON report to compare with.")
+
+    def handle(self, *args, **options):
+        previous = None
+        if options['compare']:
+            try:
+                previous = json.loads(Path(options['compare']).read_text())
+            except (OSError, ValueError) as e:
+                raise CommandError(f"Cannot read {options['compare']}: {e}")
+
+        setup_test_environment()
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        # Request logs would dominate the measurements
+        logging.disable(logging.INFO)
+        try:
+            reports = [self.bench(rows, options) for rows in sorted(options['rows'])]
+        finally:
+            logging.disable(logging.NOTSET)
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+        Path(options['output']).write_text(json.dumps(reports, indent=2))
+        self.stdout.write(self.style.SUCCESS(f"Reports written to {options['output']}"))
+        if previous is not None:
+            self.report_changes(previous, reports)
+
+    def bench(self, rows, options):
+        """Seed the catalogue up to ``rows`` entries and measure every view."""
+        self.stdout.write(f"Seeding {rows} rows...")
+        synthetic.seed(rows, seed=options['seed'])
+        self.stdout.write(
+            f"{'case':<40}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}"
+            f"{'queries':>9}{'peak KiB':>10}"
+        )
+
+        def progress(name, result):
+            self.stdout.write(
+                f"{name:<40}{result['p50_ms']:>10.2f}{result['p95_ms']:>10.2f}"
+                f"{result['p99_ms']:>10.2f}{result['queries']:>9.1f}"
+                f"{result['peak_memory_kib']:>10.1f}"
+            )
+
+        return run_benchmark(rows, options['iterations'], cases=options['cases'],
+                             seed=options['seed'], progress=progress)
+
+    def report_changes(self, previous, reports):
+        """Print the median latency change of every case, by catalogue size."""
+        previous_by_rows = {report['meta']['rows']: report for report in previous}
+        for report in reports:
+            before = previous_by_rows.get(report['meta']['rows'])
+            if before is None:
+                continue
+            self.stdout.write(f"Change of p50 at {report['meta']['rows']} rows "
+                              f"(vs {before['meta']['commit']}):")
+            for name, change in compare(before, report).items():
+                self.stdout.write(f"  {name:<40}{change:+.1%}")
@@ -0,0 +1,121 @@
+"""
+Management command deleting lettings or addresses in batches.
+
+Rows are deleted with plain SQL statements, a bounded transaction per
+batch, so the command keeps a small memory footprint and short locks
+whatever the number of rows (see ``lettings.bulk``).
+
+Usage:
+    python manage.py bulk_delete lettings --ids 4 8 15
+    python manage.py bulk_delete addresses --filter city=Austin --dry-run
+    python manage.py bulk_delete lettings --all --keep-addresses
+    python manage.py bulk_delete addresses --orphans
+"""
+import time
+
+from django.core.exceptions import FieldError, ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS
+
+from lettings import bulk
+from lettings.models import Address, Letting
+
+MODELS = {'lettings': Letting, 'addresses': Address}
+
+
+class Command(BaseCommand):
+    """Delete lettings or addresses in batches of SQL statements."""
+
+    help = (
+        "Delete lettings (with their addresses) or addresses (with their "
+        "lettings) in batches, or the addresses left without letting."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('model', choices=sorted(MODELS), help="Rows to delete.")
+        parser.add_argument(
+            '--ids', type=int, nargs='+', default=[],
+            help="IDs of the rows to delete.",
+        )
+        parser.add_argument(
+            '--filter', action='append', default=[], metavar='FIELD=VALUE',
+            help="Delete the rows matching a lookup, such as city=Austin. Repeatable.",
+        )
+        parser.add_argument(
+            '--all', action='store_true',
+            help="Delete every row; required when no IDs nor filters are given.",
+        )
+        parser.add_argument(
+            '--orphans', action='store_true',
+            help="Delete the addresses without letting (addresses only).",
+        )
+        parser.add_argument(
+            '--keep-addresses', action='store_true',
+            help="Keep the addresses of the deleted lettings.",
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=bulk.DEFAULT_BATCH_SIZE,
+            help="Number of rows deleted per transaction.",
+        )
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help="Count the rows to delete without deleting them.",
+        )
+        parser.add_argument(
+            '--database', default=DEFAULT_DB_ALIAS,
+            help="Database to delete from.",
+        )
+
+    def queryset(self, options):
+        """Return the rows selected by the options."""
+        model = MODELS[options['model']]
+        queryset = model.objects.using(options['database'])
+        if options['orphans']:
+            if model is not Address:
+                raise CommandError("--orphans only applies to addresses.")
+        elif not (options['ids'] or options['filter'] or options['all']):
+            raise CommandError("Give --ids, --filter, --orphans or --all.")
+        if options['ids']:
+            queryset = queryset.filter(id__in=options['ids'])
+        for condition in options['filter']:
+            field, sep, value = condition.partition('=')
+            if not sep:
+                raise CommandError(f"Invalid filter {condition!r}, expected FIELD=VALUE.")
+            try:
+                queryset = queryset.filter(**{field: value})
+            except (FieldError, ValidationError, ValueError) as e:
+                raise CommandError(f"Invalid filter {condition!r}: {e}")
+        return queryset
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError("--batch-size must be at least 1.")
+        queryset = self.queryset(options)
+
+        if options['dry_run']:
+            if options['orphans']:
+                queryset = queryset.filter(letting__isnull=True)
+            self.stdout.write(f"{queryset.count()} {options['model']} would be deleted.")
+            return
+
+        def progress(counts):
+            if options['verbosity'] >= 2:
+                self.stdout.write(f"{counts['lettings']} lettings, "
+                                  f"{counts['addresses']} addresses")
+
+        started = time.perf_counter()
+        if options['orphans']:
+            counts = bulk.delete_orphan_addresses(queryset, batch_size=options['batch_size'],
+                                                  progress=progress)
+        elif options['model'] == 'lettings':
+            counts = bulk.delete_lettings(
+                queryset, batch_size=options['batch_size'],
+                delete_addresses=not options['keep_addresses'], progress=progress,
+            )
+        else:
+            counts = bulk.delete_addresses(queryset, batch_size=options['batch_size'],
+                                           progress=progress)
+        self.stdout.write(self.style.SUCCESS(
+            f"Deleted {counts['lettings']} lettings and {counts['addresses']} addresses "
+            f"in {time.perf_counter() - started:.1f}s"
+        ))
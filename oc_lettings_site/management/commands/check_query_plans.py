@@ -0,0 +1,63 @@
+"""
+Management command checking the query plans of the hot views.
+
+Every query of the lettings and profiles views is explained by the
+database; the command fails when a plan reads a whole table or sorts rows
+outside of an index (see ``oc_lettings_site.query_plans``).
+
+Usage:
+    python manage.py check_query_plans
+    python manage.py check_query_plans --view lettings:letting -v 2
+"""
+import logging
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS
+
+from oc_lettings_site.query_plans import HOT_VIEWS, check_query_plans
+
+
+class Command(BaseCommand):
+    """Fail when a query of a hot view regresses to a full table scan."""
+
+    help = (
+        "Explain every query of the lettings and profiles views and fail "
+        "if one reads a whole table or sorts without an index."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--view', action='append', dest='views',
+            choices=[name for name, *_ in HOT_VIEWS],
+            help="View to check (repeatable); all of them by default.",
+        )
+        parser.add_argument(
+            '--database', default=DEFAULT_DB_ALIAS,
+            help="Database to check the plans on.",
+        )
+
+    def handle(self, *args, **options):
+        # The views log every request
+        logging.disable(logging.INFO)
+        try:
+            reports = check_query_plans(options['views'], using=options['database'])
+        except NotImplementedError as e:
+            raise CommandError(str(e))
+        finally:
+            logging.disable(logging.NOTSET)
+
+        failures = 0
+        for report in reports:
+            if report['problems']:
+                failures += 1
+                self.stderr.write(f"{report['view']}: {report['sql']}")
+                for line in report['problems']:
+                    self.stderr.write(f"    {line}")
+            elif options['verbosity'] >= 2:
+                self.stdout.write(f"{report['view']}: {report['sql']}")
+                for line in report['plan']:
+                    self.stdout.write(f"    {line}")
+        if failures:
+            raise CommandError(f"{failures} of {len(reports)} queries read a whole table "
+                               "or sort without an index.")
+        self.stdout.write(self.style.SUCCESS(f"{len(reports)} query plans checked."))
@@ -0,0 +1,28 @@
+"""
+Project override of ``collectstatic`` purging the theme stylesheet first.
+
+The purged and critical stylesheets are regenerated from the templates
+before the files are collected, so they are hashed and compressed with the
+rest of the static files. Use ``--skip-css-purge`` to collect as is.
+"""
+from django.contrib.staticfiles.management.commands.collectstatic import (
+    Command as CollectStaticCommand,
+)
+from django.core.management import call_command
+
+
+class Command(CollectStaticCommand):
+    """``collectstatic`` running ``purge_css`` beforehand."""
+
+    def add_arguments(self, parser):
+        super().add_arguments(parser)
+        parser.add_argument(
+            '--skip-css-purge', action='store_true',
+            help="Do not regenerate the purged stylesheets before collecting.",
+        )
+
+    def handle(self, **options):
+        if not options['skip_css_purge'] and not options['dry_run']:
+            call_command('purge_css', verbosity=options['verbosity'],
+                         stdout=self.stdout)
+        return super().handle(**options)
@@ -0,0 +1,54 @@
+"""
+Management command streaming the application data to an NDJSON file.
+
+Usage:
+    python manage.py dumpdata_ndjson backup.ndjson.gz
+    python manage.py dumpdata_ndjson lettings.ndjson --models lettings.address lettings.letting
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from oc_lettings_site.datastream import (
+    DEFAULT_BATCH_SIZE,
+    DEFAULT_MODELS,
+    dump_models,
+    open_stream,
+    resolve_models,
+)
+
+
+class Command(BaseCommand):
+    """Dump users, addresses, lettings and profiles as NDJSON."""
+
+    help = (
+        "Stream users, addresses, lettings and profiles to an NDJSON file "
+        "(gzip or xz compressed when the name ends with .gz or .xz)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('output', help="Destination file (.ndjson, .ndjson.gz, .ndjson.xz).")
+        parser.add_argument(
+            '--models', nargs='+', default=list(DEFAULT_MODELS),
+            help="Model labels to dump, sorted by dependency automatically.",
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+            help="Number of rows fetched from the database at once.",
+        )
+        parser.add_argument('--database', default='default', help="Database alias to read from.")
+
+    def handle(self, *args, **options):
+        try:
+            models = resolve_models(options['models'])
+        except LookupError as e:
+            raise CommandError(str(e))
+
+        with open_stream(options['output'], 'wt') as stream:
+            counts = dump_models(
+                stream, models, batch_size=options['batch_size'], using=options['database'],
+            )
+
+        for label, count in counts.items():
+            self.stdout.write(f"{label}: {count} row(s)")
+        self.stdout.write(self.style.SUCCESS(
+            f"Dumped {sum(counts.values())} row(s) to {options['output']}"
+        ))
@@ -0,0 +1,52 @@
+"""
+Management command exporting the site pages as static HTML files.
+
+Usage:
+    python manage.py export_static
+    python manage.py export_static --workers 4 --full
+    python manage.py export_static --output /srv/cdn/oc-lettings
+"""
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from oc_lettings_site.static_export import export_site
+
+
+class Command(BaseCommand):
+    """Render the pages changed since the last export into static files."""
+
+    help = (
+        "Pre-render the home page, the index pages and every letting and "
+        "profile page into STATIC_EXPORT_ROOT, only re-rendering the pages "
+        "whose data changed since the last export."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--output', default=str(settings.STATIC_EXPORT_ROOT),
+            help="Export directory (defaults to STATIC_EXPORT_ROOT).",
+        )
+        parser.add_argument(
+            '--workers', type=int, default=os.cpu_count() or 1,
+            help="Number of rendering processes, 1 to render in-process.",
+        )
+        parser.add_argument(
+            '--full', action='store_true',
+            help="Render every page, even the unchanged ones.",
+        )
+
+    def handle(self, *args, **options):
+        def progress(count):
+            if options['verbosity'] >= 2:
+                self.stdout.write(f"{count} page(s) rendered")
+
+        report = export_site(
+            options['output'], workers=max(1, options['workers']),
+            full=options['full'], progress=progress,
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"Exported to {options['output']}: {report['rendered']} rendered, "
+            f"{report['unchanged']} unchanged, {report['removed']} removed"
+        ))
@@ -0,0 +1,62 @@
+"""
+Management command generating a synthetic catalogue for load tests.
+
+The catalogue is deterministic for a given seed, and an existing synthetic
+catalogue is grown rather than recreated. Every synthetic user has the
+password ``synthetic-password``.
+
+Usage:
+    python manage.py generate_data
+    python manage.py generate_data --rows 1000000 --seed 42
+"""
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS
+
+from oc_lettings_site import synthetic
+
+
+class Command(BaseCommand):
+    """Insert synthetic addresses, lettings, users and profiles."""
+
+    help = (
+        "Generate a deterministic synthetic catalogue of lettings and "
+        "profiles, growing any synthetic catalogue already in the database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--rows', type=int, default=100000,
+            help="Total number of synthetic lettings and profiles wanted.",
+        )
+        parser.add_argument(
+            '--seed', type=int, default=synthetic.DEFAULT_SEED,
+            help="Seed of the random generator.",
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=synthetic.DEFAULT_BATCH_SIZE,
+            help="Number of entries inserted per transaction.",
+        )
+        parser.add_argument(
+            '--database', default=DEFAULT_DB_ALIAS,
+            help="Database to fill.",
+        )
+
+    def handle(self, *args, **options):
+        if options['rows'] < 0 or options['batch_size'] < 1:
+            raise CommandError("--rows must be positive and --batch-size at least 1.")
+
+        def progress(count):
+            if options['verbosity'] >= 2:
+                self.stdout.write(f"{count} entries")
+
+        started = time.perf_counter()
+        created = synthetic.seed(
+            options['rows'], seed=options['seed'], batch_size=options['batch_size'],
+            progress=progress, using=options['database'],
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"Created {created} synthetic entries in {time.perf_counter() - started:.1f}s "
+            f"({synthetic.synthetic_count(options['database'])} in total)"
+        ))
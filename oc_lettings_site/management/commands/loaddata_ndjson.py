@@ -0,0 +1,64 @@
+"""
+Management command streaming an NDJSON dump back into the database.
+
+Usage:
+    python manage.py loaddata_ndjson backup.ndjson.gz
+    python manage.py loaddata_ndjson backup.ndjson --batch-size 5000 --chunk-size 50000
+"""
+from django.core.management.base import BaseCommand, CommandError
+from django.db import IntegrityError
+
+from oc_lettings_site.datastream import (
+    DEFAULT_BATCH_SIZE,
+    DEFAULT_CHUNK_SIZE,
+    load_records,
+    open_stream,
+)
+
+
+class Command(BaseCommand):
+    """Load an NDJSON dump produced by ``dumpdata_ndjson``."""
+
+    help = (
+        "Load an NDJSON dump (optionally .gz or .xz) with batched inserts "
+        "committed in chunks, without reading the whole file in memory."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('input', help="Source file (.ndjson, .ndjson.gz, .ndjson.xz).")
+        parser.add_argument(
+            '--batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+            help="Number of rows per INSERT statement.",
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+            help="Number of rows committed per transaction.",
+        )
+        parser.add_argument('--database', default='default', help="Database alias to write to.")
+
+    def handle(self, *args, **options):
+        verbosity = options['verbosity']
+
+        def progress(label, count):
+            if verbosity >= 2:
+                self.stdout.write(f"{label}: {count} row(s) loaded")
+
+        try:
+            with open_stream(options['input'], 'rt') as stream:
+                counts = load_records(
+                    stream,
+                    batch_size=options['batch_size'],
+                    chunk_size=options['chunk_size'],
+                    using=options['database'],
+                    progress=progress,
+                )
+        except FileNotFoundError:
+            raise CommandError(f"File not found: {options['input']}")
+        except (LookupError, ValueError, IntegrityError) as e:
+            raise CommandError(f"Problem loading {options['input']}: {e}")
+
+        for label, count in counts.items():
+            self.stdout.write(f"{label}: {count} row(s)")
+        self.stdout.write(self.style.SUCCESS(
+            f"Loaded {sum(counts.values())} row(s) from {options['input']}"
+        ))
@@ -0,0 +1,111 @@
+"""
+Management command load testing a locally started server.
+
+The placeholder values (letting IDs, usernames) are drawn from the
+database the server uses. The server can be started by the command
+itself, and is stopped at the end of the test.
+
+Usage:
+    python manage.py loadtest --url http://127.0.0.1:8000
+    python manage.py loadtest --server "gunicorn -b 127.0.0.1:8000 -w 4 oc_lettings_site.wsgi"
+    python manage.py loadtest --concurrency 50 --rate 200 --duration 60 --output load.json
+"""
+import json
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from oc_lettings_site import loadtest
+
+
+class Command(BaseCommand):
+    """Replay weighted scenarios and report throughput, latency and errors."""
+
+    help = (
+        "Replay the weighted scenarios of a scenario file against a local "
+        "server and report throughput, latency percentiles and error rates."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--url', default='http://127.0.0.1:8000',
+            help="Base URL of the server.",
+        )
+        parser.add_argument(
+            '--server',
+            help="Command starting the server for the test, such as a gunicorn command line.",
+        )
+        parser.add_argument(
+            '--scenarios', default=str(loadtest.DEFAULT_SCENARIOS),
+            help="JSON scenario file.",
+        )
+        parser.add_argument(
+            '--concurrency', type=int, default=10,
+            help="Number of concurrent connections.",
+        )
+        parser.add_argument(
+            '--rate', type=float, default=0,
+            help="Maximum requests per second, 0 for no limit.",
+        )
+        parser.add_argument(
+            '--duration', type=float, default=30,
+            help="Maximum duration of the test in seconds.",
+        )
+        parser.add_argument(
+            '--requests', type=int,
+            help="Maximum number of requests sent.",
+        )
+        parser.add_argument('--seed', type=int, default=0, help="Seed of the random draws.")
+        parser.add_argument('--output', help="JSON file receiving the report.")
+
+    def handle(self, *args, **options):
+        if options['concurrency'] < 1 or options['duration'] <= 0 or options['rate'] < 0:
+            raise CommandError("--concurrency and --duration must be positive, "
+                               "--rate cannot be negative.")
+        try:
+            scenarios = loadtest.load_scenarios(options['scenarios'])
+        except (OSError, ValueError, KeyError) as e:
+            raise CommandError(f"Invalid scenario file {options['scenarios']}: {e}")
+        values = loadtest.sample_values(seed=options['seed'])
+
+        server = None
+        if options['server']:
+            try:
+                server = loadtest.start_server(options['server'], options['url'])
+            except (OSError, RuntimeError) as e:
+                raise CommandError(f"Cannot start the server: {e}")
+        try:
+            report = loadtest.run_load(
+                options['url'], scenarios, values,
+                concurrency=options['concurrency'], rate=options['rate'],
+                duration=options['duration'], requests=options['requests'],
+                seed=options['seed'],
+            )
+        except ValueError as e:
+            raise CommandError(str(e))
+        finally:
+            if server is not None:
+                server.terminate()
+                server.wait()
+
+        self.print_report(report)
+        if options['output']:
+            Path(options['output']).write_text(json.dumps(report, indent=2))
+            self.stdout.write(self.style.SUCCESS(f"Report written to {options['output']}"))
+
+    def print_report(self, report):
+        """Print the statistics of every step and of the whole test."""
+        self.stdout.write(
+            f"{'step':<40}{'requests':>9}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}"
+            f"{'p99 ms':>9}{'errors':>8}"
+        )
+        rows = list(report['steps'].items()) + [('total', report['total'])]
+        for name, stats in rows:
+            self.stdout.write(
+                f"{name:<40}{stats['requests']:>9}{stats['throughput_rps']:>9.1f}"
+                f"{stats['p50_ms']:>9.1f}{stats['p95_ms']:>9.1f}{stats['p99_ms']:>9.1f}"
+                f"{stats['error_rate']:>8.1%}"
+            )
+        statuses = ', '.join(f'{status}: {count}' for status, count
+                             in sorted(report['statuses'].items()))
+        self.stdout.write(f"Statuses: {statuses}")
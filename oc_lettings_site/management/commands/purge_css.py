@@ -0,0 +1,32 @@
+"""
+Management command purging the theme stylesheet against the templates.
+
+Usage:
+    python manage.py purge_css
+"""
+from django.core.management.base import BaseCommand
+
+from oc_lettings_site.css_purge import build
+
+
+class Command(BaseCommand):
+    """Write the purged and critical stylesheets and report the reduction."""
+
+    help = (
+        "Remove the CSS rules unused by the project templates, writing a "
+        "minified stylesheet and an inlinable critical subset."
+    )
+
+    def handle(self, *args, **options):
+        report = build()
+        source = report['source']
+        for name in ('source', 'purged', 'critical'):
+            sizes = report[name]
+            self.stdout.write(
+                f"{name:>8}: {sizes['bytes']:>8} bytes "
+                f"({sizes['gzip_bytes']:>7} gzipped)"
+            )
+        reduction = 100 * (1 - report['purged']['bytes'] / source['bytes'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Purged stylesheet is {reduction:.1f}% smaller than the source"
+        ))
@@ -0,0 +1,48 @@
+"""
+Management command repairing the row counters of the lettings and profiles.
+
+The rows of every counted model are counted again and the counters that
+drifted are set to the actual count (see ``oc_lettings_site.counters``).
+With ``--check``, the counters are left as they are and the command fails
+when one drifted, for monitoring.
+
+Usage:
+    python manage.py reconcile_counters
+    python manage.py reconcile_counters --check
+"""
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS
+
+from oc_lettings_site.counters import reconcile
+
+
+class Command(BaseCommand):
+    """Count the rows of the counted models and repair their counters."""
+
+    help = "Count the lettings and profiles again and repair their counters."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check', action='store_true',
+            help="Only report the drift, and fail if a counter drifted.",
+        )
+        parser.add_argument(
+            '--database', default=DEFAULT_DB_ALIAS,
+            help="Database whose counters are reconciled.",
+        )
+
+    def handle(self, *args, **options):
+        report = reconcile(using=options['database'], dry_run=options['check'])
+        drifted = 0
+        for name, (stored, counted) in report.items():
+            if stored == counted:
+                self.stdout.write(f"{name}: {counted}")
+                continue
+            drifted += 1
+            action = "drifted" if options['check'] else "repaired"
+            self.stdout.write(self.style.WARNING(
+                f"{name}: {counted} ({action}, {'missing' if stored is None else stored} stored)"
+            ))
+        if drifted and options['check']:
+            raise CommandError(f"{drifted} counter(s) drifted.")
+        self.stdout.write(self.style.SUCCESS(f"{len(report)} counters reconciled."))
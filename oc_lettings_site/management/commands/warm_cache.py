@@ -0,0 +1,82 @@
+"""
+Management command warming the caches after a deploy.
+
+Renders the list pages, the sitemaps and the most popular letting and
+profile pages (see ``oc_lettings_site.cache_warming``), then reports the
+share of the logged detail page hits covered and the time taken.
+
+Usage:
+    python manage.py warm_cache
+    python manage.py warm_cache --top 500 --workers 8 --base-url https://example.com
+    python manage.py warm_cache --no-lists -v 2
+"""
+import logging
+
+from django.core.management.base import BaseCommand, CommandError
+
+from oc_lettings_site.cache_warming import (
+    DEFAULT_LOG_BYTES, DEFAULT_TOP, DEFAULT_WORKERS, warm_site,
+)
+
+
+class Command(BaseCommand):
+    """Render the most requested pages so that the first visitors find warm caches."""
+
+    help = (
+        "Warm the caches: render the list pages, the sitemaps and the most "
+        "popular letting and profile pages of the access log."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--top', type=int, default=DEFAULT_TOP,
+            help=f"Number of detail pages warmed ({DEFAULT_TOP} by default).",
+        )
+        parser.add_argument(
+            '--workers', type=int, default=DEFAULT_WORKERS,
+            help=f"Number of rendering threads ({DEFAULT_WORKERS} by default).",
+        )
+        parser.add_argument(
+            '--base-url',
+            help="Public URL of the site, such as https://example.com; the "
+                 "sitemaps are only warmed when given.",
+        )
+        parser.add_argument(
+            '--log', dest='log_path',
+            help="Access log ranking the pages (the django.log file by default).",
+        )
+        parser.add_argument(
+            '--log-bytes', type=int, default=DEFAULT_LOG_BYTES,
+            help="Bytes read from the end of the access log.",
+        )
+        parser.add_argument(
+            '--no-lists', action='store_false', dest='lists',
+            help="Skip the home and list pages, which read whole tables.",
+        )
+
+    def handle(self, *args, **options):
+        if options['top'] < 0 or options['workers'] < 1:
+            raise CommandError("--top must be positive and --workers at least 1.")
+        # The views log every request
+        logging.disable(logging.INFO)
+        try:
+            report = warm_site(
+                top=options['top'], workers=options['workers'],
+                base_url=options['base_url'], log_path=options['log_path'],
+                max_log_bytes=options['log_bytes'], lists=options['lists'],
+            )
+        finally:
+            logging.disable(logging.NOTSET)
+
+        if options['verbosity'] >= 2:
+            for path, (status, seconds) in report['pages'].items():
+                self.stdout.write(f"{status or 'error'} {seconds * 1000:8.1f} ms  {path}")
+        coverage = report['hit_coverage']
+        summary = (
+            f"Warmed {report['warmed']} of {len(report['pages'])} pages in "
+            f"{report['seconds']:.1f}s, {report['failed']} failed; "
+            + ("no detail page hit logged." if coverage is None
+               else f"{coverage:.0%} of the logged detail page hits covered.")
+        )
+        style = self.style.WARNING if report['failed'] else self.style.SUCCESS
+        self.stdout.write(style(summary))
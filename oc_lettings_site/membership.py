@@ -0,0 +1,329 @@
+"""
+In-memory membership filters for the OC Lettings Site project.
+
+Detail pages for random letting IDs or usernames (typically sent by
+scanners) used to query the database just to answer 404. A
+``MembershipIndex`` keeps a compact in-memory picture of the existing keys
+of a model, so that definite misses are answered without any query:
+
+- ``IdBitmap`` stores integer primary keys, one bit per possible ID.
+- ``BloomFilter`` stores strings with a small, bounded false positive rate.
+
+Both structures may answer "maybe present" for a missing key, in which case
+the view queries the database as before, but never "absent" for a key they
+were given.
+
+Each worker builds its indexes at start (``build_in_background``, called
+by the WSGI module) in a background thread, so that no request waits for a
+full table scan; until an index is built, lookups answer "maybe" and the
+database decides. A save adds its key to the index of the worker
+performing it and, once committed, starts a new generation of that index
+(``oc_lettings_site.generations``); bulk changes sending no signals call
+``invalidate()``. A worker finding a miss checks the generation before
+trusting it: when it changed, the index is rebuilt in the background while
+the current structure, with the keys added locally, keeps answering its
+hits and the database answers its misses. Each index has its own
+generation, so saving a letting does not rebuild the usernames filter.
+Deleted keys are kept as false positives.
+
+Classes:
+    IdBitmap: Set of non-negative integers stored as a bitmap
+    BloomFilter: Probabilistic set of strings
+    MembershipIndex: Membership filter of a model, invalidated and rebuilt
+
+Functions:
+    build_in_background: Start building every index of this worker
+    invalidate: Ask every worker to rebuild its indexes
+"""
+import functools
+import logging
+import math
+import random
+import threading
+from array import array
+
+from django.conf import settings
+from django.db import connections, transaction
+
+from . import generations
+
+# Configure logger for this module
+logger = logging.getLogger(__name__)
+
+# Prefix of the generation names of the indexes
+GENERATION_PREFIX = 'membership'
+
+# Bits of the hash choosing the bit pattern of a Bloom filter item
+PATTERN_BITS = 12
+
+# Blocked filters need about 30% more bits for the rate of classic ones
+BLOCK_OVERHEAD = 1.3
+
+HASH_MASK = (1 << 64) - 1
+
+# Indexes of this worker, reset by invalidate()
+_indexes = []
+
+
+class IdBitmap:
+    """
+    Set of non-negative integers stored as one bit per integer.
+
+    One million IDs take 125 KB, and the bitmap grows as larger IDs are
+    added.
+    """
+
+    def __init__(self, items=()):
+        self.bits = bytearray()
+        for item in items:
+            self.add(item)
+
+    def add(self, item):
+        """
+        Add an integer to the set.
+
+        Args:
+            item (int): Non-negative integer.
+
+        Returns:
+            bool: Always True, the bitmap never saturates.
+        """
+        index = item >> 3
+        if index >= len(self.bits):
+            self.bits.extend(bytes(index + 1 - len(self.bits)))
+        self.bits[index] |= 1 << (item & 7)
+        return True
+
+    def __contains__(self, item):
+        index = item >> 3
+        return 0 <= index < len(self.bits) and bool(self.bits[index] & (1 << (item & 7)))
+
+
+@functools.lru_cache(maxsize=None)
+def _patterns(hashes):
+    """Return the table of 64-bit words with ``hashes`` bits set."""
+    rng = random.Random(0)
+    return [
+        sum(1 << bit for bit in rng.sample(range(64), hashes))
+        for _ in range(1 << PATTERN_BITS)
+    ]
+
+
+class BloomFilter:
+    """
+    Probabilistic set of strings with a bounded false positive rate.
+
+    The filter is blocked: the bits of an item are all in one 64-bit word,
+    set from a precomputed table of patterns, so adding an item is a single
+    array update instead of one per bit. Items are hashed with ``hash()``,
+    whose seed differs between processes: a filter is never shared.
+
+    Attributes:
+        capacity (int): Number of items the filter is sized for.
+        size (int): Number of bits.
+        hashes (int): Number of bits set per item.
+        count (int): Number of items added.
+    """
+
+    def __init__(self, items=(), capacity=None, error_rate=0.01):
+        items = list(items)
+        # Leave room for the items added after the build
+        self.capacity = max(capacity or 2 * len(items), 1024)
+        bits_per_item = -math.log(error_rate) / math.log(2) ** 2
+        self.hashes = max(1, round(bits_per_item * math.log(2)))
+        self.size = 64 * math.ceil(self.capacity * bits_per_item * BLOCK_OVERHEAD / 64)
+        self.words = array('Q', bytes(self.size // 8))
+        words, patterns, blocks = self.words, _patterns(self.hashes), len(self.words)
+        pattern_mask = (1 << PATTERN_BITS) - 1
+        for item in items:
+            digest = hash(item) & HASH_MASK
+            words[(digest >> PATTERN_BITS) % blocks] |= patterns[digest & pattern_mask]
+        self.count = len(items)
+
+    def _locate(self, item):
+        """Return the word index and bit pattern of an item."""
+        digest = hash(item) & HASH_MASK
+        pattern = _patterns(self.hashes)[digest & ((1 << PATTERN_BITS) - 1)]
+        return (digest >> PATTERN_BITS) % len(self.words), pattern
+
+    def add(self, item):
+        """
+        Add a string to the filter.
+
+        Args:
+            item (str): The string to add.
+
+        Returns:
+            bool: False once more items than the capacity were added, meaning
+                  the false positive rate is no longer guaranteed.
+        """
+        index, pattern = self._locate(item)
+        self.words[index] |= pattern
+        self.count += 1
+        return self.count <= self.capacity
+
+    def __contains__(self, item):
+        index, pattern = self._locate(item)
+        return self.words[index] & pattern == pattern
+
+
+def _shared_generation(name):
+    """
+    Return the current generation of an index.
+
+    Args:
+        name (str): Name of the index.
+
+    Returns:
+        str: Marker replaced whenever the indexed table changes, or None.
+    """
+    return generations.current(f'{GENERATION_PREFIX}:{name}')
+
+
+def _bump_generation(name):
+    """Start a new generation of an index, seen by every worker."""
+    generations.bump(f'{GENERATION_PREFIX}:{name}')
+
+
+def build_in_background():
+    """Start building every index of this worker, before its first requests."""
+    for index in _indexes:
+        index.build_in_background()
+
+
+def invalidate(using=None):
+    """
+    Rebuild every index of this worker, and of the others once committed.
+
+    Must be called after changes made without model signals, such as
+    ``bulk_create`` or ``QuerySet.update``.
+
+    Args:
+        using (str): Database alias of the current transaction.
+    """
+    for index in _indexes:
+        index.invalidate(using=using)
+
+
+class MembershipIndex:
+    """
+    Membership filter over the keys of a model, built per worker.
+
+    Structures are built in a background thread, unless the
+    ``MEMBERSHIP_BACKGROUND_BUILD`` setting is False (in the tests), in
+    which case the lookup needing one builds it.
+
+    Attributes:
+        name (str): Name used in the logs and the generation name.
+    """
+
+    def __init__(self, name, load, factory):
+        """
+        Initialize the index.
+
+        Args:
+            name (str): Name used in the logs and the generation name.
+            load (callable): Return an iterable over the existing keys.
+            factory (callable): Build the filter structure from the keys.
+        """
+        self.name = name
+        self._load = load
+        self._factory = factory
+        self._lock = threading.Lock()
+        self._building = False
+        self._structure = None
+        self._generation = None
+        _indexes.append(self)
+
+    def build(self):
+        """
+        Load the keys from the database into a new structure.
+
+        Returns:
+            The new structure.
+        """
+        # Read the generation first, so that a change made during the load
+        # triggers another rebuild later
+        generation = _shared_generation(self.name)
+        structure = self._factory(self._load())
+        self._structure, self._generation = structure, generation
+        logger.info("Membership index '%s' built (generation %s)", self.name, generation)
+        return structure
+
+    def _build_thread(self):
+        """Build the structure in a background thread, then close its connections."""
+        try:
+            self.build()
+        except Exception:
+            logger.exception("Membership index '%s' build failed", self.name)
+        finally:
+            connections.close_all()
+            self._building = False
+
+    def build_in_background(self):
+        """Start building the structure unless a build is running."""
+        with self._lock:
+            if self._building:
+                return
+            self._building = True
+        threading.Thread(target=self._build_thread, daemon=True,
+                         name=f'membership-{self.name}').start()
+
+    def _refresh(self):
+        """
+        Replace an outdated or missing structure.
+
+        Returns:
+            The new structure, or None while it is built in the background.
+        """
+        if getattr(settings, 'MEMBERSHIP_BACKGROUND_BUILD', True):
+            self.build_in_background()
+            return None
+        return self.build()
+
+    def might_contain(self, key):
+        """
+        Tell whether a key may exist.
+
+        Args:
+            key: The key looked up.
+
+        Returns:
+            bool: False only when the key does not exist in the database.
+        """
+        structure = self._structure
+        if structure is not None and key in structure:
+            return True
+        if structure is None or _shared_generation(self.name) != self._generation:
+            structure = self._refresh()
+            # The database answers until the new structure is built
+            return structure is None or key in structure
+        return False
+
+    def add(self, key, using=None):
+        """
+        Record a saved key, in this worker now and in the others on commit.
+
+        Args:
+            key: The key saved.
+            using (str): Database alias of the current transaction.
+        """
+        structure = self._structure
+        if structure is not None and not structure.add(key):
+            # Saturated filter, rebuild it at the next lookup
+            self._structure = None
+        transaction.on_commit(functools.partial(_bump_generation, self.name), using=using)
+
+    def invalidate(self, using=None):
+        """
+        Rebuild the structure of this worker, and of the others once committed.
+
+        Args:
+            using (str): Database alias of the current transaction.
+        """
+        self.reset()
+        transaction.on_commit(functools.partial(_bump_generation, self.name), using=using)
+
+    def reset(self):
+        """Drop the structure of this worker, rebuilt at the next lookup."""
+        self._structure = None
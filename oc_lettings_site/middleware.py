@@ -0,0 +1,257 @@
+"""
+Middleware for the OC Lettings Site project.
+
+This module protects the workers against traffic bursts:
+
+- Each client IP gets a token bucket, stored in the ``rate_limit`` cache
+  so that every worker of the host draws from the same bucket. A client
+  without tokens left is answered 429 with a ``Retry-After`` header. That
+  cache holds nothing else: the buckets culled when too many clients are
+  active never evict other shared state.
+- The proxy's ``X-Request-Start`` header tells how long the request waited
+  before a worker picked it up. Past a budget, the client has most likely
+  given up already, so the request is answered 503 immediately instead of
+  making the queue even longer.
+
+The admin, the loopback addresses (container health checks) and the
+configured paths are never limited.
+
+It also counts the database queries of every request, and reports the
+requests running more queries than the budget of their view (see
+``oc_lettings_site.query_budget``).
+
+Classes:
+    RateLimitMiddleware: Token-bucket rate limiting and load shedding
+    QueryBudgetMiddleware: Enforcement of the view query budgets
+"""
+import ipaddress
+import logging
+import math
+import threading
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connections
+from django.http import HttpResponse
+
+from oc_lettings_site.query_budget import QueryBudgetExceeded, budget_for
+
+# Configure logger for this module
+logger = logging.getLogger(__name__)
+
+
+def parse_request_start(value):
+    """
+    Parse an ``X-Request-Start`` header into a UNIX timestamp.
+
+    Proxies send seconds (``t=1700000000.123``), milliseconds or
+    microseconds since the epoch, with or without the ``t=`` prefix.
+
+    Args:
+        value (str): The header value.
+
+    Returns:
+        float: Timestamp in seconds, or None when the value is invalid.
+    """
+    try:
+        start = float(value.strip().removeprefix('t='))
+    except (AttributeError, ValueError):
+        return None
+    if start > 1e14:
+        return start / 1e6
+    if start > 1e11:
+        return start / 1e3
+    return start
+
+
+class RateLimitMiddleware:
+    """
+    Rate limit clients with token buckets and shed load on long queues.
+
+    Configured by the ``RATE_LIMIT`` setting:
+
+    - ``ENABLED``: Whether the middleware does anything.
+    - ``RATE``: Tokens added to a bucket per second.
+    - ``BURST``: Size of a bucket, i.e. the requests allowed at once.
+    - ``MAX_QUEUE_TIME``: Queue time budget in seconds, 0 to never shed.
+    - ``PROXY_COUNT``: Number of proxies appending to ``X-Forwarded-For``,
+      0 to use the connection address.
+    - ``EXEMPT_PATHS``: Path prefixes never limited.
+    - ``CACHE``: Alias of the cache holding the buckets, used for nothing
+      else since a write per request may cull its entries.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        config = settings.RATE_LIMIT
+        self.enabled = config.get('ENABLED', True)
+        self.rate = float(config.get('RATE', 5))
+        self.burst = float(config.get('BURST', 30))
+        self.max_queue_time = float(config.get('MAX_QUEUE_TIME', 0))
+        self.proxy_count = int(config.get('PROXY_COUNT', 0))
+        self.exempt_paths = tuple(config.get('EXEMPT_PATHS', ()))
+        self.cache_alias = config.get('CACHE', 'default')
+
+    def __call__(self, request):
+        if not self.enabled or request.path.startswith(self.exempt_paths):
+            return self.get_response(request)
+
+        client_ip = self.client_ip(request)
+        if self.is_loopback(client_ip):
+            return self.get_response(request)
+
+        now = time.time()
+        queue_time = self.queue_time(request, now)
+        if self.max_queue_time and queue_time is not None and queue_time > self.max_queue_time:
+            logger.warning("Load shedding: queue time %.2fs over budget, IP=%s",
+                           queue_time, client_ip)
+            return self.reject(503, 'Service temporarily overloaded, please retry.',
+                               retry_after=1)
+
+        retry_after = self.take_token(client_ip, now)
+        if retry_after:
+            logger.warning("Rate limit exceeded: IP=%s", client_ip)
+            return self.reject(429, 'Too many requests, please slow down.',
+                               retry_after=retry_after)
+
+        return self.get_response(request)
+
+    def client_ip(self, request):
+        """
+        Return the address of the client, as seen by the first trusted proxy.
+
+        Args:
+            request (HttpRequest): The Django HTTP request object.
+
+        Returns:
+            str: The client IP address.
+        """
+        if self.proxy_count:
+            forwarded = request.META.get('HTTP_X_FORWARDED_FOR', '')
+            addresses = [address.strip() for address in forwarded.split(',') if address.strip()]
+            if len(addresses) >= self.proxy_count:
+                return addresses[-self.proxy_count]
+        return request.META.get('REMOTE_ADDR', '')
+
+    @staticmethod
+    def is_loopback(client_ip):
+        """
+        Tell whether the request comes from the host itself.
+
+        Args:
+            client_ip (str): The client IP address.
+
+        Returns:
+            bool: True for loopback addresses.
+        """
+        try:
+            return ipaddress.ip_address(client_ip).is_loopback
+        except ValueError:
+            return False
+
+    @staticmethod
+    def queue_time(request, now):
+        """
+        Return the time spent by the request in the proxy queue.
+
+        Args:
+            request (HttpRequest): The Django HTTP request object.
+            now (float): Current UNIX timestamp.
+
+        Returns:
+            float: Queue time in seconds, or None without a valid header.
+        """
+        start = parse_request_start(request.META.get('HTTP_X_REQUEST_START'))
+        return None if start is None else max(0.0, now - start)
+
+    def take_token(self, client_ip, now):
+        """
+        Take a token from the bucket of a client.
+
+        Concurrent requests may both read the same bucket state; losing an
+        update occasionally lets one extra request through, which is an
+        acceptable trade for avoiding a lock per request.
+
+        Args:
+            client_ip (str): The client IP address.
+            now (float): Current UNIX timestamp.
+
+        Returns:
+            int: 0 when the request is allowed, otherwise the number of
+                 seconds until a token is available.
+        """
+        cache = caches[self.cache_alias]
+        key = f'ratelimit:{client_ip}'
+        tokens, updated = cache.get(key, (self.burst, now))
+        tokens = min(self.burst, tokens + (now - updated) * self.rate)
+        allowed = tokens >= 1
+        if allowed:
+            tokens -= 1
+        # A bucket left untouched long enough is full again, let it expire
+        timeout = math.ceil(self.burst / self.rate) + 1
+        cache.set(key, (tokens, now), timeout=timeout)
+        return 0 if allowed else max(1, math.ceil((1 - tokens) / self.rate))
+
+    @staticmethod
+    def reject(status, message, retry_after):
+        """
+        Build the plain text response of a rejected request.
+
+        Args:
+            status (int): HTTP status code (429 or 503).
+            message (str): Response body.
+            retry_after (int): Seconds the client should wait.
+
+        Returns:
+            HttpResponse: The rejection response.
+        """
+        response = HttpResponse(message, status=status, content_type='text/plain; charset=utf-8')
+        response['Retry-After'] = str(retry_after)
+        return response
+
+
+class QueryBudgetMiddleware:
+    """
+    Count the queries of every request and enforce the view budgets.
+
+    Configured by the ``QUERY_BUDGET`` setting:
+
+    - ``RAISE``: Raise ``QueryBudgetExceeded`` for a request over budget
+      (DEBUG and tests), instead of logging a warning (production).
+    - ``DEFAULT``: Budget of the views declaring none, None for no limit.
+    - ``ROUTES``: Budgets by view name or URL namespace.
+
+    Queries run while a streaming response is consumed happen after the
+    middleware returned and are not counted.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.raise_errors = settings.QUERY_BUDGET.get('RAISE', False)
+
+    def __call__(self, request):
+        queries = [0]
+        thread = threading.get_ident()
+
+        def count(execute, sql, params, many, context):
+            # Threads may share a connection (the test live server does)
+            if threading.get_ident() == thread:
+                queries[0] += 1
+            return execute(sql, params, many, context)
+
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(count))
+            response = self.get_response(request)
+
+        match = getattr(request, 'resolver_match', None)
+        budget = budget_for(match) if match is not None else None
+        if budget is not None and queries[0] > budget:
+            message = "Query budget exceeded: %s ran %d queries, budget %d"
+            args = (match.view_name, queries[0], budget)
+            if self.raise_errors:
+                raise QueryBudgetExceeded(message % args)
+            logger.warning(message, *args)
+        return response
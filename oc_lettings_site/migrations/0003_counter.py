@@ -0,0 +1,32 @@
+# Generated by Django 4.2.30 on 2026-10-19 12:17
+
+from django.db import migrations, models
+
+
+def seed_counters(apps, schema_editor):
+    """Create the counters with the current row counts."""
+    Counter = apps.get_model('oc_lettings_site', 'Counter')
+    using = schema_editor.connection.alias
+    Counter.objects.using(using).bulk_create([
+        Counter(name=label.lower(),
+                value=apps.get_model(label)._default_manager.using(using).count())
+        for label in ('lettings.Letting', 'profiles.Profile')
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('oc_lettings_site', '0002_delete_old_tables'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Counter',
+            fields=[
+                ('name', models.CharField(max_length=100, primary_key=True, serialize=False)),
+                ('value', models.BigIntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(seed_counters, migrations.RunPython.noop),
+    ]
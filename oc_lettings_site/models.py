@@ -0,0 +1,50 @@
+"""
+Models of the project application.
+
+Models:
+    Counter: Maintained row count of a model
+    CountedModel: Abstract model saved in one transaction with its counter
+"""
+from django.db import models, router, transaction
+
+
+class Counter(models.Model):
+    """
+    Model storing the row count of a model, see ``oc_lettings_site.counters``.
+
+    Attributes:
+        name (CharField): Label of the counted model, such as
+                          ``lettings.letting``
+        value (BigIntegerField): Number of rows
+    """
+    name = models.CharField(max_length=100, primary_key=True)
+    value = models.BigIntegerField(default=0)
+
+    def __str__(self):
+        """
+        Return string representation of the counter.
+
+        Returns:
+            str: Formatted counter as "name: value"
+        """
+        return f'{self.name}: {self.value}'
+
+
+class CountedModel(models.Model):
+    """
+    Abstract model whose rows are counted, see ``oc_lettings_site.counters``.
+
+    The counter is updated by a ``post_save`` handler. Django only runs
+    deletions in a transaction, so saves are wrapped in one too: an insert
+    and its counter update are committed, or rolled back, together.
+    """
+
+    class Meta:
+        """Meta configuration for CountedModel."""
+        abstract = True
+
+    def save(self, *args, **kwargs):
+        """Save the instance and run the ``post_save`` handlers in one transaction."""
+        using = kwargs.get('using') or router.db_for_write(type(self), instance=self)
+        with transaction.atomic(using=using, savepoint=False):
+            super().save(*args, **kwargs)
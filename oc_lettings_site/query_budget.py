@@ -0,0 +1,99 @@
+"""
+Query budgets of the site views.
+
+Each view declares the maximum number of database queries a request may
+run, either with the ``query_budget`` decorator or by route in the
+``QUERY_BUDGET['ROUTES']`` setting (for views defined elsewhere, such as
+the admin). ``QueryBudgetMiddleware`` counts the queries of every request
+and enforces the budget of its view, so a regression such as a query per
+listed row is caught as soon as it is introduced.
+
+Functions:
+    query_budget: Declare the query budget of a view
+    budget_for: Return the budget applying to a resolved URL
+    check_query_budgets: Request paths and report the views over budget
+
+Classes:
+    QueryBudgetExceeded: Raised by a request exceeding its budget
+"""
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.db import connections
+from django.test.utils import CaptureQueriesContext
+from django.urls import resolve
+
+
+class QueryBudgetExceeded(Exception):
+    """A request ran more database queries than the budget of its view."""
+
+
+def query_budget(queries):
+    """
+    Declare the maximum number of queries of a view.
+
+    Args:
+        queries (int): Queries allowed per request.
+
+    Returns:
+        callable: Decorator setting the ``query_budget`` attribute of a view.
+    """
+    def decorator(view):
+        view.query_budget = queries
+        return view
+    return decorator
+
+
+def budget_for(match):
+    """
+    Return the query budget applying to a resolved URL.
+
+    The decorator of the view wins over the routes of the
+    ``QUERY_BUDGET`` setting, which are looked up by view name
+    (``admin:index``) then by namespace (``admin``).
+
+    Args:
+        match (ResolverMatch): The resolved URL.
+
+    Returns:
+        int: The budget, or None when the view has none.
+    """
+    budget = getattr(match.func, 'query_budget', None)
+    if budget is not None:
+        return budget
+    config = settings.QUERY_BUDGET
+    routes = config.get('ROUTES', {})
+    for key in [match.view_name, *reversed(match.namespaces)]:
+        if key in routes:
+            return routes[key]
+    return config.get('DEFAULT')
+
+
+def check_query_budgets(client, paths):
+    """
+    Request paths and report the views over budget or without a budget.
+
+    Meant for tests: every page of the site should be requested through
+    this helper, so that undeclared budgets are caught too.
+
+    Args:
+        client (Client): Test client sending the requests.
+        paths (list): URL paths to request, with an optional query string.
+
+    Returns:
+        list: Description of each problem found, empty when all is well.
+    """
+    problems = []
+    for path in paths:
+        budget = budget_for(resolve(urlsplit(path).path))
+        if budget is None:
+            problems.append(f"{path}: no query budget declared")
+            continue
+        with CaptureQueriesContext(connections['default']) as captured:
+            try:
+                client.get(path)
+            except QueryBudgetExceeded:
+                pass
+        if len(captured) > budget:
+            problems.append(f"{path}: {len(captured)} queries, budget {budget}")
+    return problems
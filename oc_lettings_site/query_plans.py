@@ -0,0 +1,163 @@
+"""
+Query plan checks of the hot views.
+
+Every query run by the views of ``lettings`` and ``profiles`` is captured
+and explained by the database (``EXPLAIN QUERY PLAN`` on SQLite,
+``EXPLAIN`` on PostgreSQL). A plan reading a whole table, or sorting rows
+outside of an index, is reported as a regression, except for the tables a
+view lists in full by design (the index pages).
+
+Each query is explained right before it runs, with its actual parameters.
+The membership indexes, built once per worker with a full scan, are built
+beforehand so that they are not reported.
+
+Plans depend on the data: checks run on a database the size of production
+(see ``generate_data``) are the most telling. SQLite plans do not depend
+on table statistics, so the test database gives the same answers.
+
+Functions:
+    explain: Return the plan of a query
+    plan_problems: Return the lines of a plan reading a whole table or sorting
+    check_query_plans: Explain the queries of the hot views
+"""
+import re
+
+from django.contrib.auth.models import AnonymousUser
+from django.db import connections
+from django.test import RequestFactory
+
+from lettings import views as lettings_views
+from lettings.membership import letting_ids
+from lettings.models import Letting
+from profiles import views as profiles_views
+from profiles.membership import usernames
+from profiles.models import Profile
+
+# Hot views: name, view, arguments factory and tables read in full on purpose
+HOT_VIEWS = [
+    ('lettings:index', lettings_views.index, lambda: [], {'lettings_letting'}),
+    ('lettings:letting', lettings_views.letting,
+     lambda: [Letting.objects.values_list('id', flat=True).first()], set()),
+    # Every profile is listed with its username: either table may drive the join
+    ('profiles:index', profiles_views.index, lambda: [], {'profiles_profile', 'auth_user'}),
+    ('profiles:profile', profiles_views.profile,
+     lambda: [Profile.objects.values_list('user__username', flat=True).first()], set()),
+]
+
+# Plan lines of a full table scan or of a sort without index, by vendor
+SCAN_PATTERNS = {
+    'sqlite': re.compile(r'^SCAN (?P<table>\w+)|USE TEMP B-TREE'),
+    'postgresql': re.compile(r'Seq Scan on (?P<table>\w+)|Sort  \('),
+}
+
+
+def explain(sql, params=(), using='default'):
+    """
+    Return the plan of a query.
+
+    Args:
+        sql (str): The query.
+        params (tuple): Its parameters.
+        using (str): Database alias.
+
+    Returns:
+        list: Lines of the plan.
+
+    Raises:
+        NotImplementedError: If the database is neither SQLite nor PostgreSQL.
+    """
+    connection = connections[using]
+    if connection.vendor not in SCAN_PATTERNS:
+        raise NotImplementedError(f"No query plan check for {connection.vendor}")
+    prefix = 'EXPLAIN QUERY PLAN ' if connection.vendor == 'sqlite' else 'EXPLAIN '
+    with connection.cursor() as cursor:
+        cursor.execute(prefix + sql, params)
+        rows = cursor.fetchall()
+    # SQLite answers (id, parent, unused, detail), PostgreSQL one text column
+    return [row[-1] for row in rows]
+
+
+def plan_problems(plan, allowed_tables=(), vendor='sqlite'):
+    """
+    Return the lines of a plan reading a whole table or sorting rows.
+
+    Args:
+        plan (list): Lines returned by ``explain``.
+        allowed_tables (set): Tables the query may read in full.
+        vendor (str): Database vendor the plan comes from.
+
+    Returns:
+        list: The offending lines, empty when the plan is fine.
+    """
+    problems = []
+    for line in plan:
+        match = SCAN_PATTERNS[vendor].search(line)
+        # Sorts have no table and are never allowed
+        if match and match.group('table') not in allowed_tables:
+            problems.append(line.strip())
+    return problems
+
+
+class _PlanRecorder:
+    """Execute wrapper explaining each query before running it."""
+
+    def __init__(self, using):
+        self.using = using
+        self.plans = []
+        self.explaining = False
+
+    def __call__(self, execute, sql, params, many, context):
+        # The EXPLAIN query itself goes through this wrapper too
+        if not (many or self.explaining):
+            self.explaining = True
+            try:
+                self.plans.append((sql, explain(sql, params, self.using)))
+            finally:
+                self.explaining = False
+        return execute(sql, params, many, context)
+
+
+def check_query_plans(views=None, using='default'):
+    """
+    Explain every query of the hot views.
+
+    Views whose arguments cannot be drawn from the database (no letting or
+    no profile yet) are skipped. The index pages render every row, so on a
+    large catalogue they take most of the time.
+
+    Args:
+        views (list): Names of the views to check, all when None.
+        using (str): Database alias.
+
+    Returns:
+        list: One dict per query, with the ``view``, its ``sql``, ``plan``
+              and ``problems``.
+    """
+    connection = connections[using]
+    # Build the membership indexes outside of the checked queries
+    letting_ids.build()
+    usernames.build()
+    request = RequestFactory().get('/')
+    request.user = AnonymousUser()
+    reports = []
+    for name, view, arguments, allowed_tables in HOT_VIEWS:
+        if views is not None and name not in views:
+            continue
+        args = arguments()
+        if None in args:
+            continue
+        recorder = _PlanRecorder(using)
+        with connection.execute_wrapper(recorder):
+            response = view(request, *args)
+            # Streamed pages run their queries as they are sent
+            if response.streaming:
+                for _ in response.streaming_content:
+                    pass
+        for sql, plan in recorder.plans:
+            reports.append({
+                'view': name,
+                'sql': sql,
+                'plan': plan,
+                'problems': plan_problems(plan, allowed_tables, connection.vendor),
+            })
+    return reports
@@ -1,4 +1,5 @@
 import os
+import tempfile
 import sentry_sdk
 from pathlib import Path
 from decouple import config, Csv
@@ -55,6 +56,8 @@ INSTALLED_APPS = [
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',  # Add WhiteNoise for static files
+    'oc_lettings_site.middleware.RateLimitMiddleware',
+    'oc_lettings_site.middleware.QueryBudgetMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -63,24 +66,72 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+# Maximum database queries per request, see
+# oc_lettings_site.middleware.QueryBudgetMiddleware. Views declare their own
+# budget with oc_lettings_site.query_budget.query_budget; ROUTES covers the
+# views defined elsewhere, by view name or URL namespace. Requests over
+# budget fail in DEBUG and in the tests (see conftest.py), and are logged
+# otherwise.
+QUERY_BUDGET = {
+    'RAISE': config('QUERY_BUDGET_RAISE', default=DEBUG, cast=bool),
+    'DEFAULT': None,
+    'ROUTES': {
+        'admin:index': 5,
+        'admin': 10,
+    },
+}
+
+# Per-IP token buckets and queue time load shedding, see
+# oc_lettings_site.middleware.RateLimitMiddleware
+RATE_LIMIT = {
+    'ENABLED': config('RATE_LIMIT_ENABLED', default=not DEBUG, cast=bool),
+    'RATE': config('RATE_LIMIT_RATE', default=5.0, cast=float),
+    'BURST': config('RATE_LIMIT_BURST', default=30, cast=int),
+    'MAX_QUEUE_TIME': config('RATE_LIMIT_MAX_QUEUE_TIME', default=2.0, cast=float),
+    'PROXY_COUNT': config('RATE_LIMIT_PROXY_COUNT', default=0, cast=int),
+    'EXEMPT_PATHS': ['/admin/'],
+    'CACHE': 'rate_limit',
+}
+
 ROOT_URLCONF = 'oc_lettings_site.urls'
 
+TEMPLATE_LOADERS = [
+    'django.template.loaders.filesystem.Loader',
+    'django.template.loaders.app_directories.Loader',
+]
+
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
         'DIRS': [os.path.join(BASE_DIR, 'templates')],
-        'APP_DIRS': True,
         'OPTIONS': {
             'context_processors': [
                 'django.template.context_processors.debug',
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'oc_lettings_site.context_processors.layout',
+            ],
+            # Compiled templates are kept in memory in production
+            'loaders': TEMPLATE_LOADERS if DEBUG else [
+                ('django.template.loaders.cached.Loader', TEMPLATE_LOADERS),
             ],
         },
     },
 ]
 
+# Version of the cached base.html fragments (head, navbar, footer); derived
+# from the layout template and the static files manifest when empty
+LAYOUT_CACHE_VERSION = config('LAYOUT_CACHE_VERSION', default='')
+
+# Stream the list pages: their head is sent at once and their rows are read
+# and rendered in chunks, see oc_lettings_site.streaming
+STREAMING_RENDER = config('STREAMING_RENDER', default=False, cast=bool)
+
+# Build the membership indexes in a background thread, at worker start and
+# when outdated; when False, the lookup needing an index builds it
+MEMBERSHIP_BACKGROUND_BUILD = config('MEMBERSHIP_BACKGROUND_BUILD', default=True, cast=bool)
+
 WSGI_APPLICATION = 'oc_lettings_site.wsgi.application'
 
 
@@ -95,6 +146,72 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/4.2/topics/cache/
+
+# Caches visible to every worker of the host. Set SHARED_CACHE_BACKEND to
+# django.core.cache.backends.redis.RedisCache (and the location to its URL)
+# to share them between hosts.
+SHARED_CACHE_BACKEND = config(
+    'SHARED_CACHE_BACKEND',
+    default='django.core.cache.backends.filebased.FileBasedCache',
+)
+SHARED_CACHE_LOCATION = config(
+    'SHARED_CACHE_LOCATION',
+    default=os.path.join(tempfile.gettempdir(), 'oc_lettings_cache'),
+)
+# The file-based backend culls a third of its files past MAX_ENTRIES (300 by
+# default): caches whose keys must stay get their own directory and limit
+SHARED_CACHE_FILE_BASED = SHARED_CACHE_BACKEND.endswith('.FileBasedCache')
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'oc-lettings-default',
+    },
+    # Used by {% cache %}; disabled in development so template edits show up
+    'template_fragments': {
+        'BACKEND': (
+            'django.core.cache.backends.dummy.DummyCache' if DEBUG
+            else 'django.core.cache.backends.locmem.LocMemCache'
+        ),
+        'LOCATION': 'oc-lettings-fragments',
+    },
+    # Shared values that may be evicted and computed again (sitemaps)
+    'shared': {
+        'BACKEND': SHARED_CACHE_BACKEND,
+        'LOCATION': SHARED_CACHE_LOCATION,
+    },
+    # Generation markers, see oc_lettings_site.generations: a few keys
+    # written when the data changes, which must never be evicted
+    'generations': {
+        'BACKEND': SHARED_CACHE_BACKEND,
+        'LOCATION': (
+            os.path.join(SHARED_CACHE_LOCATION, 'generations') if SHARED_CACHE_FILE_BASED
+            else SHARED_CACHE_LOCATION
+        ),
+        'KEY_PREFIX': 'generations',
+        'TIMEOUT': None,
+        'OPTIONS': {'MAX_ENTRIES': 100000} if SHARED_CACHE_FILE_BASED else {},
+    },
+    # Token buckets of the rate limiting, written by every request: culled
+    # on their own, a quarter at a time, without evicting the other caches.
+    # Prefer Redis under heavy traffic, the file-based backend lists its
+    # directory on every write.
+    'rate_limit': {
+        'BACKEND': SHARED_CACHE_BACKEND,
+        'LOCATION': (
+            os.path.join(SHARED_CACHE_LOCATION, 'rate_limit') if SHARED_CACHE_FILE_BASED
+            else SHARED_CACHE_LOCATION
+        ),
+        'KEY_PREFIX': 'rate_limit',
+        'OPTIONS': (
+            {'MAX_ENTRIES': 2000, 'CULL_FREQUENCY': 4} if SHARED_CACHE_FILE_BASED else {}
+        ),
+    },
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/3.0/ref/settings/#auth-password-validators
 
@@ -137,8 +254,34 @@ STATIC_URL = '/static/'
 STATICFILES_DIRS = [BASE_DIR / "static",]
 
 # WhiteNoise configuration for static files
-# Use CompressedStaticFilesStorage without manifest validation (more forgiving)
-STATICFILES_STORAGE = 'whitenoise.storage.CompressedStaticFilesStorage'
+# Content-hashed names (with gzip and brotli variants) are served with a
+# far-future "Cache-Control: immutable" header; references to missing files
+# are kept unhashed instead of failing collectstatic
+STATICFILES_STORAGE = 'oc_lettings_site.storage.ImmutableStaticFilesStorage'
+# Max age (seconds) for files served without a hash in their name
+WHITENOISE_MAX_AGE = 0 if DEBUG else 3600
+
+# Static HTML export of the pages (manage.py export_static); when
+# STATIC_EXPORT_SERVE is set, WhiteNoise serves the exported pages before
+# the views. WhiteNoise indexes the files at startup: restart the workers
+# after each export (the entrypoint exports before starting them).
+STATIC_EXPORT_ROOT = Path(config('STATIC_EXPORT_ROOT', default=str(BASE_DIR / 'export')))
+if config('STATIC_EXPORT_SERVE', default=False, cast=bool):
+    WHITENOISE_ROOT = STATIC_EXPORT_ROOT
+    WHITENOISE_INDEX_FILE = True
+
+# CSS tree-shaking (manage.py purge_css, also run before collectstatic):
+# the theme stylesheet is purged against the project templates into a
+# minified stylesheet and an above-the-fold subset inlined in base.html
+CSS_PURGE = {
+    'SOURCE': BASE_DIR / 'static' / 'css' / 'styles.css',
+    'OUTPUT': BASE_DIR / 'static' / 'css' / 'styles.min.css',
+    'CRITICAL_OUTPUT': BASE_DIR / 'static' / 'css' / 'critical.min.css',
+    # Markup inserted by template tags rather than written in templates
+    'MARKUP_DIRS': [BASE_DIR / 'oc_lettings_site' / 'icons'],
+    # Classes toggled by Bootstrap and scripts.js at runtime
+    'SAFELIST': ['active', 'collapsing', 'disabled', 'fade', 'navbar-scrolled', 'show'],
+}
 
 # Logging configuration
 LOGGING = {
@@ -154,19 +297,33 @@ LOGGING = {
             'style': '{',
         },
     },
+    'filters': {
+        # Repeated warnings (404 floods) are counted and summarized per window
+        'aggregate_warnings': {
+            '()': 'oc_lettings_site.log_aggregation.AggregatingFilter',
+            'window': config('LOG_AGGREGATION_WINDOW', default=60, cast=int),
+            'per_key': config('LOG_AGGREGATION_PER_KEY', default=1, cast=int),
+            'max_events': config('LOG_AGGREGATION_MAX_EVENTS', default=100, cast=int),
+            # INFO records (the access log) are never counted nor suppressed
+            'min_level': 'WARNING',
+        },
+    },
     'handlers': {
         'console': {
             'class': 'logging.StreamHandler',
             'formatter': 'simple',
+            'filters': ['aggregate_warnings'],
         },
         'file': {
             'class': 'logging.FileHandler',
             'filename': BASE_DIR / 'django.log',
             'formatter': 'verbose',
+            'filters': ['aggregate_warnings'],
         },
         'sentry': {
             'class': 'sentry_sdk.integrations.logging.SentryHandler',
             'level': 'WARNING',  # Capture WARNING et plus élevé
+            'filters': ['aggregate_warnings'],
         },
     },
     'root': {
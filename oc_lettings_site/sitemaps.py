@@ -0,0 +1,224 @@
+"""
+Sitemaps of the lettings and profile pages.
+
+``/sitemap.xml`` is a sitemap index pointing to one sitemap per chunk of
+``CHUNK_SIZE`` consecutive IDs of each section (``/sitemap-lettings-0.xml``
+for IDs 0 to 9999, and so on), so crawlers discover every page from a few
+files instead of walking the list pages.
+
+- The index is built from a single ``GROUP BY`` query returning the last
+  modification date of every non-empty chunk. It is cached in the shared
+  cache with ``stampede.get_or_set``: when it expires, a single worker
+  rebuilds it while the others keep serving the previous one.
+- A chunk is rendered from an ``iterator()`` over its ID range, so rows are
+  never all loaded at once. The generated file is cached in the shared
+  cache and served, without any query, until it expires like the index:
+  changes show in the sitemaps within ``CHUNK_TIMEOUT``. It goes through
+  ``stampede.get_or_set`` too, so a single worker regenerates an expired
+  chunk while the others keep serving the previous file. Empty chunks are
+  cached as well, and answered 404.
+
+Classes:
+    SitemapSection: Model pages listed in the sitemaps
+
+Functions:
+    sitemap_index: Sitemap index view
+    sitemap_section: Sitemap view of one chunk of a section
+"""
+import logging
+from xml.sax.saxutils import escape
+
+from django.db.models import ExpressionWrapper, F, IntegerField, Max
+from django.db.models.functions import Greatest
+from django.http import Http404, HttpResponse
+from django.urls import reverse
+
+from lettings.models import Letting
+from oc_lettings_site import stampede
+from oc_lettings_site.query_budget import query_budget
+from profiles.models import Profile
+
+# Configure logger for this module
+logger = logging.getLogger(__name__)
+
+# Number of IDs covered by a sitemap file (the protocol allows 50000 URLs)
+CHUNK_SIZE = 10000
+
+# Seconds the sitemap index is cached
+INDEX_TIMEOUT = 3600
+
+# Seconds a chunk sitemap is cached, as long as the index listing it
+CHUNK_TIMEOUT = INDEX_TIMEOUT
+
+# Rows fetched from the database at once while streaming a chunk
+ITERATOR_CHUNK_SIZE = 2000
+
+CONTENT_TYPE = 'application/xml; charset=utf-8'
+XML_HEADER = '<?xml version="1.0" encoding="UTF-8"?>\n'
+XMLNS = 'http://www.sitemaps.org/schemas/sitemap/0.9'
+
+
+def _w3c_datetime(value):
+    """Format a date for the ``lastmod`` element."""
+    return value.strftime('%Y-%m-%dT%H:%M:%S+00:00')
+
+
+class SitemapSection:
+    """
+    Detail pages of a model listed in the sitemaps.
+
+    Attributes:
+        name (str): Section name used in the sitemap URLs.
+        queryset (callable): Return the model queryset.
+        url_field (str): Field passed to ``url``.
+        lastmod (Expression): Last modification date of a row.
+        url (callable): Return the page path from the ``url_field`` value.
+    """
+
+    def __init__(self, name, queryset, url_field, lastmod, url):
+        self.name = name
+        self.queryset = queryset
+        self.url_field = url_field
+        self.lastmod = lastmod
+        self.url = url
+
+    def chunks(self):
+        """
+        Return the non-empty chunks of the section.
+
+        Returns:
+            list: ``(chunk number, last modification date)`` tuples.
+        """
+        chunk = ExpressionWrapper(F('id') / CHUNK_SIZE, output_field=IntegerField())
+        rows = (
+            self.queryset()
+            .annotate(chunk=chunk)
+            .values('chunk')
+            .annotate(lastmod=Max(self.lastmod))
+            .order_by('chunk')
+            .values_list('chunk', 'lastmod')
+        )
+        return list(rows)
+
+    def chunk_rows(self, number):
+        """
+        Return the rows of a chunk.
+
+        Args:
+            number (int): Chunk number.
+
+        Returns:
+            QuerySet: ``(url_field, lastmod)`` values ordered by ID.
+        """
+        start = number * CHUNK_SIZE
+        return (
+            self.queryset()
+            .filter(id__gte=start, id__lt=start + CHUNK_SIZE)
+            .annotate(row_lastmod=self.lastmod)
+            .order_by('id')
+            .values_list(self.url_field, 'row_lastmod')
+        )
+
+
+SECTIONS = {
+    section.name: section for section in (
+        SitemapSection(
+            'lettings', lambda: Letting.objects.all(), 'id',
+            Greatest('updated_at', 'address__updated_at'),
+            lambda letting_id: reverse('lettings:letting', kwargs={'letting_id': letting_id}),
+        ),
+        SitemapSection(
+            'profiles', lambda: Profile.objects.all(), 'user__username',
+            F('updated_at'),
+            lambda username: reverse('profiles:profile', kwargs={'username': username}),
+        ),
+    )
+}
+
+
+@query_budget(2)
+def sitemap_index(request):
+    """
+    List the sitemap file of every non-empty chunk of every section.
+
+    Args:
+        request (HttpRequest): The Django HTTP request object.
+
+    Returns:
+        HttpResponse: The sitemap index XML document.
+    """
+    base_url = request.build_absolute_uri('/')[:-1]
+
+    def build():
+        lines = [XML_HEADER, f'<sitemapindex xmlns="{XMLNS}">\n']
+        for section in SECTIONS.values():
+            for number, lastmod in section.chunks():
+                path = reverse('sitemap-section',
+                               kwargs={'section': section.name, 'number': number})
+                lines.append(
+                    f'<sitemap><loc>{escape(base_url + path)}</loc>'
+                    f'<lastmod>{_w3c_datetime(lastmod)}</lastmod></sitemap>\n'
+                )
+        lines.append('</sitemapindex>\n')
+        return ''.join(lines).encode()
+
+    content = stampede.get_or_set(f'sitemap:index:{base_url}', build, INDEX_TIMEOUT)
+    return HttpResponse(content, content_type=CONTENT_TYPE)
+
+
+def _render_chunk(section, number, base_url):
+    """
+    Return the sitemap of a chunk, reading its rows in batches.
+
+    Args:
+        section (SitemapSection): The section.
+        number (int): Chunk number.
+        base_url (str): Scheme and host prepended to the page paths.
+
+    Returns:
+        bytes: The XML document, or None for an empty chunk.
+    """
+    parts = [f'{XML_HEADER}<urlset xmlns="{XMLNS}">\n']
+    rows = section.chunk_rows(number).iterator(chunk_size=ITERATOR_CHUNK_SIZE)
+    for value, lastmod in rows:
+        parts.append(
+            f'<url><loc>{escape(base_url + section.url(value))}</loc>'
+            f'<lastmod>{_w3c_datetime(lastmod)}</lastmod></url>\n'
+        )
+    if len(parts) == 1:
+        return None
+    parts.append('</urlset>\n')
+    return ''.join(parts).encode()
+
+
+# Rows of the chunk, only when it is generated
+@query_budget(1)
+def sitemap_section(request, section, number):
+    """
+    List the pages of one chunk of a section.
+
+    Args:
+        request (HttpRequest): The Django HTTP request object.
+        section (str): Section name (``lettings`` or ``profiles``).
+        number (int): Chunk number.
+
+    Returns:
+        HttpResponse: The sitemap XML document.
+
+    Raises:
+        Http404: For an unknown section or an empty chunk.
+    """
+    if section not in SECTIONS:
+        raise Http404(f"Unknown sitemap section '{section}'")
+    entry = SECTIONS[section]
+    base_url = request.build_absolute_uri('/')[:-1]
+    key = f'sitemap:{section}:{number}:{base_url}'
+
+    def build():
+        logger.info("Generating sitemap %s-%s", section, number)
+        return _render_chunk(entry, number, base_url)
+
+    content = stampede.get_or_set(key, build, CHUNK_TIMEOUT)
+    if content is None:
+        raise Http404(f"Empty sitemap chunk {section}-{number}")
+    return HttpResponse(content, content_type=CONTENT_TYPE)
@@ -0,0 +1,167 @@
+"""
+Cache stampede protection for expensive cached values.
+
+When a popular cache entry expires, every worker requesting it at that
+moment misses and recomputes it at once, multiplying the load exactly
+when the value is most in demand. ``get_or_set`` prevents it three ways:
+
+- Single flight: the worker recomputing a value holds a short lock, and
+  the others do not recompute.
+- Stale while revalidate: entries are kept ``stale`` seconds after they
+  expire. While one worker recomputes an expired entry, the others are
+  answered with the stale value instead of waiting.
+- Probabilistic early refresh (XFetch): before expiry, each request
+  recomputes the value with a probability growing as the expiry nears
+  and with the time the value took to compute, so a popular entry is
+  usually refreshed before it expires at all.
+
+Only a complete miss (nothing cached, or stale for too long) makes the
+other workers wait, polling the cache until the lock holder stores the
+value, then computing it themselves if it has not after ``lock_timeout``.
+
+The lock is an ``add()`` to the cache, atomic with Redis and Memcached.
+``add()`` is not atomic with the file-based backend, so the lock is then a
+file created next to the cache entries with ``O_EXCL``.
+
+Functions:
+    get_or_set: Return a cached value, recomputing it once when it expires
+"""
+import logging
+import math
+import os
+import random
+import time
+import uuid
+
+from django.core.cache import caches
+from django.core.cache.backends.filebased import FileBasedCache
+
+# Configure logger for this module
+logger = logging.getLogger(__name__)
+
+# Cache holding the values and the locks, visible to every worker
+STAMPEDE_CACHE = 'shared'
+
+# Seconds a recomputation may hold the lock
+LOCK_TIMEOUT = 10
+
+# Seconds between two reads of the cache while waiting for a value
+POLL_INTERVAL = 0.05
+
+LOCK_PREFIX = 'stampede-lock:'
+
+
+def _lock_path(cache, lock_key):
+    """Return the lock file of a key in a file-based cache."""
+    # Not a .djcache file: left alone by the culling of the backend
+    return cache._key_to_file(lock_key) + '.lock'
+
+
+def _acquire_file(cache, lock_key, token, lock_timeout):
+    """Create the lock file of a key, replacing it once expired."""
+    path = _lock_path(cache, lock_key)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    for _ in range(2):
+        try:
+            fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            try:
+                if time.time() - os.path.getmtime(path) < lock_timeout:
+                    return False
+                # Left by a worker which died while recomputing
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            continue
+        with os.fdopen(fd, 'w') as lock:
+            lock.write(token)
+        return True
+    return False
+
+
+def _acquire(cache, key, lock_timeout):
+    """Take the recomputation lock of a key, returning its token or None."""
+    token = uuid.uuid4().hex
+    lock_key = LOCK_PREFIX + key
+    if isinstance(cache, FileBasedCache):
+        return token if _acquire_file(cache, lock_key, token, lock_timeout) else None
+    # Reading the token back catches the lock taken by a concurrent add()
+    if cache.add(lock_key, token, lock_timeout) and cache.get(lock_key) == token:
+        return token
+    return None
+
+
+def _release(cache, key, token):
+    """Release the lock of a key if it is still held with the token."""
+    lock_key = LOCK_PREFIX + key
+    if isinstance(cache, FileBasedCache):
+        path = _lock_path(cache, lock_key)
+        try:
+            with open(path) as lock:
+                if lock.read() == token:
+                    os.remove(path)
+        except FileNotFoundError:
+            pass
+    elif cache.get(lock_key) == token:
+        cache.delete(lock_key)
+
+
+def _recompute(cache, key, compute, timeout, stale, token):
+    """Compute a value, store it with its expiry and release the lock."""
+    try:
+        started = time.time()
+        value = compute()
+        now = time.time()
+        # Stored with its expiry and the time it took to compute
+        cache.set(key, (value, now + timeout, now - started), timeout + stale)
+        return value
+    finally:
+        _release(cache, key, token)
+
+
+def get_or_set(key, compute, timeout, stale=None, beta=1.0, lock_timeout=LOCK_TIMEOUT,
+               cache_alias=STAMPEDE_CACHE):
+    """
+    Return a cached value, recomputing it in a single worker when it expires.
+
+    Args:
+        key (str): Cache key of the value.
+        compute (callable): Return the value; called without arguments.
+        timeout (int): Seconds the value is fresh.
+        stale (int, optional): Seconds an expired value is still served
+                               while it is recomputed, ``timeout`` by default.
+        beta (float): Eagerness of the early refresh, 0 to disable it.
+        lock_timeout (int): Seconds a recomputation may hold the lock, and
+                            the longest a worker waits for a missing value.
+        cache_alias (str): Cache holding the values and the locks.
+
+    Returns:
+        The cached or computed value.
+    """
+    cache = caches[cache_alias]
+    stale = timeout if stale is None else stale
+    entry = cache.get(key)
+    if entry is not None:
+        value, expires, delta = entry
+        # XFetch: -log(u) is exponentially distributed, rarely far above 1
+        if time.time() - delta * beta * math.log(1 - random.random()) < expires:
+            return value
+        token = _acquire(cache, key, lock_timeout)
+        if token is None:
+            # Another worker is recomputing it
+            return value
+        logger.debug("Refreshing %s", key)
+        return _recompute(cache, key, compute, timeout, stale, token)
+
+    deadline = time.monotonic() + lock_timeout
+    while True:
+        token = _acquire(cache, key, lock_timeout)
+        if token is not None:
+            return _recompute(cache, key, compute, timeout, stale, token)
+        time.sleep(POLL_INTERVAL)
+        entry = cache.get(key)
+        if entry is not None:
+            return entry[0]
+        if time.monotonic() > deadline:
+            logger.warning("Gave up waiting for %s, computing it", key)
+            return compute()
@@ -0,0 +1,298 @@
+"""
+Static HTML export of the site pages.
+
+The catalogue changes a few times a day but is read far more often, so
+every public page (home, lettings and profiles indexes, every letting and
+profile) can be rendered once into ``STATIC_EXPORT_ROOT`` and served from
+there by WhiteNoise or a CDN.
+
+Exports are incremental. Each page gets a fingerprint computed from the
+database values it displays, and the fingerprints of the last export are
+kept in a manifest next to the export directory (``export.manifest.json``
+for ``export``), out of the files served. Only pages whose fingerprint
+changed are rendered again, and pages whose object was deleted are
+removed. A fingerprint of the templates and static assets is stored as
+well; when it changes, every page is rendered again.
+
+Pages are rendered by the site views themselves, in a pool of processes
+when more than one worker is requested. Each page is written atomically
+next to a gzipped copy.
+
+Functions:
+    site_version: Fingerprint of the templates and static assets
+    page_fingerprints: Fingerprint of every page, by URL path
+    manifest_file: Return the manifest of an export directory
+    render_pages: Render pages into the export directory
+    export_site: Export the pages changed since the last export
+"""
+import gzip
+import hashlib
+import json
+import logging
+import multiprocessing
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import django
+from django.conf import settings
+from django.db import connections
+from django.http import Http404
+from django.test import RequestFactory
+from django.urls import resolve, reverse
+
+from lettings.models import Letting
+from oc_lettings_site.css_purge import project_template_dirs
+from oc_lettings_site.templatetags.icons import ICONS_DIR
+from profiles.models import Profile
+
+# Configure logger for this module
+logger = logging.getLogger(__name__)
+
+# Suffix of the manifest, a sibling of the export directory
+MANIFEST_SUFFIX = '.manifest.json'
+# Manifest written inside the export directory by earlier versions
+LEGACY_MANIFEST_NAME = 'manifest.json'
+INDEX_NAME = 'index.html'
+
+# Number of pages rendered by a worker process per task
+CHUNK_SIZE = 50
+
+
+def _digest(*values):
+    """Return a short, stable fingerprint of some values."""
+    return hashlib.md5(repr(values).encode(), usedforsecurity=False).hexdigest()[:16]
+
+
+def site_version():
+    """
+    Return the fingerprint of everything the pages depend on but the data.
+
+    Covers the project templates, the inlined icons, the critical
+    stylesheet and the static files manifest (hashed asset URLs).
+
+    Returns:
+        str: Fingerprint changing whenever every page must be re-rendered.
+    """
+    digest = hashlib.md5(usedforsecurity=False)
+    files = []
+    for directory in [*project_template_dirs(), ICONS_DIR]:
+        files.extend(sorted(p for p in Path(directory).rglob('*') if p.is_file()))
+    files.append(Path(settings.STATIC_ROOT) / 'staticfiles.json')
+    files.append(Path(settings.CSS_PURGE['CRITICAL_OUTPUT']))
+    for path in files:
+        if path.exists():
+            digest.update(str(path).encode())
+            digest.update(path.read_bytes())
+    return digest.hexdigest()[:16]
+
+
+def page_fingerprints():
+    """
+    Return the fingerprint of every exported page.
+
+    Each fingerprint covers the database values displayed by the page, so
+    it changes exactly when the page content does. Rows are hashed as they
+    are read from the database, the list page fingerprints being updated
+    row by row, so the tables are never held in memory.
+
+    Returns:
+        dict: Fingerprints by URL path.
+    """
+    lettings_index, profiles_index = reverse('lettings:index'), reverse('profiles:index')
+    # List pages first, their fingerprints are set once every row is read
+    pages = {reverse('index'): _digest(), lettings_index: None, profiles_index: None}
+
+    listed = hashlib.md5(usedforsecurity=False)
+    lettings = Letting.objects.order_by('id').values_list(
+        'id', 'title', 'address__number', 'address__street', 'address__city',
+        'address__state', 'address__zip_code', 'address__country_iso_code',
+    )
+    for row in lettings.iterator():
+        pages[reverse('lettings:letting', kwargs={'letting_id': row[0]})] = _digest(*row)
+        # The list shows the ID and title
+        listed.update(repr(row[:2]).encode())
+    pages[lettings_index] = listed.hexdigest()[:16]
+
+    listed = hashlib.md5(usedforsecurity=False)
+    profiles = Profile.objects.order_by('id').values_list(
+        'user__username', 'user__first_name', 'user__last_name', 'user__email',
+        'favorite_city',
+    )
+    for row in profiles.iterator():
+        pages[reverse('profiles:profile', kwargs={'username': row[0]})] = _digest(*row)
+        # The list shows the username
+        listed.update(repr(row[0]).encode())
+    pages[profiles_index] = listed.hexdigest()[:16]
+    return pages
+
+
+def manifest_file(root):
+    """
+    Return the manifest of an export directory.
+
+    The manifest lists every page and the site fingerprint: it is kept
+    outside the directory, which may be served as is.
+
+    Args:
+        root (Path): Export directory.
+
+    Returns:
+        Path: ``<root>.manifest.json``, next to the directory.
+    """
+    root = Path(root).resolve()
+    return root.with_name(root.name + MANIFEST_SUFFIX)
+
+
+def page_file(root, path):
+    """
+    Return the file a page is exported to.
+
+    Args:
+        root (Path): Export directory.
+        path (str): URL path of the page, such as ``/lettings/1/``.
+
+    Returns:
+        Path: ``<root>/<path>/index.html``.
+    """
+    parts = [part for part in path.split('/') if part]
+    return Path(root, *parts, INDEX_NAME)
+
+
+def _write_atomic(target, content):
+    """Write a file through a temporary file, so readers never see half of it."""
+    target.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=target.parent, prefix='.tmp-')
+    with os.fdopen(fd, 'wb') as stream:
+        stream.write(content)
+    os.chmod(tmp, 0o644)
+    os.replace(tmp, target)
+
+
+def render_pages(paths, root):
+    """
+    Render pages with the site views and write them to the export directory.
+
+    Args:
+        paths (list): URL paths of the pages.
+        root (str): Export directory.
+
+    Returns:
+        list: Paths of the pages written; pages not answered 200 are skipped.
+    """
+    factory = RequestFactory()
+    written = []
+    for path in paths:
+        match = resolve(path)
+        try:
+            response = match.func(factory.get(path), *match.args, **match.kwargs)
+        except Http404:
+            # Deleted since the fingerprints were computed
+            logger.warning("Static export skipped %s: not found", path)
+            continue
+        if response.status_code != 200:
+            logger.warning("Static export skipped %s: status %s", path, response.status_code)
+            continue
+        # List pages are streamed when STREAMING_RENDER is enabled
+        content = (b''.join(response.streaming_content) if response.streaming
+                   else response.content)
+        target = page_file(root, path)
+        _write_atomic(target, content)
+        _write_atomic(target.with_name(INDEX_NAME + '.gz'),
+                      gzip.compress(content, compresslevel=9, mtime=0))
+        written.append(path)
+    return written
+
+
+def remove_page(root, path):
+    """
+    Delete the files of an exported page and its empty directories.
+
+    Args:
+        root (Path): Export directory.
+        path (str): URL path of the page.
+    """
+    target = page_file(root, path)
+    for file in (target, target.with_name(INDEX_NAME + '.gz')):
+        file.unlink(missing_ok=True)
+    directory = target.parent
+    while directory != Path(root) and directory.exists() and not any(directory.iterdir()):
+        directory.rmdir()
+        directory = directory.parent
+
+
+def export_site(root, workers=1, full=False, progress=None):
+    """
+    Export the pages changed since the last export.
+
+    Args:
+        root (str | Path): Export directory.
+        workers (int): Number of rendering processes, 1 to render in-process.
+        full (bool): Render every page, ignoring the previous manifest.
+        progress (callable): Called with the number of pages written after
+                             each chunk.
+
+    Returns:
+        dict: Number of pages ``rendered``, ``unchanged`` and ``removed``.
+    """
+    root = Path(root)
+    manifest_path = manifest_file(root)
+    legacy_path = root / LEGACY_MANIFEST_NAME
+    previous = {}
+    for path in (manifest_path, legacy_path):
+        if path.exists():
+            previous = json.loads(path.read_text())
+            break
+
+    version = site_version()
+    pages = page_fingerprints()
+    previous_pages = previous.get('pages', {})
+    if full or previous.get('version') != version:
+        previous_pages = {}
+    changed = [
+        path for path, fingerprint in pages.items()
+        if previous_pages.get(path) != fingerprint or not page_file(root, path).exists()
+    ]
+    removed = [path for path in previous.get('pages', {}) if path not in pages]
+
+    chunks = [changed[i:i + CHUNK_SIZE] for i in range(0, len(changed), CHUNK_SIZE)]
+    written = []
+    if workers > 1 and len(chunks) > 1:
+        # Connections must not be shared with the worker processes
+        connections.close_all()
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context('spawn'),
+            # Set Django up before the tasks (and this module) are unpickled
+            initializer=django.setup,
+        ) as pool:
+            for chunk_written in pool.map(render_pages, chunks, [str(root)] * len(chunks)):
+                written.extend(chunk_written)
+                if progress is not None:
+                    progress(len(written))
+    else:
+        for chunk in chunks:
+            written.extend(render_pages(chunk, root))
+            if progress is not None:
+                progress(len(written))
+
+    for path in removed:
+        remove_page(root, path)
+
+    # Pages that failed to render are retried by the next export
+    exported = {path: pages[path] for path in pages
+                if path in previous_pages and path not in changed}
+    exported.update({path: pages[path] for path in written})
+    root.mkdir(parents=True, exist_ok=True)
+    _write_atomic(manifest_path, json.dumps({'version': version, 'pages': exported},
+                                            indent=1, sort_keys=True).encode())
+    # Served publicly when left in the export directory
+    legacy_path.unlink(missing_ok=True)
+    logger.info("Static export: %s rendered, %s unchanged, %s removed",
+                len(written), len(pages) - len(changed), len(removed))
+    return {
+        'rendered': len(written),
+        'unchanged': len(pages) - len(changed),
+        'removed': len(removed),
+    }
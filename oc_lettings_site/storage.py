@@ -0,0 +1,76 @@
+"""
+Static files storage for the OC Lettings Site project.
+
+This module provides the storage used by ``collectstatic`` in production.
+Every collected file gets a content hash in its name and is recorded in a
+manifest, so WhiteNoise can serve it with a far-future
+``Cache-Control: immutable`` header; gzip and brotli variants are written
+next to each file so they never have to be compressed at request time.
+
+Classes:
+    ImmutableStaticFilesStorage: Compressed, content-hashed storage that
+                                 tolerates references to missing files
+"""
+import logging
+
+from whitenoise.storage import CompressedManifestStaticFilesStorage
+
+# Configure logger for this module
+logger = logging.getLogger(__name__)
+
+
+class ImmutableStaticFilesStorage(CompressedManifestStaticFilesStorage):
+    """
+    Content-hashed, precompressed static files storage.
+
+    The theme stylesheet references a few files that are not shipped with
+    the project. Instead of failing ``collectstatic`` (or a page render when
+    the manifest has not been generated yet), such references keep their
+    original, unhashed name and a warning is logged.
+
+    Attributes:
+        manifest_strict (bool): Disabled so that files missing from the
+                                manifest fall back to being hashed on demand.
+    """
+    manifest_strict = False
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._stored_names = {}
+
+    def hashed_name(self, name, content=None, filename=None):
+        """
+        Return the content-hashed name of a file, or its name if it is missing.
+
+        Args:
+            name (str): Name of the file, possibly with a query or fragment.
+            content (File, optional): Content to hash instead of reading it.
+            filename (str, optional): Name of the file to read if different.
+
+        Returns:
+            str: The hashed name, or ``name`` unchanged for a missing file.
+        """
+        try:
+            return super().hashed_name(name, content, filename)
+        except ValueError:
+            logger.warning(f"Static file not found, serving it unhashed: '{name}'")
+            return name
+
+    def stored_name(self, name):
+        """
+        Return the name a file is served under, memoized per storage instance.
+
+        Without a manifest (development, tests) Django hashes the file again
+        on every ``{% static %}`` lookup; remembering the result avoids
+        reading the stylesheet for each rendered page.
+
+        Args:
+            name (str): Name of the file as used in templates.
+
+        Returns:
+            str: The hashed name recorded in the manifest or computed.
+        """
+        stored = self._stored_names.get(name)
+        if stored is None:
+            stored = self._stored_names[name] = super().stored_name(name)
+        return stored
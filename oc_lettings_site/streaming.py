@@ -0,0 +1,122 @@
+"""
+Streamed rendering of the list pages.
+
+A list page is normally rendered in full before its first byte is sent:
+the browser waits for every row, and the worker holds the whole page (and
+its rows) in memory. With ``STREAMING_RENDER`` enabled, ``stream_list``
+answers a ``StreamingHttpResponse`` instead:
+
+- The page template is rendered once with a marker in place of its rows.
+  Everything up to ``</head>`` is sent before any query runs, so the
+  browser starts fetching the stylesheets while the rows are read.
+- The rows are read with a chunked ``iterator()`` (a server-side cursor
+  on PostgreSQL) and rendered ``ITERATOR_CHUNK_SIZE`` at a time with the
+  rows template the page includes, so memory does not grow with the list.
+- A list found empty is answered with the page rendered without rows.
+
+Queries run while the response is sent happen after the middlewares
+returned: ``QueryBudgetMiddleware`` does not count them.
+
+Functions:
+    stream_list: Stream a list page, its head first
+"""
+import logging
+
+from django.http import StreamingHttpResponse
+from django.template.loader import get_template, render_to_string
+from django.utils.safestring import mark_safe
+
+# Configure logger for this module
+logger = logging.getLogger(__name__)
+
+# Rows fetched from the database, and rendered, at once
+ITERATOR_CHUNK_SIZE = 2000
+
+# Stands for the rows in the page rendered around them
+ROWS_MARKER = mark_safe('<!-- streamed rows -->')
+
+HEAD_END = '</head>'
+
+
+def _split_page(page):
+    """Split a rendered page into its head, the part before the rows and the rest."""
+    end = page.find(HEAD_END)
+    end = 0 if end < 0 else end + len(HEAD_END)
+    before, _, after = page[end:].partition(ROWS_MARKER)
+    return page[:end], before, after
+
+
+def _stream(parts, rows, render_rows, render_empty, chunk_size):
+    """
+    Yield the head, then the rows chunk by chunk, then the end of the page.
+
+    Args:
+        parts (tuple): Head, part before the rows and part after them.
+        rows (QuerySet): Rows of the list.
+        render_rows (callable): Render a list of rows.
+        render_empty (callable): Render the page body of an empty list.
+        chunk_size (int): Rows per ``iterator()`` chunk and rendered chunk.
+
+    Yields:
+        str: Parts of the page.
+    """
+    head, before, after = parts
+    yield head
+    count, chunk = 0, []
+    for row in rows.iterator(chunk_size=chunk_size):
+        chunk.append(row)
+        if len(chunk) == chunk_size:
+            if not count:
+                yield before
+            count += len(chunk)
+            yield render_rows(chunk)
+            chunk = []
+    if chunk:
+        if not count:
+            yield before
+        count += len(chunk)
+        yield render_rows(chunk)
+    if not count:
+        yield render_empty()
+        return
+    yield after
+    logger.debug("Streamed %d row(s) of %s", count, rows.model._meta.label)
+
+
+def stream_list(request, template_name, rows_name, rows, rows_template,
+                context=None, chunk_size=None):
+    """
+    Stream a list page, its head first and its rows chunk by chunk.
+
+    The page template shows ``stream_rows`` in place of its rows when set,
+    and otherwise includes ``rows_template`` to render ``rows_name``; the
+    rows template renders a list of rows in both modes.
+
+    Args:
+        request (HttpRequest): The Django HTTP request object.
+        template_name (str): Template of the page.
+        rows_name (str): Context variable of the rows.
+        rows (QuerySet): Rows of the list, read with ``iterator()``.
+        rows_template (str): Template rendering a list of rows.
+        context (dict, optional): Other variables of the page.
+        chunk_size (int, optional): Rows per chunk, ``ITERATOR_CHUNK_SIZE``
+                                    by default.
+
+    Returns:
+        StreamingHttpResponse: The page, sent as it is rendered.
+    """
+    context = context or {}
+    chunk_size = chunk_size or ITERATOR_CHUNK_SIZE
+    page = render_to_string(template_name, {**context, 'stream_rows': ROWS_MARKER}, request)
+    rows_template = get_template(rows_template)
+
+    def render_rows(chunk):
+        return rows_template.render({**context, rows_name: chunk})
+
+    def render_empty():
+        page = render_to_string(template_name, {**context, rows_name: ()}, request)
+        return _split_page(page)[1]
+
+    return StreamingHttpResponse(
+        _stream(_split_page(page), rows, render_rows, render_empty, chunk_size),
+    )
@@ -0,0 +1,230 @@
+"""
+Synthetic catalogue data for benchmarks and load tests.
+
+``seed()`` fills the database with a deterministic catalogue of a given
+size: the same seed and size always produce the same rows, so benchmark
+runs on different commits measure the same data. Seeding can grow an
+existing synthetic catalogue (10k, then 100k, then 1M rows) without
+starting over.
+
+The data is meant to look like the real catalogue:
+
+- Cities are drawn with weights following their population, with the
+  state and a ZIP code from the city's own range.
+- Street numbers are mostly small, as on real streets.
+- Users joined over the last years and share one password, hashed once:
+  hashing a password per user would spend hours in PBKDF2.
+
+Millions of rows must load in seconds, so rows are generated as plain
+tuples and inserted with ``executemany`` in one transaction per batch,
+skipping model instantiation, signals and ``save()``. IDs are assigned
+here so that lettings and profiles can reference the rows of the same
+batch.
+
+Functions:
+    synthetic_count: Number of synthetic entries in the database
+    seed: Insert synthetic addresses, lettings, users and profiles
+"""
+import datetime
+import itertools
+import random
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.management.color import no_style
+from django.db import connections, transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from lettings.models import Address, Letting
+from oc_lettings_site import counters, membership
+from profiles.models import Profile
+
+DEFAULT_SEED = 13
+DEFAULT_BATCH_SIZE = 50000
+
+# Prefix of the synthetic usernames, so they never clash with real ones
+USERNAME_PREFIX = 'synthetic-'
+
+# Password of every synthetic user, for load tests logging in
+PASSWORD = 'synthetic-password'
+
+# City, state, first ZIP code, number of ZIP codes and population (thousands)
+CITIES = [
+    ('New York', 'NY', 10001, 292, 8336), ('Los Angeles', 'CA', 90001, 89, 3822),
+    ('Chicago', 'IL', 60601, 107, 2665), ('Houston', 'TX', 77001, 298, 2302),
+    ('Phoenix', 'AZ', 85001, 85, 1644), ('Philadelphia', 'PA', 19101, 54, 1567),
+    ('San Antonio', 'TX', 78201, 88, 1472), ('San Diego', 'CA', 92101, 99, 1381),
+    ('Dallas', 'TX', 75201, 199, 1300), ('Austin', 'TX', 73301, 44, 974),
+    ('Jacksonville', 'FL', 32099, 178, 971), ('San Jose', 'CA', 95101, 95, 971),
+    ('Columbus', 'OH', 43085, 206, 907), ('Charlotte', 'NC', 28201, 82, 897),
+    ('Seattle', 'WA', 98101, 94, 749), ('Denver', 'CO', 80201, 94, 713),
+    ('Boston', 'MA', 2108, 90, 650), ('Nashville', 'TN', 37201, 49, 683),
+    ('Portland', 'OR', 97201, 66, 635), ('Miami', 'FL', 33101, 98, 449),
+    ('Atlanta', 'GA', 30301, 79, 499), ('Orlando', 'FL', 32801, 97, 309),
+    ('Buffalo', 'NY', 14201, 79, 274), ('Savannah', 'GA', 31401, 21, 147),
+]
+CITY_WEIGHTS = [city[4] for city in CITIES]
+STREETS = [
+    'Main', 'Oak', 'Pine', 'Maple', 'Cedar', 'Elm', 'Washington', 'Lake', 'Hill',
+    'Park', 'Sunset', 'Lincoln', 'Church', 'Highland', 'Jackson', 'Willow', 'Mill',
+]
+STREET_TYPES = ['Street', 'Avenue', 'Road', 'Boulevard', 'Lane', 'Drive', 'Court']
+TITLE_WORDS = ['Cozy', 'Sunny', 'Modern', 'Charming', 'Spacious', 'Quiet', 'Historic',
+               'Bright', 'Renovated', 'Elegant']
+TITLE_KINDS = ['Studio', 'Loft', 'Cottage', 'Apartment', 'Villa', 'Townhouse', 'Bungalow',
+               'Condo', 'Penthouse']
+FIRST_NAMES = ['James', 'Mary', 'Robert', 'Patricia', 'John', 'Jennifer', 'Michael',
+               'Linda', 'David', 'Elizabeth', 'Alex', 'Sam', 'Jordan', 'Taylor', 'Morgan']
+LAST_NAMES = ['Smith', 'Johnson', 'Williams', 'Brown', 'Jones', 'Garcia', 'Miller', 'Davis',
+              'Rodriguez', 'Martinez', 'Lopez', 'Wilson', 'Lee', 'Martin', 'Thompson']
+EMAIL_DOMAINS = ['example.com', 'example.org', 'example.net']
+
+# Users joined during the last JOIN_PERIOD_DAYS days
+JOIN_PERIOD_DAYS = 5 * 365
+
+
+def synthetic_count(using='default'):
+    """
+    Return the number of synthetic profiles already in the database.
+
+    Args:
+        using (str): Database alias.
+
+    Returns:
+        int: Number of users created by ``seed()``.
+    """
+    return User.objects.using(using).filter(username__startswith=USERNAME_PREFIX).count()
+
+
+def _next_id(model, using):
+    """Return the first ID following the rows of a table."""
+    return (model.objects.using(using).aggregate(last=Max('id'))['last'] or 0) + 1
+
+
+def _insert(cursor, connection, model, fields, rows):
+    """Insert row tuples into the columns of some fields of a model."""
+    opts = model._meta
+    columns = ', '.join(connection.ops.quote_name(opts.get_field(f).column) for f in fields)
+    placeholders = ', '.join(['%s'] * len(fields))
+    cursor.executemany(
+        f'INSERT INTO {connection.ops.quote_name(opts.db_table)} ({columns}) '
+        f'VALUES ({placeholders})',
+        rows,
+    )
+
+
+def _batch(rng, start, stop, ids, context):
+    """
+    Build the rows of the catalogue entries ``start`` to ``stop``.
+
+    Args:
+        rng (Random): Random generator of the batch.
+        start (int): Number of the first entry.
+        stop (int): Number following the last entry.
+        ids (tuple): First address and user IDs of the batch.
+        context (dict): Values shared by every row (adapted dates, password).
+
+    Returns:
+        tuple: Lists of address, letting, user and profile tuples.
+    """
+    address_id, user_id = ids
+    now, password, joined = context['now'], context['password'], context['joined']
+    size = stop - start
+    # Each column is drawn at once, far faster than a draw per row
+    cities = rng.choices(CITIES, cum_weights=context['cum_weights'], k=size)
+    favorites = rng.choices(CITIES, cum_weights=context['cum_weights'], k=size)
+    streets = rng.choices(STREETS, k=size)
+    street_types = rng.choices(STREET_TYPES, k=size)
+    titles = zip(rng.choices(TITLE_WORDS, k=size), rng.choices(TITLE_KINDS, k=size))
+    names = zip(rng.choices(FIRST_NAMES, k=size), rng.choices(LAST_NAMES, k=size))
+    domains = rng.choices(EMAIL_DOMAINS, k=size)
+    join_dates = rng.choices(joined, k=size)
+    addresses, lettings, users, profiles = [], [], [], []
+    for offset, (i, title, name) in enumerate(zip(range(start, stop), titles, names)):
+        city, state, first_zip, zip_count, _ = cities[offset]
+        addresses.append((
+            address_id + offset,
+            # Mostly 1-3 digit numbers, a few up to 9999
+            min(9999, int(rng.paretovariate(0.8))),
+            f'{streets[offset]} {street_types[offset]}',
+            city, state, first_zip + int(rng.random() * zip_count), 'USA', now,
+        ))
+        lettings.append((f'{title[0]} {title[1]} in {city}', address_id + offset, now))
+        first_name, last_name = name
+        users.append((
+            user_id + offset, f'{USERNAME_PREFIX}{i}', password, first_name, last_name,
+            f'{first_name}.{last_name}.{i}@{domains[offset]}'.lower(),
+            False, False, True, join_dates[offset],
+        ))
+        profiles.append((user_id + offset, favorites[offset][0], now))
+    return addresses, lettings, users, profiles
+
+
+def seed(rows, seed=DEFAULT_SEED, batch_size=DEFAULT_BATCH_SIZE, progress=None,
+         using='default'):
+    """
+    Grow the synthetic catalogue to ``rows`` lettings and profiles.
+
+    The random generator is derived from the seed and the position of each
+    batch, so growing a catalogue in several steps gives the same rows as
+    creating it at once, as long as the steps are multiples of the batch
+    size.
+
+    Args:
+        rows (int): Target number of synthetic lettings and profiles.
+        seed (int): Seed of the random generator.
+        batch_size (int): Number of entries inserted per transaction.
+        progress (callable): Called with the number of rows after each batch.
+        using (str): Database alias.
+
+    Returns:
+        int: Number of catalogue entries created.
+    """
+    existing = synthetic_count(using)
+    if existing >= rows:
+        return 0
+
+    connection = connections[using]
+    now = timezone.now()
+    # Join dates are drawn from a pool adapted once, as adapting is slow
+    pool = random.Random(seed)
+    context = {
+        'now': connection.ops.adapt_datetimefield_value(now),
+        'joined': [
+            connection.ops.adapt_datetimefield_value(
+                now - datetime.timedelta(seconds=pool.randrange(JOIN_PERIOD_DAYS * 86400))
+            )
+            for _ in range(1000)
+        ],
+        'password': make_password(PASSWORD),
+        'cum_weights': list(itertools.accumulate(CITY_WEIGHTS)),
+    }
+
+    for start in range(existing, rows, batch_size):
+        stop = min(start + batch_size, rows)
+        rng = random.Random(f'{seed}:{start}')
+        with transaction.atomic(using=using), connection.cursor() as cursor:
+            ids = (_next_id(Address, using), _next_id(User, using))
+            addresses, lettings, users, profiles = _batch(rng, start, stop, ids, context)
+            _insert(cursor, connection, Address,
+                    ['id', 'number', 'street', 'city', 'state', 'zip_code',
+                     'country_iso_code', 'updated_at'], addresses)
+            _insert(cursor, connection, Letting, ['title', 'address', 'updated_at'], lettings)
+            _insert(cursor, connection, User,
+                    ['id', 'username', 'password', 'first_name', 'last_name', 'email',
+                     'is_superuser', 'is_staff', 'is_active', 'date_joined'], users)
+            _insert(cursor, connection, Profile, ['user', 'favorite_city', 'updated_at'],
+                    profiles)
+            counters.add(Letting, len(lettings), using=using)
+            counters.add(Profile, len(profiles), using=using)
+        if progress is not None:
+            progress(stop)
+
+    # Sequences do not see explicit IDs (PostgreSQL)
+    with connection.cursor() as cursor:
+        for sql in connection.ops.sequence_reset_sql(no_style(), [Address, User]):
+            cursor.execute(sql)
+    # Raw inserts send no signals
+    membership.invalidate(using)
+    return rows - existing
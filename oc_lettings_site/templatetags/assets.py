@@ -0,0 +1,70 @@
+"""
+Template tags for static assets.
+
+Tags:
+    inline_static: Inline the content of a static file, e.g. critical CSS
+"""
+import functools
+import logging
+import posixpath
+import re
+
+from django import template
+from django.contrib.staticfiles import finders
+from django.templatetags.static import static
+from django.utils.safestring import mark_safe
+
+# Configure logger for this module
+logger = logging.getLogger(__name__)
+
+register = template.Library()
+
+_RELATIVE_URL_RE = re.compile(r'''url\((['"]?)(?![a-z]+:|/|#)([^'")]+)\1\)''')
+
+
+@functools.lru_cache(maxsize=None)
+def read_static(path):
+    """
+    Read a static file, rewriting its relative ``url()`` references.
+
+    Relative URLs are resolved against the file's own directory and turned
+    into absolute static URLs, so the content still works once inlined in a
+    page. The result is cached for the lifetime of the worker.
+
+    Args:
+        path (str): Path of the file, relative to the static directories.
+
+    Returns:
+        str: The file content, or an empty string if it does not exist.
+    """
+    absolute_path = finders.find(path)
+    if absolute_path is None:
+        logger.warning(f"Static file to inline not found: '{path}'")
+        return ''
+    with open(absolute_path, encoding='utf-8') as f:
+        content = f.read()
+
+    def absolute_url(match):
+        target = posixpath.normpath(posixpath.join(posixpath.dirname(path), match.group(2)))
+        return f'url("{static(target)}")'
+
+    return _RELATIVE_URL_RE.sub(absolute_url, content)
+
+
+@register.simple_tag
+def inline_static(path):
+    """
+    Return the content of a static file, to inline it in a template.
+
+    Usage::
+
+        {% load assets %}
+        <style>{% inline_static 'css/critical.min.css' %}</style>
+
+    Args:
+        path (str): Path of the file, relative to the static directories.
+
+    Returns:
+        SafeString: The (trusted) file content.
+    """
+    return mark_safe(read_static(path))
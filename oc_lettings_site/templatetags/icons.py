@@ -0,0 +1,78 @@
+"""
+Template tags rendering SVG icons on the server.
+
+The Feather icons used by the templates are vendored in
+``oc_lettings_site/icons/feather`` and inlined at render time, replacing
+the client-side ``feather.replace()`` call: pages display their icons
+without any JavaScript or third-party request.
+
+Tags:
+    icon: Inline a Feather icon, e.g. ``{% icon 'home' class='ms-2' %}``
+"""
+import functools
+import logging
+import re
+from pathlib import Path
+
+from django import template
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+# Configure logger for this module
+logger = logging.getLogger(__name__)
+
+register = template.Library()
+
+ICONS_DIR = Path(__file__).resolve().parent.parent / 'icons' / 'feather'
+
+_NAME_RE = re.compile(r'^[a-z0-9-]+$')
+_CLASS_ATTRIBUTE_RE = re.compile(r'\sclass="([^"]*)"')
+
+
+@functools.lru_cache(maxsize=None)
+def render_icon(name, css_class=''):
+    """
+    Return the SVG markup of an icon, with extra classes.
+
+    The markup is read once per worker and cached for each name and class
+    combination.
+
+    Args:
+        name (str): Feather icon name, e.g. ``'arrow-left'``.
+        css_class (str): Classes appended to ``feather feather-<name>``.
+
+    Returns:
+        str: The ``<svg>`` element, or an empty string for an unknown icon.
+    """
+    path = ICONS_DIR / f'{name}.svg'
+    if not _NAME_RE.match(name) or not path.exists():
+        logger.warning(f"Unknown icon: '{name}'")
+        return ''
+    svg = path.read_text(encoding='utf-8').strip()
+    if css_class:
+        svg = _CLASS_ATTRIBUTE_RE.sub(
+            lambda match: f' class="{match.group(1)} {escape(css_class)}"', svg, count=1
+        )
+    # Decorative icons next to a text label
+    return svg.replace('<svg ', '<svg aria-hidden="true" ', 1)
+
+
+@register.simple_tag(name='icon')
+def icon(name, **kwargs):
+    """
+    Inline a vendored Feather icon.
+
+    Usage::
+
+        {% load icons %}
+        {% icon 'home' %}
+        {% icon 'arrow-right' class='ms-2' %}
+
+    Args:
+        name (str): Feather icon name.
+        **kwargs: ``class`` adds CSS classes to the ``<svg>`` element.
+
+    Returns:
+        SafeString: The SVG markup.
+    """
+    return mark_safe(render_icon(name, kwargs.get('class', '')))
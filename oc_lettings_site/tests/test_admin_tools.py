@@ -0,0 +1,128 @@
+"""
+Tests for the admin helpers of large tables.
+
+This module checks the estimated counts, the paginator switching between
+estimated and exact counts, and the indexed searches.
+"""
+from unittest.mock import patch
+
+import pytest
+from django.contrib import admin
+from django.contrib.auth.models import User
+from django.test import RequestFactory
+
+from lettings.models import Address, Letting
+from oc_lettings_site import admin_tools
+from oc_lettings_site.admin_tools import EstimatedCountPaginator, estimate_count
+from profiles.models import Profile
+
+
+@pytest.fixture
+def addresses(db):
+    """Create five addresses, the first two in Boston."""
+    return [
+        Address.objects.create(
+            number=i, street=f'Street {i}', city='Boston' if i < 2 else 'Denver',
+            state='MA', zip_code=2100 + i, country_iso_code='USA'
+        )
+        for i in range(5)
+    ]
+
+
+def search(model, term):
+    """Return the IDs found by the admin search of a model."""
+    model_admin = admin.site._registry[model]
+    request = RequestFactory().get('/')
+    queryset, duplicates = model_admin.get_search_results(
+        request, model._default_manager.all(), term,
+    )
+    assert duplicates is False
+    return sorted(queryset.values_list('id', flat=True))
+
+
+class TestEstimateCount:
+    """Test cases for the estimated row counts."""
+
+    def test_sqlite_estimate(self, addresses):
+        """Test that SQLite estimates with the largest primary key."""
+        addresses[2].delete()
+
+        assert estimate_count(Address.objects.all()) == addresses[-1].id
+
+    def test_empty_table(self, db):
+        """Test the estimate of an empty table."""
+        assert estimate_count(Address.objects.all()) == 0
+
+    def test_filtered_queryset(self, addresses):
+        """Test that filtered querysets are not estimated."""
+        assert estimate_count(Address.objects.filter(city='Boston')) is None
+
+
+class TestEstimatedCountPaginator:
+    """Test cases for the EstimatedCountPaginator."""
+
+    def test_small_table_counted(self, addresses):
+        """Test that tables below the threshold are counted exactly."""
+        addresses[4].delete()
+
+        assert EstimatedCountPaginator(Address.objects.order_by('id'), 2).count == 4
+
+    def test_large_table_estimated(self, addresses, django_assert_num_queries):
+        """Test that large tables are not counted."""
+        with patch.object(admin_tools, 'ESTIMATE_THRESHOLD', 3):
+            paginator = EstimatedCountPaginator(Address.objects.order_by('id'), 2)
+            with django_assert_num_queries(1) as captured:
+                assert paginator.count == addresses[-1].id
+        assert 'COUNT' not in captured[0]['sql'].upper()
+        assert paginator.num_pages == 3
+
+    def test_filtered_counted(self, addresses):
+        """Test that searches of large tables are counted exactly."""
+        with patch.object(admin_tools, 'ESTIMATE_THRESHOLD', 3):
+            paginator = EstimatedCountPaginator(
+                Address.objects.filter(city='Boston').order_by('id'), 2)
+            assert paginator.count == 2
+
+
+@pytest.mark.django_db
+class TestIndexedSearch:
+    """Test cases for the search of the scalable admins."""
+
+    def test_search_by_city(self, addresses):
+        """Test an exact search on an indexed column."""
+        assert search(Address, 'Boston') == [addresses[0].id, addresses[1].id]
+
+    def test_search_is_exact(self, addresses):
+        """Test that partial words do not match (no full table scan)."""
+        assert search(Address, 'Bost') == []
+
+    def test_number_matches_id_and_zip(self, addresses):
+        """Test that a number matches the IDs and the ZIP codes."""
+        assert search(Address, str(addresses[3].zip_code)) == [addresses[3].id]
+        assert search(Address, str(addresses[2].id)) == [addresses[2].id]
+
+    def test_terms_combined(self, addresses):
+        """Test that every term must match."""
+        assert search(Address, f'Boston {addresses[1].zip_code}') == [addresses[1].id]
+        assert search(Address, f'Denver {addresses[1].zip_code}') == []
+
+    def test_related_lookup(self, addresses):
+        """Test a search through a relation."""
+        letting = Letting.objects.create(title='Flat', address=addresses[4])
+        Letting.objects.create(title='House', address=addresses[0])
+
+        assert search(Letting, 'Denver') == [letting.id]
+
+    def test_profile_search(self, db):
+        """Test the search of profiles by username or favorite city."""
+        first = Profile.objects.create(user=User.objects.create_user('alice'),
+                                       favorite_city='Paris')
+        second = Profile.objects.create(user=User.objects.create_user('bob'),
+                                        favorite_city='alice')
+
+        assert search(Profile, 'alice') == [first.id, second.id]
+        assert search(Profile, 'Paris') == [first.id]
+
+    def test_empty_term(self, addresses):
+        """Test that an empty search returns everything."""
+        assert len(search(Address, '')) == 5
@@ -0,0 +1,175 @@
+"""
+Tests for the synthetic catalogue and the view benchmark suite.
+
+This module checks the deterministic seeding, the benchmarked cases, the
+measured results and the ``bench_views`` command.
+"""
+import json
+from unittest.mock import patch
+
+import pytest
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+from lettings.models import Letting
+from oc_lettings_site import benchmark, synthetic
+from profiles.models import Profile
+
+
+class TestPercentile:
+    """Test cases for the percentile interpolation."""
+
+    def test_interpolation(self):
+        """Test the percentiles of a known series."""
+        values = list(range(1, 101))
+        assert benchmark.percentile(values, 0.5) == pytest.approx(50.5)
+        assert benchmark.percentile(values, 0.99) == pytest.approx(99.01)
+        assert benchmark.percentile(values, 1) == 100
+
+    def test_empty(self):
+        """Test that no value gives 0."""
+        assert benchmark.percentile([], 0.95) == 0.0
+
+
+@pytest.mark.django_db
+class TestSeed:
+    """Test cases for the synthetic catalogue."""
+
+    def test_seed_creates_rows(self):
+        """Test that every model gets the requested number of rows."""
+        assert synthetic.seed(12, batch_size=5) == 12
+
+        assert Letting.objects.count() == 12
+        assert Profile.objects.count() == 12
+        assert synthetic.synthetic_count() == 12
+
+    def test_seed_grows_catalogue(self):
+        """Test that growing in steps gives the same rows as seeding at once."""
+        synthetic.seed(10, batch_size=5)
+        assert synthetic.seed(20, batch_size=5) == 10
+        grown = list(Letting.objects.order_by('id').values_list('title', 'address__city'))
+
+        Letting.objects.all().delete()
+        User.objects.all().delete()
+        synthetic.seed(20, batch_size=5)
+        at_once = list(Letting.objects.order_by('id').values_list('title', 'address__city'))
+
+        assert grown == at_once
+
+    def test_seed_is_idempotent(self):
+        """Test that seeding to the current size creates nothing."""
+        synthetic.seed(5)
+        assert synthetic.seed(5) == 0
+        assert Letting.objects.count() == 5
+
+    def test_seeded_pages_found(self, client):
+        """Test that the membership indexes know the seeded rows."""
+        synthetic.seed(3)
+        letting = Letting.objects.first()
+
+        assert client.get(f'/lettings/{letting.id}/').status_code == 200
+        assert client.get(f'/profiles/{synthetic.USERNAME_PREFIX}0/').status_code == 200
+
+
+@pytest.mark.django_db
+class TestBenchmark:
+    """Test cases for the benchmark suite."""
+
+    def test_every_pattern_covered(self):
+        """Test that every named URL pattern has a case."""
+        synthetic.seed(3)
+        cases = benchmark.build_cases()
+
+        assert benchmark.uncovered_patterns(cases) == []
+        assert 'admin:lettings_letting_changelist' in cases
+        assert len(cases['lettings:letting']) == 3
+
+    def test_run_benchmark(self):
+        """Test the results reported for every case."""
+        synthetic.seed(3)
+        seen = []
+
+        report = benchmark.run_benchmark(
+            3, iterations=4, progress=lambda name, result: seen.append(name),
+        )
+
+        assert report['meta']['rows'] == 3
+        assert report['meta']['database'] == 'sqlite'
+        assert list(report['results']) == seen
+        result = report['results']['lettings:index']
+        assert result['statuses'] == [200]
+        assert result['queries'] >= 1
+        assert result['p50_ms'] <= result['p95_ms'] <= result['p99_ms']
+        assert result['peak_memory_kib'] > 0
+        assert report['results']['not-found']['statuses'] == [404]
+        assert report['results']['admin:index']['statuses'] == [200]
+
+    def test_streamed_pages_measured(self, settings):
+        """Test that the queries sent with a streamed page are measured."""
+        synthetic.seed(3)
+        settings.STREAMING_RENDER = True
+
+        report = benchmark.run_benchmark(3, iterations=2, cases=['lettings:index'])
+
+        # The rows are read once the head was sent
+        assert report['results']['lettings:index']['queries'] == 1
+
+    def test_run_selected_cases(self):
+        """Test that only the requested cases are measured."""
+        report = benchmark.run_benchmark(0, iterations=2, cases=['index'])
+
+        assert list(report['results']) == ['index']
+
+    def test_compare(self):
+        """Test the relative change of the median latencies."""
+        before = {'results': {'index': {'p50_ms': 2.0}, 'gone': {'p50_ms': 1.0}}}
+        after = {'results': {'index': {'p50_ms': 1.5}, 'new': {'p50_ms': 1.0}}}
+
+        assert benchmark.compare(before, after) == {'index': -0.25}
+
+
+@pytest.mark.django_db
+class TestBenchViewsCommand:
+    """Test cases for the bench_views management command."""
+
+    @pytest.fixture(autouse=True)
+    def test_database(self):
+        """Run in the database of the test instead of a new one."""
+        module = 'oc_lettings_site.management.commands.bench_views'
+        with patch('django.db.backends.base.creation.BaseDatabaseCreation.create_test_db'), \
+                patch('django.db.backends.base.creation.BaseDatabaseCreation.destroy_test_db'), \
+                patch(f'{module}.setup_test_environment'), \
+                patch(f'{module}.teardown_test_environment'):
+            yield
+
+    def test_reports_written(self, tmp_path, capsys):
+        """Test that one report per size is written."""
+        output = tmp_path / 'bench.json'
+
+        call_command('bench_views', rows=[4, 2], iterations=2, cases=['index'],
+                     output=str(output))
+
+        reports = json.loads(output.read_text())
+        assert [report['meta']['rows'] for report in reports] == [2, 4]
+        assert 'index' in capsys.readouterr().out
+
+    def test_compare_with_previous(self, tmp_path, capsys):
+        """Test that the changes from a previous run are printed."""
+        previous = tmp_path / 'previous.json'
+        previous.write_text(json.dumps([{
+            'meta': {'rows': 2, 'commit': 'abc123'},
+            'results': {'index': {'p50_ms': 1000.0}},
+        }]))
+
+        call_command('bench_views', rows=[2], iterations=2, cases=['index'],
+                     output=str(tmp_path / 'bench.json'), compare=str(previous))
+
+        out = capsys.readouterr().out
+        assert 'vs abc123' in out
+        assert '-' in out.split('vs abc123')[1]
+
+    def test_unreadable_previous(self, tmp_path):
+        """Test that a missing previous report is an error."""
+        with pytest.raises(CommandError):
+            call_command('bench_views', compare=str(tmp_path / 'missing.json'))
@@ -0,0 +1,137 @@
+"""
+Tests for the deploy-time cache warming.
+
+This module checks the ranking of the pages from the access log, the
+pages warmed, the report and the ``warm_cache`` command.
+"""
+import pytest
+from django.core.cache import caches
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+from oc_lettings_site import cache_warming
+from oc_lettings_site.cache_warming import popular_details, warm_paths, warm_site
+
+LOG = """\
+INFO 2026-10-19 10:00:00,000 views 1 1 Letting detail accessed: ID=2, IP=10.0.0.1
+INFO 2026-10-19 10:00:01,000 views 1 1 Letting detail accessed: ID=2, IP=10.0.0.2
+INFO 2026-10-19 10:00:02,000 views 1 1 Profile detail accessed: username='user1', IP=10.0.0.1
+INFO 2026-10-19 10:00:03,000 views 1 1 Letting detail accessed: ID=1, IP=cache-warming
+INFO 2026-10-19 10:00:04,000 views 1 1 Letting detail accessed: ID=99, IP=10.0.0.1
+"""
+
+
+@pytest.fixture
+def access_log(tmp_path):
+    """Write an access log with letting and profile page hits."""
+    path = tmp_path / 'django.log'
+    path.write_text(LOG)
+    return path
+
+
+class TestPopularDetails:
+    """Test cases for the ranking of the detail pages."""
+
+    def test_ranking(self, access_log):
+        """Test that the pages are ranked by their hits."""
+        hits = popular_details(access_log)
+
+        # The hit of the warming itself is left out
+        assert hits.most_common() == [
+            ('/lettings/2/', 2), ('/profiles/user1/', 1), ('/lettings/99/', 1),
+        ]
+
+    def test_tail_only(self, access_log):
+        """Test that only the complete lines of the end of the log are read."""
+        last_line = LOG.splitlines()[-1]
+
+        hits = popular_details(access_log, max_bytes=len(last_line) + 10)
+
+        assert hits == {'/lettings/99/': 1}
+
+    def test_missing_log(self, tmp_path):
+        """Test that a missing log ranks nothing."""
+        assert not popular_details(tmp_path / 'missing.log')
+
+
+class TestWarmSite:
+    """Test cases for warm_site and warm_paths."""
+
+    def test_popular_then_recent(self, catalogue, access_log):
+        """Test that popular pages come first, completed with recent ones."""
+        report = warm_site(top=5, workers=1, log_path=access_log)
+
+        pages = report['pages']
+        assert [pages[path][0] for path in cache_warming.LIST_PATHS] == [200, 200, 200]
+        details = [path for path in pages if path not in cache_warming.LIST_PATHS]
+        assert details[:3] == ['/lettings/2/', '/profiles/user1/', '/lettings/99/']
+        assert len(details) == 5
+        # Deleted since it was logged
+        assert pages['/lettings/99/'][0] == 404
+        assert report['warmed'] == 7
+        assert report['failed'] == 0
+        assert report['hit_coverage'] == 1
+
+    def test_sitemaps(self, catalogue, tmp_path, settings):
+        """Test that the sitemaps are warmed under the public URL in a shared cache."""
+        settings.ALLOWED_HOSTS = ['example.com']
+        settings.CACHES = {**settings.CACHES, 'shared': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': str(tmp_path / 'shared'),
+        }}
+
+        report = warm_site(top=0, workers=1, base_url='https://example.com',
+                           log_path=tmp_path / 'empty.log', lists=False)
+
+        assert report['hit_coverage'] is None
+        assert set(report['pages']) == {
+            '/sitemap.xml', '/sitemap-lettings-0.xml', '/sitemap-profiles-0.xml'
+        }
+        assert caches['shared'].get('sitemap:index:https://example.com') is not None
+
+    def test_sitemaps_skipped_in_local_cache(self, catalogue, tmp_path, settings):
+        """Test that sitemaps are not warmed in a cache local to the process."""
+        settings.CACHES = {**settings.CACHES, 'shared': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }}
+        report = warm_site(top=0, workers=1, base_url='https://example.com',
+                           log_path=tmp_path / 'empty.log', lists=False)
+
+        assert report['pages'] == {}
+
+    def test_errors_reported(self, catalogue, monkeypatch):
+        """Test that a failing page is reported, not raised."""
+        def broken(*args, **kwargs):
+            raise RuntimeError('boom')
+
+        monkeypatch.setattr('lettings.views.render', broken)
+
+        pages = warm_paths(['/lettings/', '/lettings/1/'], workers=1)
+
+        assert pages['/lettings/'][0] is None
+        assert pages['/lettings/1/'][0] is None
+
+    def test_thread_pool(self, live_catalogue):
+        """Test that pages are warmed by several threads."""
+        pages = warm_paths(['/lettings/', '/lettings/1/', '/profiles/user1/'], workers=3)
+
+        assert [status for status, _ in pages.values()] == [200, 200, 200]
+
+
+class TestWarmCacheCommand:
+    """Test cases for the warm_cache management command."""
+
+    def test_report(self, catalogue, access_log, capsys):
+        """Test that the command reports the pages, coverage and time."""
+        call_command('warm_cache', '--top=2', '--workers=1', f'--log={access_log}',
+                     '--no-lists', verbosity=2)
+
+        out = capsys.readouterr().out
+        assert 'Warmed 2 of 2 pages' in out
+        assert '75% of the logged detail page hits covered' in out
+        assert '/lettings/2/' in out
+
+    def test_invalid_options(self, db):
+        """Test that invalid sizes are refused."""
+        with pytest.raises(CommandError):
+            call_command('warm_cache', workers=0)
@@ -0,0 +1,141 @@
+"""
+Tests for the maintained row counters.
+
+This module checks that the counters follow the saves, deletions and bulk
+paths, and that drifted or missing counters are repaired.
+"""
+import logging
+from unittest.mock import patch
+
+import pytest
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+from lettings.bulk import delete_addresses, delete_lettings
+from lettings.models import Address, Letting
+from oc_lettings_site import counters, synthetic
+from oc_lettings_site.admin_tools import EstimatedCountPaginator
+from oc_lettings_site.models import Counter
+from profiles.models import Profile
+
+
+@pytest.fixture
+def counted(db):
+    """Start from reconciled counters, as a flush may have removed them."""
+    counters.reconcile()
+
+
+def create_letting(number):
+    """Create a letting and its address."""
+    address = Address.objects.create(
+        number=number, street='Street', city='Test City',
+        state='TS', zip_code=12345, country_iso_code='TST'
+    )
+    return Letting.objects.create(title=f'Letting {number}', address=address)
+
+
+def create_profile(username):
+    """Create a profile and its user."""
+    return Profile.objects.create(user=User.objects.create_user(username=username),
+                                  favorite_city='Paris')
+
+
+class TestCounters:
+    """Test cases for the counters API and the signal handlers."""
+
+    def test_saves_and_deletions(self, counted):
+        """Test that the counters follow inserts and deletions, not updates."""
+        lettings = [create_letting(number) for number in (1, 2, 3)]
+        profile = create_profile('alice')
+        create_profile('bob')
+        lettings[0].title = 'Renamed'
+        lettings[0].save()
+
+        assert counters.value(Letting) == 3
+        assert counters.value(Profile) == 2
+
+        lettings[1].delete()
+        # The profile is deleted with its user
+        profile.user.delete()
+        Address.objects.filter(letting=lettings[2]).delete()
+
+        assert counters.values() == {'lettings.letting': 1, 'profiles.profile': 1}
+
+    def test_insert_rolled_back_with_counter(self, transactional_db):
+        """Test that an insert is not committed when its counter update fails."""
+        counters.reconcile()
+
+        with patch.object(counters, 'add', side_effect=RuntimeError('boom')):
+            with pytest.raises(RuntimeError):
+                create_profile('alice')
+
+        assert not Profile.objects.exists()
+        assert counters.value(Profile) == 0
+
+    def test_bulk_paths(self, counted):
+        """Test that the bulk inserts and deletions update the counters."""
+        synthetic.seed(5, batch_size=2)
+
+        assert counters.value(Letting) == 5
+        assert counters.value(Profile) == 5
+
+        first = Letting.objects.order_by('id').values_list('id', flat=True)[:3]
+        delete_lettings(Letting.objects.filter(id__in=list(first[:2])), batch_size=1)
+        delete_addresses(Address.objects.filter(letting__id=first[2]))
+
+        assert counters.value(Letting) == 2
+        assert counters.reconcile(dry_run=True)['lettings.letting'] == (2, 2)
+
+    def test_uncounted_model(self, counted):
+        """Test that models without counter are ignored or refused."""
+        counters.add(Address, 1)
+
+        with pytest.raises(ValueError):
+            counters.value(Address)
+
+    def test_missing_counter(self, counted, caplog):
+        """Test that a missing counter is answered with a count."""
+        create_letting(1)
+        Counter.objects.all().delete()
+
+        with caplog.at_level(logging.WARNING, logger='oc_lettings_site.counters'):
+            assert counters.value(Letting) == 1
+
+        assert 'Counter lettings.letting is missing' in caplog.text
+        assert counters.reconcile()['lettings.letting'] == (None, 1)
+        assert counters.values()['lettings.letting'] == 1
+
+    def test_paginator_reads_counter(self, counted):
+        """Test that the admin paginator reads unfiltered counts from the counters."""
+        create_letting(1)
+        Counter.objects.filter(name='lettings.letting').update(value=42)
+
+        assert EstimatedCountPaginator(Letting.objects.order_by('-id'), 50).count == 42
+        filtered = Letting.objects.filter(id__gt=0).order_by('-id')
+        assert EstimatedCountPaginator(filtered, 50).count == 1
+
+
+class TestReconcileCommand:
+    """Test cases for the reconcile_counters management command."""
+
+    def test_repairs_drift(self, counted, capsys):
+        """Test that drifted counters are repaired."""
+        create_profile('alice')
+        Counter.objects.filter(name='profiles.profile').update(value=7)
+
+        call_command('reconcile_counters')
+
+        assert 'profiles.profile: 1 (repaired, 7 stored)' in capsys.readouterr().out
+        assert counters.value(Profile) == 1
+
+    def test_check_fails_on_drift(self, counted, capsys):
+        """Test that --check reports the drift without repairing it."""
+        call_command('reconcile_counters', check=True)
+        Counter.objects.filter(name='lettings.letting').delete()
+
+        with pytest.raises(CommandError, match='1 counter'):
+            call_command('reconcile_counters', check=True)
+
+        assert 'lettings.letting: 0 (drifted, missing stored)' in capsys.readouterr().out
+        assert not Counter.objects.filter(name='lettings.letting').exists()
@@ -0,0 +1,239 @@
+"""
+Tests for the CSS tree-shaking build step.
+
+This module covers the selector matching, the small CSS parser and
+minifier, the ``purge_css`` command and the ``inline_static`` template tag.
+"""
+import io
+from unittest.mock import patch
+
+import pytest
+from django.core.management import call_command
+from django.template import Context, Template
+
+from oc_lettings_site import css_purge
+from oc_lettings_site.templatetags.assets import read_static
+
+STYLESHEET = '''@charset "UTF-8";
+/*! Theme v1 | MIT */
+:root { --primary: #a22b02; }
+/* regular comment */
+body { margin: 0; font-family: "Metropolis", sans-serif; }
+.btn, .btn-unused { color: red; }
+.card > .card-body { padding: 1rem 2rem; }
+.unused .btn { color: blue; }
+a:not([href]):hover { color: inherit; }
+#main { display: block; }
+table td { border: 0; }
+.icon { background: url("data:image/svg+xml;charset=utf8,%3csvg%3e"); }
+.spin { animation: spin 1s linear infinite; }
+@keyframes spin { from { transform: rotate(0deg); } to { transform: rotate(360deg); } }
+@keyframes unused-bounce { 50% { top: 1px; } }
+@font-face { font-family: "Metropolis"; src: url("../fonts/m.otf"); }
+@media (min-width: 992px) {
+  .btn { padding: 0 ; }
+  .modal { display: none; }
+}
+@media print { .modal { display: none; } }
+'''
+
+TEMPLATE = '''{% extends "base.html" %}
+{% block content %}
+<div id="main" class="card {% if wide %}wide{% endif %}">
+  <h1 class="title">Title</h1>
+</div>
+<div class="card-body"><a href="/" class="btn icon spin">Go</a></div>
+{% endblock %}'''
+
+
+@pytest.fixture
+def project(tmp_path):
+    """Create a stylesheet and a template directory to purge against."""
+    source = tmp_path / 'styles.css'
+    source.write_text(STYLESHEET)
+    templates = tmp_path / 'templates'
+    templates.mkdir()
+    (templates / 'page.html').write_text(TEMPLATE)
+    return tmp_path
+
+
+class TestUsage:
+    """Test cases for the collection and matching of selector tokens."""
+
+    def setup_method(self):
+        self.usage = css_purge.Usage(['show'])
+        self.usage.add_markup(TEMPLATE)
+
+    def test_tokens_collected_from_markup(self):
+        """Test that classes, ids, tags and attributes are collected."""
+        assert {'card', 'wide', 'card-body', 'btn', 'show'} <= self.usage.classes
+        assert self.usage.ids == {'main'}
+        assert {'html', 'body', 'div', 'h1', 'a'} <= self.usage.tags
+        assert 'href' in self.usage.attributes
+
+    @pytest.mark.parametrize('selector, expected', [
+        ('.btn', True),
+        ('.card > .card-body', True),
+        ('a:not([href]):hover', True),
+        ('#main', True),
+        (':root', True),
+        ('.show', True),
+        ('.unused .btn', False),
+        ('table td', False),
+        ('#other', False),
+        ('[type=button]', False),
+    ])
+    def test_selector_matching(self, selector, expected):
+        """Test that selectors requiring unused tokens are rejected."""
+        assert self.usage.matches(selector) is expected
+
+
+class TestPurgeStylesheet:
+    """Test cases for the parser, purge and minifier."""
+
+    def setup_method(self):
+        usage = css_purge.Usage()
+        usage.add_markup(TEMPLATE)
+        self.css = css_purge.purge_stylesheet(STYLESHEET, usage)
+
+    def test_unused_rules_and_selectors_are_removed(self):
+        """Test that only the matching selectors of each rule are kept."""
+        assert '.btn{color:red}' in self.css
+        assert 'btn-unused' not in self.css
+        assert 'color:blue' not in self.css
+        assert 'table' not in self.css
+        assert '.modal' not in self.css
+        assert '@media print' not in self.css
+
+    def test_at_rules(self):
+        """Test charset, font-face, media queries and keyframes handling."""
+        assert self.css.startswith('@charset "UTF-8";/*! Theme v1 | MIT */')
+        assert '@font-face{font-family:"Metropolis";src:url("../fonts/m.otf")}' in self.css
+        assert '@media (min-width: 992px){.btn{padding:0}}' in self.css
+        assert '@keyframes spin{from{transform:rotate(0deg)}' in self.css
+        assert 'unused-bounce' not in self.css
+
+    def test_minification(self):
+        """Test that comments and whitespace are removed, strings preserved."""
+        assert 'regular comment' not in self.css
+        assert '.card>.card-body{padding:1rem 2rem}' in self.css
+        assert 'font-family:"Metropolis",sans-serif' in self.css
+        assert 'url("data:image/svg+xml;charset=utf8,%3csvg%3e")' in self.css
+
+    def test_critical_markup(self):
+        """Test the above-the-fold extraction of layouts and pages."""
+        layout = '<head><link></head><nav class="nav"></nav>{% block content %}{% endblock %}'
+
+        assert css_purge.critical_markup(layout) == '<head><link></head><nav class="nav"></nav>'
+        page = css_purge.critical_markup(TEMPLATE)
+        assert 'title' in page and 'card-body' not in page
+        assert css_purge.critical_markup('<p>static</p>') == '<p>static</p>'
+
+
+class TestBuild:
+    """Test cases for the build step and the purge_css command."""
+
+    def test_build_writes_stylesheets(self, project):
+        """Test that the purged and critical stylesheets are written."""
+        report = css_purge.build(
+            source=project / 'styles.css',
+            output=project / 'styles.min.css',
+            critical_output=project / 'critical.min.css',
+            template_dirs=[project / 'templates'],
+            safelist=[],
+        )
+
+        purged = (project / 'styles.min.css').read_text()
+        critical = (project / 'critical.min.css').read_text()
+        assert '.card>.card-body' in purged
+        assert '.card>.card-body' not in critical
+        assert '#main' in critical and '@charset' not in critical
+        assert report['purged']['bytes'] == len(purged.encode())
+        assert report['purged']['bytes'] < report['source']['bytes']
+
+    def test_admin_overrides_not_scanned(self, tmp_path):
+        """Test that templates overriding admin pages are left out."""
+        (tmp_path / 'admin').mkdir()
+        (tmp_path / 'admin' / 'page.html').write_text('<h2 class="admin-only">x</h2>')
+        (tmp_path / 'page.html').write_text('<p class="theme">x</p>')
+
+        css = '.admin-only{color:red}.theme{color:blue}h2{margin:0}'
+        purged = css_purge.purge_stylesheet(css, css_purge.collect_usage([tmp_path]))
+
+        assert purged == '.theme{color:blue}\n'
+
+    def test_project_template_dirs(self, settings):
+        """Test that project templates are scanned but not the admin ones."""
+        dirs = [str(d) for d in css_purge.project_template_dirs()]
+
+        assert str(settings.BASE_DIR / 'templates') in dirs
+        assert str(settings.BASE_DIR / 'lettings' / 'templates') in dirs
+        assert not any('django/contrib/admin' in d for d in dirs)
+
+    def test_purge_css_command(self, project, settings, capsys):
+        """Test that the command reports the size reduction."""
+        settings.CSS_PURGE = {
+            'SOURCE': project / 'styles.css',
+            'OUTPUT': project / 'styles.min.css',
+            'CRITICAL_OUTPUT': project / 'critical.min.css',
+        }
+        settings.TEMPLATES = [dict(settings.TEMPLATES[0], DIRS=[project / 'templates'])]
+
+        call_command('purge_css')
+
+        output = capsys.readouterr().out
+        assert 'purged' in output and '% smaller' in output
+        assert (project / 'styles.min.css').exists()
+
+    def test_collectstatic_runs_purge(self, tmp_path, settings):
+        """Test that collectstatic regenerates the stylesheets first."""
+        settings.STATIC_ROOT = str(tmp_path)
+        settings.STATICFILES_DIRS = []
+        settings.STATICFILES_FINDERS = []
+        sizes = {'bytes': 1, 'gzip_bytes': 1}
+
+        output = io.StringIO()
+
+        with patch('oc_lettings_site.management.commands.purge_css.build',
+                   return_value={'source': sizes, 'purged': sizes, 'critical': sizes}) as build:
+            call_command('collectstatic', '--noinput', stdout=output)
+
+        build.assert_called_once()
+        # The purge reports to the output of collectstatic
+        assert output.getvalue().index('purged') < output.getvalue().index('static file')
+
+
+class TestInlineStatic:
+    """Test cases for the inline_static template tag."""
+
+    def setup_method(self):
+        read_static.cache_clear()
+
+    def teardown_method(self):
+        read_static.cache_clear()
+
+    def test_relative_urls_are_made_absolute(self, tmp_path, settings):
+        """Test that inlined CSS still points to the right files."""
+        (tmp_path / 'css').mkdir()
+        (tmp_path / 'css' / 'inline.css').write_text(
+            '@font-face{src:url("../fonts/a.otf")}.i{background:url(data:x)}'
+        )
+        settings.STATICFILES_DIRS = [str(tmp_path)]
+
+        rendered = Template(
+            "{% load assets %}<style>{% inline_static 'css/inline.css' %}</style>"
+        ).render(Context())
+
+        assert 'url("/static/fonts/a.otf")' in rendered
+        assert 'url(data:x)' in rendered
+
+    def test_missing_file_renders_nothing(self):
+        """Test that a missing file is inlined as an empty string."""
+        assert read_static('css/does-not-exist.css') == ''
+
+    def test_base_layout_inlines_critical_css(self, client, db):
+        """Test that pages inline the critical CSS and defer the stylesheet."""
+        content = client.get('/').content.decode()
+
+        assert '<style>:root{' in content
+        assert 'rel="preload"' in content and 'styles.min' in content
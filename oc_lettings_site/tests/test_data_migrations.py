@@ -0,0 +1,182 @@
+"""
+Tests for the batched data migration helpers.
+
+This module runs the data transfer migrations of the lettings and profiles
+applications against the old tables, and checks that the copies keep the
+IDs and relations, run in batches and resume after an interruption, and
+that the squashed migrations of new databases reach the same schema.
+"""
+import pytest
+from django.contrib.auth.models import User
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.db.migrations.loader import MigrationLoader
+from django.db.migrations.writer import OperationWriter
+
+from oc_lettings_site.data_migrations import CopyModels, copy_rows, delete_rows
+
+BEFORE_TRANSFER = [
+    ('oc_lettings_site', '0001_initial'),
+    ('lettings', '0001_initial'),
+    ('profiles', '0001_initial'),
+]
+AFTER_TRANSFER = [('lettings', '0002_transfer_data'), ('profiles', '0002_transfer_data')]
+
+
+class ReplacedMigrationLoader(MigrationLoader):
+    """
+    Loader following the migrations replaced by squashes.
+
+    The test database is created by the squashed migrations, which skip the
+    data transfer; databases created before the squash still run the
+    original ones, as this loader does.
+    """
+
+    def __init__(self, connection):
+        super().__init__(connection, replace_migrations=False)
+
+    def build_graph(self):
+        super().build_graph()
+        for key, migration in self.replacements.items():
+            self.graph.remove_replacement_node(key, migration.replaces)
+            self.applied_migrations.pop(key, None)
+
+
+def executor():
+    """Return a migration executor running the original migrations."""
+    migration_executor = MigrationExecutor(connection)
+    migration_executor.loader = ReplacedMigrationLoader(connection)
+    return migration_executor
+
+
+def migrate(targets):
+    """Migrate the test database and return the apps of the reached state."""
+    migration_executor = executor()
+    migration_executor.migrate(targets)
+    return executor().loader.project_state(targets).apps
+
+
+@pytest.fixture
+def old_apps(transactional_db):
+    """Migrate back before the data transfer, then forward again."""
+    apps = migrate(BEFORE_TRANSFER)
+    yield apps
+    migrate(executor().loader.graph.leaf_nodes())
+
+
+def create_old_rows(apps, count):
+    """Fill the old tables with ``count`` addresses, lettings and profiles."""
+    OldAddress = apps.get_model('oc_lettings_site', 'Address')
+    OldLetting = apps.get_model('oc_lettings_site', 'Letting')
+    OldProfile = apps.get_model('oc_lettings_site', 'Profile')
+    for i in range(count):
+        # Sparse IDs, to check that they are kept
+        address = OldAddress.objects.create(
+            id=10 * i + 3, number=i + 1, street='Main Street', city='Austin',
+            state='TX', zip_code=73301, country_iso_code='USA'
+        )
+        OldLetting.objects.create(id=10 * i + 5, title=f'Letting {i}', address_id=address.id)
+        user = User.objects.create(username=f'user{i}')
+        OldProfile.objects.create(id=10 * i + 7, user_id=user.id, favorite_city=f'City {i}')
+
+
+class TestDataMigrations:
+    """Test cases for the data transfer migrations and their helpers."""
+
+    def test_transfer(self, old_apps):
+        """Test that the migrations copy every row with its ID and relations."""
+        create_old_rows(old_apps, 5)
+
+        apps = migrate(AFTER_TRANSFER)
+
+        Letting = apps.get_model('lettings', 'Letting')
+        Profile = apps.get_model('profiles', 'Profile')
+        lettings = list(Letting.objects.order_by('id').values_list('id', 'title', 'address_id'))
+        assert lettings == [(10 * i + 5, f'Letting {i}', 10 * i + 3) for i in range(5)]
+        assert apps.get_model('lettings', 'Address').objects.get(id=13).number == 2
+        profile = Profile.objects.get(id=27)
+        assert (profile.user_id, profile.favorite_city) == (
+            User.objects.get(username='user2').id, 'City 2')
+
+    def test_transfer_reversed(self, old_apps):
+        """Test that reversing the migrations empties the new tables."""
+        create_old_rows(old_apps, 3)
+        apps = migrate(AFTER_TRANSFER)
+
+        apps = migrate(BEFORE_TRANSFER)
+
+        assert not apps.get_model('lettings', 'Address').objects.exists()
+        assert not apps.get_model('profiles', 'Profile').objects.exists()
+        assert apps.get_model('oc_lettings_site', 'Letting').objects.count() == 3
+
+    def test_copy_in_batches(self, old_apps, django_assert_max_num_queries):
+        """Test that a copy runs a bounded number of queries per batch."""
+        create_old_rows(old_apps, 20)
+        source = old_apps.get_model('oc_lettings_site', 'Address')
+        target = old_apps.get_model('lettings', 'Address')
+        progress = []
+
+        # Per batch of 5: a savepoint, an insert and a release
+        with django_assert_max_num_queries(4 + 3 * 4):
+            copied = copy_rows(source, target, batch_size=5,
+                               progress=lambda *args: progress.append(args))
+
+        assert copied == 20
+        assert progress == [(5, 20), (10, 20), (15, 20), (20, 20)]
+        assert target.objects.count() == 20
+
+    def test_copy_resumes(self, old_apps):
+        """Test that an interrupted copy resumes after the committed batches."""
+        create_old_rows(old_apps, 10)
+        source = old_apps.get_model('oc_lettings_site', 'Address')
+        target = old_apps.get_model('lettings', 'Address')
+
+        def interrupt(copied, total):
+            raise KeyboardInterrupt
+
+        with pytest.raises(KeyboardInterrupt):
+            copy_rows(source, target, batch_size=4, progress=interrupt)
+        assert target.objects.count() == 4
+
+        assert copy_rows(source, target, batch_size=4) == 6
+        assert list(target.objects.order_by('id').values_list('id', flat=True)) == [
+            10 * i + 3 for i in range(10)
+        ]
+
+    def test_delete_rows(self, old_apps):
+        """Test that every row is deleted, in batches."""
+        create_old_rows(old_apps, 7)
+        Letting = old_apps.get_model('oc_lettings_site', 'Letting')
+
+        assert delete_rows(Letting, batch_size=3) == 7
+        assert not Letting.objects.exists()
+
+    def test_operation_serialized(self):
+        """Test that the operation can be written by makemigrations and squashmigrations."""
+        operation = CopyModels([('oc_lettings_site.Address', 'lettings.Address')],
+                               batch_size=10)
+
+        code, imports = OperationWriter(operation).serialize()
+
+        assert 'import oc_lettings_site.data_migrations' in imports
+        assert code.strip().startswith('oc_lettings_site.data_migrations.CopyModels(')
+        assert "('oc_lettings_site.Address', 'lettings.Address')" in code
+        assert 'batch_size=10' in code
+        assert operation.describe() == (
+            'Copy rows of oc_lettings_site.Address to lettings.Address')
+
+    def test_squashed_migrations(self):
+        """Test that new databases skip the transfer and reach the same schema."""
+        squashed = MigrationLoader(None)
+        original = ReplacedMigrationLoader(None)
+
+        assert ('lettings', '0001_squashed_0004_search_indexes') in squashed.graph.nodes
+        assert ('lettings', '0002_transfer_data') not in squashed.graph.nodes
+        assert ('profiles', '0002_transfer_data') not in squashed.graph.nodes
+        for model in [('lettings', 'address'), ('lettings', 'letting'), ('profiles', 'profile')]:
+            expected = original.project_state().models[model]
+            state = squashed.project_state().models[model]
+            assert {name: field.deconstruct()[1:] for name, field in state.fields.items()} == {
+                name: field.deconstruct()[1:] for name, field in expected.fields.items()
+            }
+            assert state.options == expected.options
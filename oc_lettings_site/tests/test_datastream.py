@@ -0,0 +1,120 @@
+"""
+Tests for the streaming NDJSON dump and load.
+
+This module checks the round trip of the ``dumpdata_ndjson`` and
+``loaddata_ndjson`` commands, including compressed files, dependency
+ordering and error reporting.
+"""
+import json
+
+import pytest
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+from lettings.models import Address, Letting
+from oc_lettings_site.datastream import load_records, open_stream, resolve_models
+from profiles.models import Profile
+
+
+def clear_catalogue():
+    """Delete every row of the dumped models."""
+    Letting.objects.all().delete()
+    Address.objects.all().delete()
+    Profile.objects.all().delete()
+    User.objects.all().delete()
+
+
+class TestDataStream:
+    """Test cases for the NDJSON dump and load commands."""
+
+    def test_models_sorted_by_dependency(self):
+        """Test that referenced models are dumped before their dependents."""
+        models = resolve_models(['profiles.profile', 'lettings.letting',
+                                 'lettings.address', 'auth.user'])
+        labels = [model._meta.label_lower for model in models]
+
+        assert labels.index('auth.user') < labels.index('profiles.profile')
+        assert labels.index('lettings.address') < labels.index('lettings.letting')
+
+    @pytest.mark.parametrize('suffix', ['.ndjson', '.ndjson.gz', '.ndjson.xz'])
+    def test_round_trip(self, catalogue, tmp_path, suffix):
+        """Test that a dump can be loaded back into an empty database."""
+        path = tmp_path / f'dump{suffix}'
+
+        call_command('dumpdata_ndjson', str(path), verbosity=0)
+        clear_catalogue()
+        call_command('loaddata_ndjson', str(path), '--batch-size', '2',
+                     '--chunk-size', '3', verbosity=0)
+
+        assert Address.objects.count() == 3
+        assert Letting.objects.count() == 3
+        assert Profile.objects.count() == 3
+        letting = Letting.objects.get(title='Letting 2')
+        assert letting.address.street == 'Street 2'
+        assert Profile.objects.get(user__username='user3').favorite_city == 'City 3'
+
+    def test_dump_writes_one_record_per_line(self, catalogue, tmp_path):
+        """Test that the dump uses the Django serializer record layout."""
+        path = tmp_path / 'dump.ndjson'
+
+        call_command('dumpdata_ndjson', str(path), '--models', 'lettings.letting',
+                     verbosity=0)
+
+        with open_stream(path) as stream:
+            records = [json.loads(line) for line in stream]
+        assert len(records) == 3
+        assert records[0]['model'] == 'lettings.letting'
+        assert set(records[0]['fields']) == {'title', 'address', 'updated_at'}
+
+    @pytest.mark.django_db
+    def test_load_accepts_records_out_of_dependency_order(self, tmp_path):
+        """Test that foreign keys are only checked once everything is loaded."""
+        path = tmp_path / 'reversed.ndjson'
+        path.write_text(
+            '{"model": "lettings.letting", "pk": 7, '
+            '"fields": {"title": "Late", "address": 9}}\n'
+            '\n'
+            '{"model": "lettings.address", "pk": 9, "fields": {"number": 1, '
+            '"street": "S", "city": "C", "state": "ST", "zip_code": 1, '
+            '"country_iso_code": "USA"}}\n'
+        )
+
+        with open_stream(path) as stream:
+            counts = load_records(stream)
+
+        assert counts == {'lettings.letting': 1, 'lettings.address': 1}
+        assert Letting.objects.get(pk=7).address_id == 9
+
+    @pytest.mark.django_db
+    def test_load_rejects_dangling_foreign_key(self, tmp_path):
+        """Test that a letting without its address is reported."""
+        path = tmp_path / 'dangling.ndjson'
+        path.write_text('{"model": "lettings.letting", "pk": 1, '
+                        '"fields": {"title": "Orphan", "address": 404}}\n')
+
+        with pytest.raises(CommandError, match='invalid foreign key'):
+            call_command('loaddata_ndjson', str(path), verbosity=0)
+
+        # Committed chunks are kept, remove the row before teardown checks
+        Letting.objects.all().delete()
+
+    @pytest.mark.django_db
+    def test_load_rejects_invalid_json(self, tmp_path):
+        """Test that a malformed line is reported with its line number."""
+        path = tmp_path / 'broken.ndjson'
+        path.write_text('{"model": \n')
+
+        with pytest.raises(CommandError, match='line 1'):
+            call_command('loaddata_ndjson', str(path), verbosity=0)
+
+    def test_load_missing_file(self, tmp_path):
+        """Test that a missing input file is reported."""
+        with pytest.raises(CommandError, match='File not found'):
+            call_command('loaddata_ndjson', str(tmp_path / 'missing.ndjson'))
+
+    def test_dump_unknown_model(self, tmp_path):
+        """Test that an unknown model label is reported."""
+        with pytest.raises(CommandError):
+            call_command('dumpdata_ndjson', str(tmp_path / 'out.ndjson'),
+                         '--models', 'lettings.unknown')
@@ -0,0 +1,97 @@
+"""
+Tests for the generate_data management command.
+
+This module checks the generated rows, their shared password and the
+growth of an existing synthetic catalogue.
+"""
+import pytest
+from django.contrib.auth import authenticate
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+from lettings.models import Address, Letting
+from oc_lettings_site import synthetic
+from profiles.models import Profile
+
+
+@pytest.mark.django_db
+class TestGenerateDataCommand:
+    """Test cases for the generate_data management command."""
+
+    def test_rows_generated(self, capsys):
+        """Test that every model gets the requested number of rows."""
+        call_command('generate_data', rows=30, batch_size=7)
+
+        assert Address.objects.count() == 30
+        assert Letting.objects.count() == 30
+        assert Profile.objects.count() == 30
+        assert 'Created 30 synthetic entries' in capsys.readouterr().out
+
+    def test_rows_consistent(self):
+        """Test that the generated rows reference each other and are valid."""
+        call_command('generate_data', rows=20)
+
+        for letting in Letting.objects.select_related('address'):
+            address = letting.address
+            city = next(c for c in synthetic.CITIES if c[0] == address.city)
+            assert address.state == city[1]
+            assert city[2] <= address.zip_code < city[2] + city[3]
+            assert 1 <= address.number <= 9999
+            assert address.city in letting.title
+            address.full_clean()
+        profile = Profile.objects.select_related('user').get(user__username='synthetic-3')
+        assert profile.updated_at is not None
+        assert profile.user.date_joined is not None
+
+    def test_shared_password(self):
+        """Test that the synthetic users log in with the documented password."""
+        call_command('generate_data', rows=2)
+
+        user = authenticate(username='synthetic-1', password=synthetic.PASSWORD)
+        assert user is not None
+        assert not user.is_staff
+
+    def test_next_to_existing_rows(self):
+        """Test that IDs follow the rows already in the database."""
+        address = Address.objects.create(
+            number=1, street='Real Street', city='Real City', state='RC',
+            zip_code=12345, country_iso_code='USA'
+        )
+        User.objects.create_user(username='real')
+
+        call_command('generate_data', rows=3)
+
+        assert Address.objects.filter(id__gt=address.id).count() == 3
+        assert User.objects.count() == 4
+        # New objects still get fresh IDs
+        assert User.objects.create_user(username='later').id == User.objects.count()
+
+    def test_grows_catalogue(self, capsys):
+        """Test that an existing synthetic catalogue is completed."""
+        call_command('generate_data', rows=5)
+        call_command('generate_data', rows=8)
+
+        assert Letting.objects.count() == 8
+        assert 'Created 3 synthetic entries' in capsys.readouterr().out
+
+    def test_deterministic(self):
+        """Test that the same seed gives the same catalogue."""
+        def catalogue():
+            return list(Letting.objects.order_by('id').values_list(
+                'title', 'address__number', 'address__zip_code',
+            ))
+
+        call_command('generate_data', rows=10, seed=5)
+        first = catalogue()
+        Letting.objects.all().delete()
+        Address.objects.all().delete()
+        User.objects.all().delete()
+        call_command('generate_data', rows=10, seed=5)
+
+        assert catalogue() == first
+
+    def test_invalid_batch_size(self):
+        """Test that a batch size below 1 is refused."""
+        with pytest.raises(CommandError):
+            call_command('generate_data', rows=10, batch_size=0)
@@ -0,0 +1,80 @@
+"""
+Tests for the server-side SVG icons.
+
+This module checks the ``icon`` template tag and that pages render their
+icons without the Feather script.
+"""
+import pytest
+from django.template import Context, Template
+
+from lettings.models import Address, Letting
+from oc_lettings_site import css_purge
+from oc_lettings_site.templatetags.icons import ICONS_DIR, render_icon
+
+
+class TestIconTag:
+    """Test cases for the icon template tag."""
+
+    def test_icon_is_inlined(self):
+        """Test that an icon renders as an inline SVG element."""
+        rendered = Template("{% load icons %}{% icon 'home' %}").render(Context())
+
+        assert rendered.startswith('<svg aria-hidden="true" ')
+        assert 'class="feather feather-home"' in rendered
+        assert '<polyline points="9 22 9 12 15 12 15 22">' in rendered
+
+    def test_icon_with_extra_class(self):
+        """Test that extra classes are appended and escaped."""
+        rendered = Template(
+            "{% load icons %}{% icon 'arrow-right' class=extra %}"
+        ).render(Context({'extra': 'ms-2 "x'}))
+
+        assert 'class="feather feather-arrow-right ms-2 &quot;x"' in rendered
+
+    @pytest.mark.parametrize('name', ['unknown', '../icons/feather/home'])
+    def test_unknown_icon_renders_nothing(self, name):
+        """Test that unknown or invalid names render an empty string."""
+        assert render_icon(name) == ''
+
+    def test_every_template_icon_is_vendored(self):
+        """Test that the icons referenced by templates exist in the repo."""
+        for name in ('arrow-left', 'arrow-right', 'home', 'user'):
+            assert (ICONS_DIR / f'{name}.svg').exists()
+
+    def test_icon_markup_kept_by_css_purge(self, tmp_path):
+        """Test that the purge keeps the rules styling the inlined icons."""
+        source = tmp_path / 'styles.css'
+        source.write_text('.feather{height:1rem}.icon-stack svg{width:1em}.fa{color:red}')
+
+        css_purge.build(
+            source=source,
+            output=tmp_path / 'out.css',
+            critical_output=tmp_path / 'critical.css',
+            template_dirs=[],
+            safelist=['icon-stack'],
+            markup_dirs=[ICONS_DIR],
+        )
+
+        purged = (tmp_path / 'out.css').read_text()
+        assert '.feather{' in purged and '.icon-stack svg{' in purged
+        assert '.fa{' not in purged
+
+
+class TestIconPages:
+    """Test cases for pages displaying icons."""
+
+    @pytest.mark.django_db
+    def test_letting_page_renders_icons_without_script(self, client):
+        """Test that the letting page contains SVG icons and no feather script."""
+        address = Address.objects.create(
+            number=1, street='Icon Street', city='Test City',
+            state='TS', zip_code=12345, country_iso_code='TST'
+        )
+        letting = Letting.objects.create(title='Iconic', address=address)
+
+        content = client.get(f'/lettings/{letting.id}/').content.decode()
+
+        assert 'feather feather-home' in content
+        assert 'feather feather-arrow-right ms-2' in content
+        assert 'data-feather' not in content
+        assert 'feather.min.js' not in content
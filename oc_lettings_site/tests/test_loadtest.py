@@ -0,0 +1,177 @@
+"""
+Tests for the HTTP load generator.
+
+This module checks the scenario files, the statistics of a load test run
+against a live server, the request rate cap and the ``loadtest`` command.
+"""
+import json
+import socket
+import sys
+import time
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+from oc_lettings_site import loadtest
+
+BROWSE = {'name': 'browse', 'weight': 1, 'steps': [
+    {'name': 'home', 'path': '/', 'expect': 200},
+    {'name': 'letting', 'path': '/lettings/{letting_id}/', 'expect': 200},
+]}
+SCAN = {'name': 'scan', 'weight': 1, 'steps': [
+    {'name': 'missing', 'path': '/lettings/{missing_letting_id}/', 'expect': 404},
+]}
+
+
+def free_port():
+    """Return a local TCP port nothing listens on."""
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+class TestScenarios:
+    """Test cases for the scenario files."""
+
+    def test_default_scenarios(self):
+        """Test that the shipped scenario file is valid."""
+        scenarios = loadtest.load_scenarios(loadtest.DEFAULT_SCENARIOS)
+
+        names = {scenario['name'] for scenario in scenarios}
+        assert {'browse_lettings', 'profile_lookup', 'not_found_scan'} <= names
+        assert all(step['expect'] in (200, 404)
+                   for scenario in scenarios for step in scenario['steps'])
+
+    def test_defaults_applied(self, tmp_path):
+        """Test the default weight, step name and expected status."""
+        path = tmp_path / 'scenarios.json'
+        path.write_text(json.dumps({'scenarios': [{'name': 'home', 'steps': [{'path': '/'}]}]}))
+
+        scenario = loadtest.load_scenarios(path)[0]
+
+        assert scenario['weight'] == 1
+        assert scenario['steps'] == [{'name': '/', 'path': '/', 'expect': 200}]
+
+    @pytest.mark.parametrize('content', [
+        {'scenarios': []},
+        {'scenarios': [{'name': 'empty', 'steps': []}]},
+        {'scenarios': [{'name': 'never', 'weight': 0, 'steps': [{'path': '/'}]}]},
+    ])
+    def test_invalid_files(self, tmp_path, content):
+        """Test that unusable scenario files are refused."""
+        path = tmp_path / 'scenarios.json'
+        path.write_text(json.dumps(content))
+
+        with pytest.raises(ValueError):
+            loadtest.load_scenarios(path)
+
+
+class TestRunLoad:
+    """Test cases for load test runs."""
+
+    def test_statistics(self, live_catalogue, live_server):
+        """Test the statistics reported by step and in total."""
+        values = loadtest.sample_values(count=10)
+
+        report = loadtest.run_load(live_server.url, [BROWSE, SCAN], values,
+                                   concurrency=2, requests=20)
+
+        assert report['total']['requests'] == 20
+        assert report['total']['errors'] == 0
+        assert report['total']['throughput_rps'] > 0
+        assert set(report['steps']) <= {'browse:home', 'browse:letting', 'scan:missing'}
+        assert set(report['statuses']) <= {'200', '404'}
+        stats = report['steps']['browse:home']
+        assert stats['p50_ms'] <= stats['p95_ms'] <= stats['p99_ms'] <= stats['max_ms']
+
+    def test_unexpected_status_is_error(self, live_catalogue, live_server):
+        """Test that a status other than the expected one counts as an error."""
+        scenario = {'name': 'wrong', 'weight': 1, 'steps': [
+            {'name': 'missing', 'path': '/lettings/999/', 'expect': 200},
+        ]}
+
+        report = loadtest.run_load(live_server.url, [scenario], {}, concurrency=1, requests=3)
+
+        assert report['total']['error_rate'] == 1.0
+        assert report['statuses'] == {'404': 3}
+
+    def test_rate_capped(self, live_catalogue, live_server):
+        """Test that requests are spaced by the requested rate."""
+        started = time.perf_counter()
+        report = loadtest.run_load(live_server.url, [BROWSE], {'letting_id': [1]},
+                                   concurrency=3, rate=20, requests=6)
+
+        assert report['total']['requests'] == 6
+        assert time.perf_counter() - started >= 0.25
+
+    def test_connection_errors(self):
+        """Test that a server not answering gives connection errors."""
+        report = loadtest.run_load(f'http://127.0.0.1:{free_port()}', [BROWSE],
+                                   {'letting_id': [1]}, concurrency=1, requests=2)
+
+        assert report['statuses'] == {'connection error': 2}
+        assert report['total']['error_rate'] == 1.0
+
+    def test_scenarios_without_values_skipped(self, caplog):
+        """Test that scenarios missing placeholder values are not played."""
+        with pytest.raises(ValueError):
+            loadtest.run_load('http://127.0.0.1:1', [BROWSE], {'username': ['x']},
+                              requests=1)
+        assert 'no values for letting_id' in caplog.text
+
+    @pytest.mark.django_db
+    def test_sample_values_empty_database(self):
+        """Test that an empty catalogue gives no real values."""
+        values = loadtest.sample_values(count=5)
+
+        assert values['letting_id'] == [] and values['username'] == []
+        assert len(values['missing_letting_id']) == 5
+
+
+class TestStartServer:
+    """Test cases for the server started by a load test."""
+
+    def test_server_started(self):
+        """Test that the server answers once started."""
+        port = free_port()
+        process = loadtest.start_server(
+            f'{sys.executable} -m http.server {port} --bind 127.0.0.1',
+            f'http://127.0.0.1:{port}',
+        )
+        try:
+            assert process.poll() is None
+        finally:
+            process.terminate()
+            process.wait()
+
+    def test_server_exiting(self):
+        """Test that a server exiting at once is reported."""
+        with pytest.raises(RuntimeError):
+            loadtest.start_server(f'{sys.executable} -c "exit(3)"',
+                                  f'http://127.0.0.1:{free_port()}')
+
+
+class TestLoadtestCommand:
+    """Test cases for the loadtest management command."""
+
+    def test_report_written(self, live_catalogue, live_server, tmp_path, capsys):
+        """Test the printed statistics and the JSON report."""
+        output = tmp_path / 'load.json'
+
+        call_command('loadtest', url=live_server.url, requests=10, concurrency=2,
+                     output=str(output))
+
+        out = capsys.readouterr().out
+        assert 'total' in out and 'Statuses' in out
+        assert json.loads(output.read_text())['total']['requests'] == 10
+
+    def test_invalid_options(self):
+        """Test that a concurrency below 1 is refused."""
+        with pytest.raises(CommandError):
+            call_command('loadtest', concurrency=0)
+
+    def test_invalid_scenarios(self, tmp_path):
+        """Test that an unreadable scenario file is refused."""
+        with pytest.raises(CommandError):
+            call_command('loadtest', scenarios=str(tmp_path / 'missing.json'))
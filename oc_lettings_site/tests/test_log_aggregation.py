@@ -0,0 +1,163 @@
+"""
+Tests for the aggregation of repeated log warnings.
+
+This module checks the deduplication by message template, the per-window
+cap, the summary records and the filter configured in ``LOGGING``.
+"""
+import logging
+import time
+
+import pytest
+from django.conf import settings
+
+from oc_lettings_site import log_aggregation
+from oc_lettings_site.log_aggregation import AggregatingFilter
+
+
+class FakeClock:
+    """Monotonic clock advanced manually by the tests."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def aggregated():
+    """Return a logger, the records it emits, its filter and clock."""
+    clock = FakeClock()
+    aggregating = AggregatingFilter(window=60, per_key=1, max_events=3, clock=clock)
+    records = []
+    handler = logging.Handler()
+    handler.emit = records.append
+    handler.addFilter(aggregating)
+    test_logger = logging.getLogger('tests.log_aggregation')
+    test_logger.addHandler(handler)
+    test_logger.propagate = False
+    summary_logger = logging.getLogger('oc_lettings_site.log_aggregation')
+    summary_logger.addHandler(handler)
+    yield test_logger, records, aggregating, clock
+    # Stop the report timer of the window
+    aggregating.flush()
+    test_logger.removeHandler(handler)
+    test_logger.setLevel(logging.NOTSET)
+    summary_logger.removeHandler(handler)
+
+
+class TestAggregatingFilter:
+    """Test cases for the AggregatingFilter logging filter."""
+
+    def test_same_template_passes_once_per_window(self, aggregated):
+        """Test that records differing only by arguments are deduplicated."""
+        test_logger, records, _, _ = aggregated
+
+        for path in ('/a', '/b', '/c'):
+            test_logger.warning("Not Found: %s", path)
+
+        assert [record.getMessage() for record in records] == ['Not Found: /a']
+
+    def test_errors_are_never_suppressed(self, aggregated):
+        """Test that records at ERROR level always pass."""
+        test_logger, records, _, _ = aggregated
+
+        for _ in range(5):
+            test_logger.error("Database down: %s", 'timeout')
+
+        assert len(records) == 5
+
+    def test_info_is_never_counted(self, aggregated):
+        """Test that records below WARNING neither pass the cap nor use it up."""
+        test_logger, records, _, _ = aggregated
+        test_logger.setLevel(logging.INFO)
+
+        for i in range(300):
+            test_logger.info(f"Letting detail accessed: ID={i}, IP=10.0.0.1")
+        test_logger.warning("Letting not found: ID=%s", 99)
+
+        assert len(records) == 301
+        assert records[-1].getMessage() == 'Letting not found: ID=99'
+
+    def test_window_cap(self, aggregated):
+        """Test that distinct templates are capped per window."""
+        test_logger, records, _, _ = aggregated
+
+        for i in range(5):
+            test_logger.warning(f"distinct message {i}")
+
+        assert len(records) == 3
+
+    def test_summary_after_window(self, aggregated):
+        """Test that suppressed records are reported when the window ends."""
+        test_logger, records, _, clock = aggregated
+        for _ in range(4):
+            test_logger.warning("Not Found: %s", '/wp-login.php')
+
+        clock.now = 61
+        test_logger.warning("Not Found: %s", '/.env')
+
+        messages = [record.getMessage() for record in records]
+        assert messages[1].startswith('Suppressed 3 repeated log record(s) in the last 61s')
+        assert "tests.log_aggregation: 'Not Found: %s' x3" in messages[1]
+        assert messages[2] == 'Not Found: /.env'
+
+    def test_summary_without_later_record(self, aggregated):
+        """Test that a window is reported by its timer when no record follows."""
+        test_logger, records, aggregating, _ = aggregated
+        aggregating.clock = time.monotonic
+        aggregating.window = 0.1
+        aggregating.flush()
+        for _ in range(3):
+            test_logger.warning("Not Found: %s", '/wp-login.php')
+
+        deadline = time.monotonic() + 5
+        while len(records) < 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        assert records[1].getMessage().startswith('Suppressed 2 repeated log record(s)')
+        assert aggregating._timer is None
+
+    def test_flush_without_suppression_is_silent(self, aggregated):
+        """Test that an empty window does not produce a summary."""
+        test_logger, records, aggregating, _ = aggregated
+        test_logger.warning("only once")
+
+        aggregating.flush()
+
+        assert len(records) == 1
+
+    def test_summary_lists_top_templates(self, aggregated):
+        """Test that the summary details a bounded number of templates."""
+        test_logger, records, aggregating, _ = aggregated
+        aggregating.summary_size = 1
+        for i in range(6):
+            test_logger.warning(f"distinct message {i}")
+
+        aggregating.flush()
+
+        assert records[-1].getMessage().endswith('; and 2 other message(s)')
+
+    def test_decision_shared_between_handlers(self):
+        """Test that a record is counted once when several handlers share the filter."""
+        aggregating = AggregatingFilter(window=60)
+        record = logging.LogRecord('x', logging.WARNING, __file__, 1, 'msg %s', ('a',), None)
+
+        assert aggregating.filter(record) is True
+        assert aggregating.filter(record) is True
+
+    def test_open_windows_reported_at_exit(self, aggregated):
+        """Test that the exit hook reports the records suppressed so far."""
+        test_logger, records, _, _ = aggregated
+        for _ in range(2):
+            test_logger.warning("Not Found: %s", '/wp-login.php')
+
+        log_aggregation.flush_all()
+
+        assert any(record.getMessage().startswith('Suppressed 1 repeated log record(s)')
+                   and 'tests.log_aggregation' in record.getMessage() for record in records)
+
+    def test_configured_on_every_handler(self):
+        """Test that LOGGING attaches the filter to every handler."""
+        for handler in settings.LOGGING['handlers'].values():
+            assert handler['filters'] == ['aggregate_warnings']
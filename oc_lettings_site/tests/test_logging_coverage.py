@@ -8,6 +8,7 @@ from django.test import TestCase, Client
 from unittest.mock import patch
 from django.contrib.auth.models import User
 from lettings.models import Address, Letting
+from oc_lettings_site.views import clear_prerendered_pages
 from profiles.models import Profile
 
 
@@ -19,7 +20,7 @@ class TestLoggingCoverage(TestCase):
 
     def test_lettings_index_exception_handling(self):
         """Test exception handling in lettings index."""
-        with patch('lettings.views.Letting.objects.all') as mock_all:
+        with patch('lettings.views.Letting.objects.values_list') as mock_all:
             # Simulate an exception during object retrieval
             mock_all.side_effect = Exception("Database error")
 
@@ -28,6 +29,11 @@ class TestLoggingCoverage(TestCase):
 
     def test_lettings_detail_exception_handling(self):
         """Test exception handling in lettings detail."""
+        address = Address.objects.create(
+            number=1, street='Test Street', city='Test City',
+            state='TS', zip_code=12345, country_iso_code='TST'
+        )
+        Letting.objects.create(id=1, title='Test Letting', address=address)
         with patch('lettings.views.get_object_or_404') as mock_get:
             # Simulate an exception other than Http404
             mock_get.side_effect = Exception("Database error")
@@ -37,7 +43,7 @@ class TestLoggingCoverage(TestCase):
 
     def test_profiles_index_exception_handling(self):
         """Test exception handling in profiles index."""
-        with patch('profiles.views.Profile.objects.all') as mock_all:
+        with patch('profiles.views.Profile.objects.annotate') as mock_all:
             # Simulate an exception during object retrieval
             mock_all.side_effect = Exception("Database error")
 
@@ -46,6 +52,7 @@ class TestLoggingCoverage(TestCase):
 
     def test_profiles_detail_exception_handling(self):
         """Test exception handling in profiles detail."""
+        Profile.objects.create(user=User.objects.create_user(username='testuser'))
         with patch('profiles.views.get_object_or_404') as mock_get:
             # Simulate an exception other than Http404
             mock_get.side_effect = Exception("Database error")
@@ -55,6 +62,7 @@ class TestLoggingCoverage(TestCase):
 
     def test_main_index_exception_handling(self):
         """Test exception handling in main view."""
+        clear_prerendered_pages()
         with patch('oc_lettings_site.views.render') as mock_render:
             # Simulate an exception during render
             mock_render.side_effect = Exception("Template error")
@@ -0,0 +1,206 @@
+"""
+Tests for the in-memory membership filters.
+
+This module checks the bitmap and Bloom filter structures, and that the
+indexes are rebuilt when another worker changes the indexed tables.
+"""
+import threading
+from unittest.mock import patch
+
+import pytest
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.test import override_settings
+
+from lettings.membership import letting_ids
+from lettings.models import Address, Letting
+from oc_lettings_site import membership
+from oc_lettings_site.datastream import load_records
+from oc_lettings_site.membership import BloomFilter, IdBitmap, MembershipIndex
+from profiles.membership import usernames
+from profiles.models import Profile
+
+
+@pytest.fixture
+def generation_cache(tmp_path):
+    """Point the generation markers to an empty directory."""
+    with override_settings(CACHES={
+        'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+        'generations': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': str(tmp_path),
+            'TIMEOUT': None,
+        },
+    }):
+        yield caches['generations']
+
+
+class TestStructures:
+    """Test cases for the IdBitmap and BloomFilter structures."""
+
+    def test_bitmap_membership(self):
+        """Test that the bitmap contains exactly the added integers."""
+        bitmap = IdBitmap([1, 8, 1000])
+
+        assert [i for i in range(1100) if i in bitmap] == [1, 8, 1000]
+        assert -1 not in bitmap
+        assert len(bitmap.bits) == 126
+
+    def test_bloom_filter_has_no_false_negative(self):
+        """Test that every added string is reported as present."""
+        names = [f'user{i}' for i in range(2000)]
+        bloom = BloomFilter(names)
+
+        assert all(name in bloom for name in names)
+
+    def test_bloom_filter_false_positive_rate(self):
+        """Test that the false positive rate stays near the configured one."""
+        bloom = BloomFilter([f'user{i}' for i in range(2000)], capacity=2000)
+
+        false_positives = sum(f'scanner{i}' in bloom for i in range(10000))
+
+        assert false_positives < 200
+
+    def test_bloom_filter_reports_saturation(self):
+        """Test that adding past the capacity is reported."""
+        bloom = BloomFilter(capacity=1024)
+
+        assert all(bloom.add(f'u{i}') for i in range(1024))
+        assert bloom.add('one-too-many') is False
+
+
+class TestMembershipIndex:
+    """Test cases for the lazily built, invalidated indexes."""
+
+    def test_other_worker_change_triggers_rebuild(self, generation_cache):
+        """Test that a miss is re-checked once the generation changed."""
+        keys = {1}
+        index = MembershipIndex('test', lambda: list(keys), IdBitmap)
+
+        assert index.might_contain(1) and not index.might_contain(2)
+        # Another worker inserts a row and bumps the generation
+        keys.add(2)
+        assert not index.might_contain(2)
+        membership._bump_generation('test')
+
+        assert index.might_contain(2)
+
+    def test_lost_generation_never_repeats(self, generation_cache):
+        """Test that a marker lost then written again still triggers a rebuild."""
+        keys = {1}
+        index = MembershipIndex('lost', lambda: list(keys), IdBitmap)
+        membership._bump_generation('lost')
+        assert not index.might_contain(2)
+
+        # The marker is lost, then another worker inserts a row
+        generation_cache.clear()
+        assert membership._shared_generation('lost') is None
+        keys.add(2)
+        membership._bump_generation('lost')
+
+        assert index.might_contain(2)
+
+    def test_generation_per_index(self, generation_cache):
+        """Test that a change to one index leaves the others built."""
+        names = {'alice'}
+        index = MembershipIndex('names', lambda: list(names), BloomFilter)
+        other = MembershipIndex('other', lambda: [1], IdBitmap)
+        assert not index.might_contain('bob') and not other.might_contain(2)
+        names.add('bob')
+
+        membership._bump_generation('other')
+
+        assert not index.might_contain('bob')
+
+    def test_background_build(self, generation_cache, settings):
+        """Test that the database answers while the structure is built in a thread."""
+        settings.MEMBERSHIP_BACKGROUND_BUILD = True
+        loading = threading.Event()
+        release = threading.Event()
+
+        def load():
+            loading.set()
+            release.wait(5)
+            return [1]
+
+        index = MembershipIndex('background', load, IdBitmap)
+
+        # Unknown until built: the view queries the database
+        assert index.might_contain(2)
+        assert loading.wait(5)
+        assert index.might_contain(3)
+        release.set()
+        for thread in threading.enumerate():
+            if thread.name == 'membership-background':
+                thread.join(5)
+
+        assert index.might_contain(1) and not index.might_contain(2)
+
+    def test_outdated_structure_kept_during_rebuild(self, generation_cache, settings):
+        """Test that hits are answered by the old structure while it is rebuilt."""
+        index = MembershipIndex('outdated', lambda: [1], IdBitmap)
+        index.build()
+        settings.MEMBERSHIP_BACKGROUND_BUILD = True
+
+        with patch.object(index, 'build_in_background') as build_in_background:
+            membership._bump_generation('outdated')
+            assert index.might_contain(1)
+            build_in_background.assert_not_called()
+            # A miss may be a key saved by another worker
+            assert index.might_contain(2)
+
+        build_in_background.assert_called_once_with()
+
+    def test_worker_start_builds_every_index(self, generation_cache):
+        """Test that build_in_background starts a build per index."""
+        with patch.object(MembershipIndex, 'build_in_background') as build_in_background:
+            membership.build_in_background()
+
+        assert build_in_background.call_count == len(membership._indexes)
+
+    @pytest.mark.django_db
+    def test_saturated_structure_is_rebuilt(self, generation_cache):
+        """Test that a saturated Bloom filter is dropped on add."""
+        index = MembershipIndex('test', lambda: [], lambda keys: BloomFilter(keys, capacity=1))
+        index._structure = BloomFilter(capacity=1)
+        index._structure.count = 1024
+
+        index.add('new')
+
+        assert index._structure is None
+
+    @pytest.mark.django_db
+    def test_saves_are_added(self, generation_cache):
+        """Test that signals add new lettings and renamed users."""
+        assert not letting_ids.might_contain(424242)
+        address = Address.objects.create(
+            number=1, street='S', city='C', state='ST', zip_code=1, country_iso_code='USA'
+        )
+        letting = Letting.objects.create(id=424242, title='New', address=address)
+        user = User.objects.create_user(username='before')
+        Profile.objects.create(user=user)
+        assert not usernames.might_contain('after')
+
+        user.username = 'after'
+        user.save()
+
+        assert letting_ids.might_contain(letting.id)
+        assert usernames.might_contain('before') and usernames.might_contain('after')
+
+    @pytest.mark.django_db
+    def test_bulk_load_resets_indexes(self, tmp_path, generation_cache):
+        """Test that loading records without signals resets the indexes."""
+        assert not letting_ids.might_contain(515151)
+        path = tmp_path / 'lettings.ndjson'
+        path.write_text(
+            '{"model": "lettings.address", "pk": 515151, "fields": {"number": 1, '
+            '"street": "S", "city": "C", "state": "ST", "zip_code": 1, '
+            '"country_iso_code": "USA"}}\n'
+            '{"model": "lettings.letting", "pk": 515151, '
+            '"fields": {"title": "Bulk", "address": 515151}}\n'
+        )
+
+        with open(path) as stream:
+            load_records(stream)
+
+        assert letting_ids.might_contain(515151)
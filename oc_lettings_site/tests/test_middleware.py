@@ -0,0 +1,130 @@
+"""
+Tests for the rate limiting and load shedding middleware.
+
+This module checks the token buckets, the queue time budget read from
+``X-Request-Start`` and the exemptions.
+"""
+import time
+
+import pytest
+from django.core.cache import caches
+from django.test import override_settings
+
+from oc_lettings_site.middleware import RateLimitMiddleware, parse_request_start
+
+
+@pytest.fixture
+def rate_limit(tmp_path, settings):
+    """Enable the middleware with a small bucket and empty shared caches."""
+    settings.CACHES = {
+        'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+        'shared': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': str(tmp_path / 'shared'),
+        },
+        'rate_limit': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': str(tmp_path / 'rate_limit'),
+            'OPTIONS': {'MAX_ENTRIES': 10, 'CULL_FREQUENCY': 4},
+        },
+    }
+    settings.RATE_LIMIT = {
+        'ENABLED': True,
+        'RATE': 0.5,
+        'BURST': 2,
+        'MAX_QUEUE_TIME': 1.0,
+        'PROXY_COUNT': 0,
+        'EXEMPT_PATHS': ['/admin/'],
+        'CACHE': 'rate_limit',
+    }
+    return settings.RATE_LIMIT
+
+
+@pytest.mark.django_db
+class TestRateLimitMiddleware:
+    """Test cases for the RateLimitMiddleware."""
+
+    def test_bucket_exhausted(self, rate_limit, client):
+        """Test that requests past the burst are answered 429."""
+        statuses = [client.get('/', REMOTE_ADDR='203.0.113.7').status_code for _ in range(3)]
+
+        assert statuses == [200, 200, 429]
+        response = client.get('/', REMOTE_ADDR='203.0.113.7')
+        assert response['Retry-After'] == '2'
+
+    def test_buckets_are_per_client(self, rate_limit, client):
+        """Test that one client exhausting its bucket does not affect others."""
+        for _ in range(3):
+            client.get('/', REMOTE_ADDR='203.0.113.7')
+
+        assert client.get('/', REMOTE_ADDR='203.0.113.8').status_code == 200
+
+    def test_buckets_culled_apart(self, rate_limit, client, tmp_path):
+        """Test that many clients cull their buckets, never the shared cache."""
+        for i in range(20):
+            caches['shared'].set(f'kept-{i}', i)
+
+        for i in range(50):
+            assert client.get('/', REMOTE_ADDR=f'203.0.113.{i}').status_code == 200
+
+        assert [caches['shared'].get(f'kept-{i}') for i in range(20)] == list(range(20))
+        assert len(list((tmp_path / 'rate_limit').iterdir())) <= 10
+
+    def test_forwarded_client_address(self, rate_limit, client):
+        """Test that the address added by the trusted proxy is used."""
+        rate_limit['PROXY_COUNT'] = 1
+        with override_settings(RATE_LIMIT=rate_limit):
+            for i in range(3):
+                response = client.get('/', REMOTE_ADDR='10.0.0.1',
+                                      HTTP_X_FORWARDED_FOR=f'1.1.1.{i}, 198.51.100.1')
+
+        assert response.status_code == 429
+
+    @pytest.mark.parametrize('path, address', [
+        ('/admin/login/', '203.0.113.7'),
+        ('/', '127.0.0.1'),
+        ('/', '::1'),
+    ])
+    def test_exemptions(self, rate_limit, client, path, address):
+        """Test that the admin and the health checks are never limited."""
+        statuses = {client.get(path, REMOTE_ADDR=address).status_code for _ in range(4)}
+
+        assert 429 not in statuses
+
+    def test_load_shedding(self, rate_limit, client):
+        """Test that requests queued past the budget are answered 503."""
+        queued_since = f't={time.time() - 5:.3f}'
+
+        response = client.get('/', REMOTE_ADDR='203.0.113.9', HTTP_X_REQUEST_START=queued_since)
+
+        assert response.status_code == 503
+        assert response['Retry-After'] == '1'
+        assert client.get('/', REMOTE_ADDR='203.0.113.9',
+                          HTTP_X_REQUEST_START=f't={time.time():.3f}').status_code == 200
+
+    def test_disabled(self, rate_limit, client):
+        """Test that a disabled middleware lets every request through."""
+        rate_limit['ENABLED'] = False
+        with override_settings(RATE_LIMIT=rate_limit):
+            statuses = {client.get('/', REMOTE_ADDR='203.0.113.7').status_code for _ in range(4)}
+
+        assert statuses == {200}
+
+    def test_invalid_address_is_not_loopback(self):
+        """Test that a malformed address is rate limited like any other."""
+        assert RateLimitMiddleware.is_loopback('unknown') is False
+
+
+class TestParseRequestStart:
+    """Test cases for the X-Request-Start header parsing."""
+
+    @pytest.mark.parametrize('value, expected', [
+        ('t=1700000000.5', 1700000000.5),
+        ('1700000000500', 1700000000.5),
+        ('t=1700000000500000', 1700000000.5),
+        ('garbage', None),
+        (None, None),
+    ])
+    def test_units(self, value, expected):
+        """Test that seconds, milliseconds and microseconds are accepted."""
+        assert parse_request_start(value) == expected
@@ -0,0 +1,79 @@
+"""
+Tests for the pre-rendered home and error pages.
+
+This module checks that the pages are rendered once per worker, served
+with the right status, and that the 500 handler falls back to a plain
+HTML page when the template engine fails.
+"""
+from unittest.mock import patch
+
+import pytest
+from django.test import RequestFactory
+
+from oc_lettings_site import views
+
+
+@pytest.fixture(autouse=True)
+def fresh_pages():
+    """Start every test without pre-rendered pages."""
+    views.clear_prerendered_pages()
+    yield
+    views.clear_prerendered_pages()
+
+
+@pytest.mark.django_db
+class TestPrerenderedPages:
+    """Test cases for pages served from memory."""
+
+    def test_home_page_rendered_once(self, client):
+        """Test that the home page template is only rendered on first use."""
+        with patch('oc_lettings_site.views.render', wraps=views.render) as render:
+            first = client.get('/')
+            second = client.get('/')
+
+        assert render.call_count == 1
+        assert second.status_code == 200
+        assert second.content == first.content
+        assert b'<title>Holiday Homes</title>' in second.content
+
+    @pytest.mark.parametrize('url', ['/missing/', '/wp-login.php', '/.env'])
+    def test_not_found_pages_share_one_render(self, client, url):
+        """Test that scanner 404s are served the cached page with status 404."""
+        with patch('oc_lettings_site.views.render', wraps=views.render) as render:
+            client.get('/unknown/')
+            response = client.get(url)
+
+        assert render.call_count == 1
+        assert response.status_code == 404
+        assert b'Not Found - 404' in response.content
+
+    def test_pages_rendered_each_time_in_debug(self, settings):
+        """Test that nothing is kept in memory in DEBUG."""
+        settings.DEBUG = True
+        request = RequestFactory().get('/')
+
+        views.prerendered(request, '403.html', status=403)
+
+        assert views._prerendered_pages == {}
+
+
+class TestStatic500Fallback:
+    """Test cases for the 500 page served when templates fail."""
+
+    def test_static_page_when_template_fails(self):
+        """Test that a template failure serves the plain HTML page."""
+        request = RequestFactory().get('/broken/')
+
+        with patch('oc_lettings_site.views.render', side_effect=RuntimeError('engine down')):
+            response = views.custom_500(request)
+
+        assert response.status_code == 500
+        assert response.content == views.STATIC_500_PAGE.read_bytes()
+        assert b'Internal Server Error' in response.content
+
+    def test_minimal_page_when_static_file_missing(self, tmp_path):
+        """Test that a missing static page still yields an HTML body."""
+        with patch.object(views, 'STATIC_500_PAGE', tmp_path / 'missing.html'):
+            content = views.static_500_page()
+
+        assert b'500 Internal Server Error' in content
@@ -0,0 +1,142 @@
+"""
+Tests for the view query budgets.
+
+This module checks the budget declarations, their enforcement by the
+middleware, and that every page of the site stays within its budget.
+"""
+import logging
+
+import pytest
+from django.contrib.auth.models import User
+from django.http import HttpResponse
+from django.test import RequestFactory
+from django.urls import resolve, reverse
+
+from lettings.models import Letting
+from oc_lettings_site.benchmark import build_cases, url_pattern_names
+from oc_lettings_site.middleware import QueryBudgetMiddleware
+from oc_lettings_site.query_budget import (
+    QueryBudgetExceeded, budget_for, check_query_budgets, query_budget,
+)
+from profiles.models import Profile
+
+
+def middleware_response(path, queries):
+    """Run the middleware around a fake view running some queries."""
+    def get_response(request):
+        request.resolver_match = resolve(path)
+        for _ in range(queries):
+            User.objects.count()
+        return HttpResponse()
+
+    return QueryBudgetMiddleware(get_response)(RequestFactory().get(path))
+
+
+class TestBudgetDeclaration:
+    """Test cases for the budget of a resolved URL."""
+
+    def test_decorator(self):
+        """Test that the decorator sets the budget of a view."""
+        @query_budget(3)
+        def view(request):
+            return HttpResponse()
+
+        assert view.query_budget == 3
+
+    def test_decorated_view(self):
+        """Test that a decorated view has its own budget."""
+        assert budget_for(resolve('/lettings/')) == 3
+
+    def test_routes(self, settings):
+        """Test the lookup by view name, then namespace, then default."""
+        settings.QUERY_BUDGET = {
+            'DEFAULT': 9,
+            'ROUTES': {'admin:index': 4, 'admin': 7},
+        }
+
+        assert budget_for(resolve('/admin/')) == 4
+        assert budget_for(resolve('/admin/lettings/letting/')) == 7
+        assert budget_for(resolve('/lettings/')) == 3
+
+        settings.QUERY_BUDGET = {'DEFAULT': 9, 'ROUTES': {}}
+        assert budget_for(resolve('/admin/lettings/letting/')) == 9
+
+
+@pytest.mark.django_db
+class TestQueryBudgetMiddleware:
+    """Test cases for the QueryBudgetMiddleware."""
+
+    def test_within_budget(self, settings):
+        """Test that a request within its budget is answered."""
+        settings.QUERY_BUDGET = {**settings.QUERY_BUDGET, 'RAISE': True}
+
+        assert middleware_response('/lettings/', 3).status_code == 200
+
+    def test_over_budget_raises(self, settings):
+        """Test that a request over budget fails in DEBUG and tests."""
+        settings.QUERY_BUDGET = {**settings.QUERY_BUDGET, 'RAISE': True}
+
+        with pytest.raises(QueryBudgetExceeded, match='lettings:index ran 4 queries'):
+            middleware_response('/lettings/', 4)
+
+    def test_over_budget_logged(self, settings, caplog):
+        """Test that a request over budget is logged in production."""
+        settings.QUERY_BUDGET = {**settings.QUERY_BUDGET, 'RAISE': False}
+
+        with caplog.at_level(logging.WARNING, logger='oc_lettings_site.middleware'):
+            response = middleware_response('/lettings/', 4)
+
+        assert response.status_code == 200
+        assert 'Query budget exceeded: lettings:index ran 4 queries, budget 3' in caplog.text
+
+    def test_without_budget(self, settings):
+        """Test that views without a budget are not limited."""
+        settings.QUERY_BUDGET = {'RAISE': True, 'DEFAULT': None, 'ROUTES': {}}
+
+        assert middleware_response('/admin/lettings/letting/', 10).status_code == 200
+
+    def test_enabled_in_tests(self, catalogue, client, settings):
+        """Test that the middleware is active on the test client requests."""
+        assert settings.QUERY_BUDGET['RAISE']
+        assert client.get('/profiles/').status_code == 200
+
+
+class TestSiteBudgets:
+    """Test that every page of the site stays within its query budget."""
+
+    def test_every_url_within_budget(self, catalogue, client):
+        """Test every URL pattern of the project with sampled objects."""
+        admin_user = User.objects.create_superuser('admin', password=None)
+        client.force_login(admin_user)
+        names = [*url_pattern_names(), 'admin:index']
+        cases = build_cases()
+        paths = [path for name in names for path in cases[name]]
+        # The admin of the catalogue, with a search and a change form
+        paths += [path for name, case in cases.items() if name.endswith('_changelist')
+                  for path in case]
+        paths += [
+            reverse('admin:lettings_letting_changelist') + '?q=Test+City',
+            reverse('admin:lettings_letting_change', args=[Letting.objects.first().id]),
+            reverse('admin:profiles_profile_change', args=[Profile.objects.first().id]),
+        ]
+
+        # Twice: with cold then warm caches
+        assert check_query_budgets(client, paths) == []
+        assert check_query_budgets(client, paths) == []
+
+    def test_profiles_index_single_query(self, catalogue, django_assert_num_queries, client):
+        """Test that the profiles list does not run a query per profile."""
+        with django_assert_num_queries(2):
+            response = client.get(reverse('profiles:index'))
+        assert b'user3' in response.content
+
+    def test_problems_reported(self, db, client, settings):
+        """Test that views over budget or without budget are reported."""
+        settings.QUERY_BUDGET = {'RAISE': True, 'DEFAULT': None, 'ROUTES': {'admin:index': 1}}
+        client.force_login(User.objects.create_superuser('admin', password=None))
+
+        problems = check_query_budgets(client, ['/admin/', '/admin/lettings/letting/'])
+
+        assert len(problems) == 2
+        assert problems[0].startswith('/admin/: ') and problems[0].endswith('budget 1')
+        assert problems[1] == '/admin/lettings/letting/: no query budget declared'
@@ -0,0 +1,107 @@
+"""
+Tests for the query plan checks.
+
+This module checks the detection of full table scans and unindexed sorts,
+that every query of the hot views uses an index, and the
+check_query_plans management command.
+"""
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.http import HttpResponse
+
+from lettings.models import Address, Letting
+from oc_lettings_site import query_plans
+from oc_lettings_site.query_plans import check_query_plans, explain, plan_problems
+from profiles.models import Profile
+
+
+def plan(queryset):
+    """Return the plan of a queryset."""
+    return explain(*queryset.query.sql_with_params())
+
+
+@pytest.mark.django_db
+class TestPlanProblems:
+    """Test cases for the detection of full scans and sorts."""
+
+    def test_indexed_lookups(self):
+        """Test that the indexed filters are not reported."""
+        for queryset in [Address.objects.filter(city='Boston'),
+                         Address.objects.filter(zip_code=2108),
+                         Profile.objects.filter(favorite_city='Boston'),
+                         Letting.objects.filter(id=4)]:
+            assert plan_problems(plan(queryset)) == []
+
+    def test_full_scan(self):
+        """Test that a filter on a column without index is reported."""
+        problems = plan_problems(plan(Address.objects.filter(street='Main Street')))
+
+        assert problems == ['SCAN lettings_address']
+
+    def test_allowed_table(self):
+        """Test that the tables read in full on purpose are not reported."""
+        assert plan_problems(plan(Letting.objects.all()), {'lettings_letting'}) == []
+
+    def test_unindexed_sort(self):
+        """Test that a sort without index is reported, even on an allowed table."""
+        problems = plan_problems(plan(Letting.objects.order_by('title')), {'lettings_letting'})
+
+        assert len(problems) == 1
+        assert 'TEMP B-TREE' in problems[0]
+
+    def test_postgresql_plan(self):
+        """Test the detection on PostgreSQL plans."""
+        lines = [
+            'Sort  (cost=10.1..10.2 rows=10 width=4)',
+            '  ->  Seq Scan on lettings_address  (cost=0.00..1.10 rows=10 width=4)',
+            '  ->  Index Scan using lettings_letting_pkey on lettings_letting',
+        ]
+
+        assert plan_problems(lines, {'lettings_address'}, 'postgresql') == [lines[0]]
+
+
+class TestCheckQueryPlans:
+    """Test cases for the checks of the hot views."""
+
+    def test_hot_views_indexed(self, catalogue):
+        """Test that every query of the hot views uses an index."""
+        reports = check_query_plans()
+
+        assert {report['view'] for report in reports} == {
+            name for name, *_ in query_plans.HOT_VIEWS
+        }
+        assert [report for report in reports if report['problems']] == []
+
+    def test_empty_database(self, db):
+        """Test that views without arguments to draw are skipped."""
+        reports = check_query_plans()
+
+        assert {report['view'] for report in reports} == {'lettings:index', 'profiles:index'}
+
+    def test_command(self, catalogue, capsys):
+        """Test that the command lists the plans and succeeds."""
+        call_command('check_query_plans', views=['lettings:letting'], verbosity=2)
+
+        out = capsys.readouterr().out
+        assert 'SEARCH lettings_letting USING INTEGER PRIMARY KEY' in out
+        assert '1 query plans checked' in out
+
+    def test_command_regression(self, catalogue, monkeypatch, capsys):
+        """Test that the command fails when a view reads a whole table."""
+        def view(request):
+            return HttpResponse(str(list(Address.objects.filter(street='Street 1'))))
+
+        monkeypatch.setattr(query_plans, 'HOT_VIEWS',
+                            [('lettings:index', view, lambda: [], set())])
+
+        with pytest.raises(CommandError, match='1 of 1 queries'):
+            call_command('check_query_plans')
+        assert 'SCAN lettings_address' in capsys.readouterr().err
+
+    def test_unsupported_database(self, catalogue, monkeypatch):
+        """Test that databases without plan check are rejected."""
+        monkeypatch.setattr(query_plans, 'SCAN_PATTERNS', {})
+
+        with pytest.raises(CommandError, match='No query plan check'):
+            call_command('check_query_plans')
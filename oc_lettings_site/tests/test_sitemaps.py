@@ -0,0 +1,124 @@
+"""
+Tests for the chunked sitemaps.
+
+This module checks the sitemap index, the generated and cached chunk
+sitemaps and the modification dates they report.
+"""
+import datetime
+import time
+from unittest.mock import patch
+
+import pytest
+
+from lettings.models import Address, Letting
+from oc_lettings_site import sitemaps
+from profiles.models import Profile
+
+
+@pytest.fixture
+def sitemap_catalogue(catalogue):
+    """Add a letting to the test catalogue, in a third chunk of 10 IDs."""
+    address = Address.objects.create(
+        number=25, street='Street 25', city='Test City',
+        state='TS', zip_code=10025, country_iso_code='TST'
+    )
+    Letting.objects.create(id=25, title='Letting 25', address=address)
+    with patch.object(sitemaps, 'CHUNK_SIZE', 10):
+        yield
+
+
+def content(response):
+    """Return the body of a regular or streaming response."""
+    if response.streaming:
+        return b''.join(response.streaming_content).decode()
+    return response.content.decode()
+
+
+class TestSitemaps:
+    """Test cases for the sitemap index and chunk views."""
+
+    def test_index_lists_non_empty_chunks(self, client, sitemap_catalogue):
+        """Test that the index points to every non-empty chunk."""
+        response = client.get('/sitemap.xml')
+
+        body = content(response)
+        assert response['Content-Type'].startswith('application/xml')
+        assert '<loc>http://testserver/sitemap-lettings-0.xml</loc>' in body
+        assert '<loc>http://testserver/sitemap-lettings-2.xml</loc>' in body
+        assert 'sitemap-lettings-1.xml' not in body
+        assert '<loc>http://testserver/sitemap-profiles-0.xml</loc>' in body
+        assert body.count('<lastmod>') == 3
+
+    def test_chunk_lists_its_pages(self, client, sitemap_catalogue):
+        """Test that a chunk lists the pages of its ID range."""
+        body = content(client.get('/sitemap-lettings-0.xml'))
+
+        assert '<loc>http://testserver/lettings/1/</loc>' in body
+        assert '<loc>http://testserver/lettings/2/</loc>' in body
+        assert '/lettings/25/' not in body
+        assert '<loc>http://testserver/profiles/user1/</loc>' in content(
+            client.get('/sitemap-profiles-0.xml'))
+
+    def test_chunk_served_from_cache(self, client, sitemap_catalogue, django_assert_num_queries):
+        """Test that a cached chunk, even empty, is served without any query."""
+        # The rows of each chunk
+        with django_assert_num_queries(2):
+            expected = content(client.get('/sitemap-lettings-0.xml'))
+            client.get('/sitemap-lettings-1.xml')
+
+        with django_assert_num_queries(0):
+            second = client.get('/sitemap-lettings-0.xml')
+            assert client.get('/sitemap-lettings-1.xml').status_code == 404
+
+        assert content(second) == expected
+
+    def test_chunk_generated_once(self, client, sitemap_catalogue):
+        """Test that chunks go through the stampede protection."""
+        with patch.object(sitemaps.stampede, 'get_or_set',
+                          wraps=sitemaps.stampede.get_or_set) as get_or_set:
+            client.get('/sitemap-lettings-0.xml')
+
+        key, _, timeout = get_or_set.call_args.args
+        assert key == 'sitemap:lettings:0:http://testserver'
+        assert timeout == sitemaps.CHUNK_TIMEOUT
+
+    def test_change_refreshes_chunk(self, client, sitemap_catalogue):
+        """Test that changing an address updates the letting lastmod once expired."""
+        content(client.get('/sitemap-lettings-0.xml'))
+        address = Letting.objects.get(id=2).address
+        later = datetime.datetime(2031, 1, 2, 3, 4, 5, tzinfo=datetime.timezone.utc)
+        with patch('oc_lettings_site.fields.timezone.now', return_value=later):
+            address.save()
+        assert '2031-01-02' not in content(client.get('/sitemap-lettings-0.xml'))
+
+        expired = time.time() + sitemaps.CHUNK_TIMEOUT + 1
+        with patch('oc_lettings_site.stampede.time.time', return_value=expired):
+            body = content(client.get('/sitemap-lettings-0.xml'))
+
+        assert '<lastmod>2031-01-02T03:04:05+00:00</lastmod>' in body
+
+    def test_user_change_touches_profile(self, sitemap_catalogue):
+        """Test that editing a displayed user field refreshes the profile."""
+        profile = Profile.objects.get(user__username='user1')
+        before = profile.updated_at
+        profile.user.last_login = datetime.datetime(2030, 1, 1, tzinfo=datetime.timezone.utc)
+        profile.user.save(update_fields=['last_login'])
+        assert Profile.objects.get(pk=profile.pk).updated_at == before
+
+        profile.user.email = 'changed@example.com'
+        profile.user.save()
+
+        assert Profile.objects.get(pk=profile.pk).updated_at > before
+
+    @pytest.mark.parametrize('url', ['/sitemap-lettings-1.xml', '/sitemap-unknown-0.xml'])
+    def test_unknown_chunks(self, client, sitemap_catalogue, url):
+        """Test that empty chunks and unknown sections are answered 404."""
+        assert client.get(url).status_code == 404
+
+    def test_rows_read_in_batches(self, client, sitemap_catalogue):
+        """Test that a chunk read in batches smaller than it is complete."""
+        with patch.object(sitemaps, 'ITERATOR_CHUNK_SIZE', 1):
+            body = content(client.get('/sitemap-lettings-0.xml'))
+
+        assert body.count('<url>') == 3
+        assert body.endswith('</urlset>\n')
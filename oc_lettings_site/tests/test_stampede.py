@@ -0,0 +1,208 @@
+"""
+Tests for the cache stampede protection.
+
+This module checks single-flight recomputation between processes sharing
+the cache, stale-while-revalidate serving and the probabilistic early
+refresh of ``stampede.get_or_set``.
+"""
+import multiprocessing
+import os
+import time
+from functools import partial
+from unittest.mock import patch
+
+import pytest
+from django.core.cache import caches
+from django.test import override_settings
+
+from oc_lettings_site import stampede
+
+KEY = 'hot-key'
+
+WORKERS = 8
+
+
+@pytest.fixture
+def shared_cache(tmp_path):
+    """Point the shared cache to an empty directory."""
+    with override_settings(CACHES={
+        'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+        'shared': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': str(tmp_path / 'shared'),
+        },
+    }):
+        yield caches['shared']
+
+
+def slow_compute(log_path, value='fresh', seconds=0.3):
+    """Record a computation in a file, shared by the processes, and return a value."""
+    with open(log_path, 'a') as log:
+        log.write('computed\n')
+    time.sleep(seconds)
+    return value
+
+
+def computations(log_path):
+    """Return the number of computations recorded."""
+    return log_path.read_text().count('computed') if log_path.exists() else 0
+
+
+def worker(barrier, results, log_path):
+    """Request the key at the same time as the other processes."""
+    barrier.wait()
+    results.put(stampede.get_or_set(KEY, partial(slow_compute, log_path), timeout=60))
+
+
+def run_workers(log_path):
+    """Request the key from several processes at once and return their values."""
+    context = multiprocessing.get_context('fork')
+    barrier = context.Barrier(WORKERS)
+    results = context.Queue()
+    processes = [context.Process(target=worker, args=(barrier, results, log_path))
+                 for _ in range(WORKERS)]
+    for process in processes:
+        process.start()
+    values = [results.get(timeout=30) for _ in processes]
+    for process in processes:
+        process.join()
+    return values
+
+
+def lock_path(cache):
+    """Return the lock file of the key."""
+    return stampede._lock_path(cache, stampede.LOCK_PREFIX + KEY)
+
+
+def store(cache, value, expires_in, delta=0.1):
+    """Store an entry as get_or_set does, expiring in ``expires_in`` seconds."""
+    cache.set(KEY, (value, time.time() + expires_in, delta), 600)
+
+
+class TestSingleFlight:
+    """Test cases for concurrent requests of a missing or expired key."""
+
+    def test_concurrent_misses_compute_once(self, shared_cache, tmp_path):
+        """Test that processes missing the key at once wait for a single computation."""
+        log_path = tmp_path / 'computations.log'
+
+        values = run_workers(log_path)
+
+        assert values == ['fresh'] * WORKERS
+        assert computations(log_path) == 1
+        assert not os.path.exists(lock_path(shared_cache))
+
+    def test_expired_entry_refreshed_once(self, shared_cache, tmp_path):
+        """Test that one process refreshes an expired entry while the others serve it."""
+        log_path = tmp_path / 'computations.log'
+        store(shared_cache, 'stale', expires_in=-1)
+
+        values = run_workers(log_path)
+
+        assert sorted(values) == ['fresh'] + ['stale'] * (WORKERS - 1)
+        assert computations(log_path) == 1
+        assert shared_cache.get(KEY)[0] == 'fresh'
+
+    def test_abandoned_lock_expires(self, shared_cache, tmp_path):
+        """Test that a worker waits no longer than the lock timeout for a missing value."""
+        log_path = tmp_path / 'computations.log'
+        assert stampede._acquire(shared_cache, KEY, 60)
+
+        value = stampede.get_or_set(KEY, partial(slow_compute, log_path, seconds=0),
+                                    timeout=60, lock_timeout=0.1)
+
+        assert value == 'fresh'
+        assert computations(log_path) == 1
+
+    def test_failed_computation_releases_lock(self, shared_cache):
+        """Test that the lock is released when the computation raises."""
+        def broken():
+            raise RuntimeError('boom')
+
+        with pytest.raises(RuntimeError):
+            stampede.get_or_set(KEY, broken, timeout=60)
+
+        assert not os.path.exists(lock_path(shared_cache))
+
+    def test_lock_in_cache(self, shared_cache, tmp_path):
+        """Test that the lock is a cache entry in other backends."""
+        log_path = tmp_path / 'computations.log'
+        default = caches['default']
+        compute = partial(slow_compute, log_path, seconds=0)
+
+        with patch.object(default, 'add', wraps=default.add) as cache_add:
+            first = stampede.get_or_set(KEY, compute, timeout=60, cache_alias='default')
+            second = stampede.get_or_set(KEY, compute, timeout=60, cache_alias='default')
+
+        assert first == second == 'fresh'
+        assert computations(log_path) == 1
+        assert cache_add.call_args.args[0] == stampede.LOCK_PREFIX + KEY
+        assert default.get(stampede.LOCK_PREFIX + KEY) is None
+
+
+class TestStaleWhileRevalidate:
+    """Test cases for the serving of expired entries."""
+
+    def test_stale_served_while_locked(self, shared_cache, tmp_path):
+        """Test that an expired entry is served without computing while locked."""
+        log_path = tmp_path / 'computations.log'
+        store(shared_cache, 'stale', expires_in=-1)
+        assert stampede._acquire(shared_cache, KEY, 60)
+
+        value = stampede.get_or_set(KEY, partial(slow_compute, log_path), timeout=60)
+
+        assert value == 'stale'
+        assert computations(log_path) == 0
+
+    def test_stale_window(self, shared_cache, tmp_path):
+        """Test that entries are kept ``stale`` seconds after their expiry."""
+        log_path = tmp_path / 'computations.log'
+
+        with patch.object(shared_cache, 'set', wraps=shared_cache.set) as cache_set:
+            stampede.get_or_set(KEY, partial(slow_compute, log_path, seconds=0),
+                                timeout=60, stale=30)
+
+        value, expires, delta = cache_set.call_args.args[1]
+        assert cache_set.call_args.args[2] == 90
+        assert value == 'fresh'
+        assert expires == pytest.approx(time.time() + 60, abs=1)
+
+
+class TestEarlyRefresh:
+    """Test cases for the probabilistic early refresh."""
+
+    def test_fresh_entry_served(self, shared_cache, tmp_path):
+        """Test that a fresh entry far from its expiry is served."""
+        log_path = tmp_path / 'computations.log'
+        store(shared_cache, 'cached', expires_in=60)
+
+        value = stampede.get_or_set(KEY, partial(slow_compute, log_path), timeout=60)
+
+        assert value == 'cached'
+        assert computations(log_path) == 0
+
+    def test_refreshed_before_expiry(self, shared_cache, tmp_path):
+        """Test that an entry close to its expiry may be refreshed early."""
+        log_path = tmp_path / 'computations.log'
+        # Takes 1s to compute and expires in 2s
+        store(shared_cache, 'cached', expires_in=2, delta=1)
+
+        # -log(1 - 0.9) is 2.3: the refresh is started 2.3s before expiry
+        with patch('oc_lettings_site.stampede.random.random', return_value=0.9):
+            value = stampede.get_or_set(KEY, partial(slow_compute, log_path, seconds=0),
+                                        timeout=60)
+
+        assert value == 'fresh'
+        assert computations(log_path) == 1
+
+    def test_not_refreshed_without_beta(self, shared_cache, tmp_path):
+        """Test that beta 0 disables the early refresh."""
+        log_path = tmp_path / 'computations.log'
+        store(shared_cache, 'cached', expires_in=2, delta=1)
+
+        with patch('oc_lettings_site.stampede.random.random', return_value=0.9):
+            value = stampede.get_or_set(KEY, partial(slow_compute, log_path), timeout=60,
+                                        beta=0)
+
+        assert value == 'cached'
+        assert computations(log_path) == 0
@@ -0,0 +1,136 @@
+"""
+Tests for the static HTML export.
+
+This module checks the exported files, the incremental re-rendering driven
+by the page fingerprints and the ``export_static`` command.
+"""
+import gzip
+import json
+from unittest.mock import patch
+
+import pytest
+from django.core.management import call_command
+
+from lettings.models import Address, Letting
+from oc_lettings_site import static_export
+from oc_lettings_site.static_export import export_site, manifest_file, page_file
+from profiles.models import Profile
+
+
+class InProcessExecutor:
+    """Executor running the tasks in the current process."""
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def map(self, fn, *iterables):
+        return map(fn, *iterables)
+
+
+@pytest.mark.django_db
+class TestStaticExport:
+    """Test cases for the incremental static export."""
+
+    def test_every_page_exported(self, catalogue, tmp_path):
+        """Test that every page is written with a gzipped copy."""
+        report = export_site(tmp_path)
+
+        assert report == {'rendered': 9, 'unchanged': 0, 'removed': 0}
+        letting = page_file(tmp_path, '/lettings/2/')
+        assert letting == tmp_path / 'lettings' / '2' / 'index.html'
+        assert 'Street 2' in letting.read_text()
+        assert gzip.decompress(letting.with_name('index.html.gz').read_bytes()) \
+            == letting.read_bytes()
+        assert 'Holiday Homes' in (tmp_path / 'index.html').read_text()
+        manifest = json.loads(manifest_file(tmp_path).read_text())
+        assert '/profiles/user1/' in manifest['pages']
+
+    def test_manifest_outside_served_directory(self, catalogue, tmp_path):
+        """Test that the manifest is kept next to the export, not served with it."""
+        root = tmp_path / 'export'
+        export_site(root)
+        # Written inside the export directory by earlier versions
+        legacy = root / 'manifest.json'
+        legacy.write_text(manifest_file(root).read_text())
+        manifest_file(root).unlink()
+
+        report = export_site(root)
+
+        assert manifest_file(root) == tmp_path / 'export.manifest.json'
+        assert report['rendered'] == 0
+        assert manifest_file(root).exists() and not legacy.exists()
+
+    def test_only_changed_pages_rendered(self, catalogue, tmp_path):
+        """Test that a second export only renders the affected pages."""
+        export_site(tmp_path)
+        Letting.objects.filter(id=1).update(title='Renamed')
+        Profile.objects.filter(user__username='user2').delete()
+
+        report = export_site(tmp_path)
+
+        assert report == {'rendered': 3, 'unchanged': 5, 'removed': 1}
+        assert 'Renamed' in page_file(tmp_path, '/lettings/1/').read_text()
+        assert 'Renamed' in page_file(tmp_path, '/lettings/').read_text()
+        assert not (tmp_path / 'profiles' / 'user2').exists()
+
+    def test_list_fingerprint_covers_listed_values(self, catalogue):
+        """Test that list pages only change with the values they show."""
+        before = static_export.page_fingerprints()
+        Address.objects.filter(letting__id=1).update(city='Elsewhere')
+        after_address = static_export.page_fingerprints()
+        Letting.objects.filter(id=1).update(title='Renamed')
+        after_title = static_export.page_fingerprints()
+
+        assert after_address['/lettings/'] == before['/lettings/']
+        assert after_address['/lettings/1/'] != before['/lettings/1/']
+        assert after_title['/lettings/'] != before['/lettings/']
+        assert list(before)[:3] == ['/', '/lettings/', '/profiles/']
+
+    def test_site_change_renders_everything(self, catalogue, tmp_path):
+        """Test that a template or asset change renders every page again."""
+        export_site(tmp_path)
+
+        with patch.object(static_export, 'site_version', return_value='new'):
+            report = export_site(tmp_path)
+
+        assert report['rendered'] == 9
+
+    def test_missing_file_rendered_again(self, catalogue, tmp_path):
+        """Test that a deleted exported file is restored."""
+        export_site(tmp_path)
+        page_file(tmp_path, '/profiles/user1/').unlink()
+
+        assert export_site(tmp_path)['rendered'] == 1
+
+    def test_process_pool(self, catalogue, tmp_path):
+        """Test that the pages are split into chunks for the worker pool."""
+        with patch.object(static_export, 'CHUNK_SIZE', 2), \
+                patch.object(static_export, 'ProcessPoolExecutor', InProcessExecutor):
+            report = export_site(tmp_path, workers=4)
+
+        assert report['rendered'] == 9
+
+    def test_failed_page_not_recorded(self, catalogue, tmp_path):
+        """Test that a page not answered 200 is retried by the next export."""
+        with patch.object(static_export, 'page_fingerprints',
+                          return_value={'/lettings/404/': 'x', '/': 'y'}):
+            report = export_site(tmp_path)
+
+        manifest = json.loads(manifest_file(tmp_path).read_text())
+        assert report['rendered'] == 1
+        assert list(manifest['pages']) == ['/']
+
+    def test_command(self, catalogue, tmp_path, capsys):
+        """Test that the command reports the export."""
+        call_command('export_static', '--output', str(tmp_path), '--workers', '1',
+                     '--full', verbosity=2)
+
+        output = capsys.readouterr().out
+        assert '9 page(s) rendered' in output
+        assert '9 rendered, 0 unchanged, 0 removed' in output
@@ -0,0 +1,87 @@
+"""
+Tests for the static files storage.
+
+This module checks that collected files are content-hashed, precompressed
+and served with immutable caching headers, and that references to missing
+files do not break ``collectstatic``.
+"""
+import json
+
+import pytest
+from django.core.management import call_command
+from django.test import Client, override_settings
+
+from oc_lettings_site.storage import ImmutableStaticFilesStorage
+
+
+@pytest.fixture
+def static_dirs(tmp_path):
+    """
+    Create a small static source tree and an empty static root.
+
+    Changing ``STATIC_ROOT`` resets the ``staticfiles_storage`` singleton,
+    so the collected files never touch the project's own static root.
+    """
+    source = tmp_path / 'static'
+    (source / 'css').mkdir(parents=True)
+    (source / 'img').mkdir()
+    (source / 'img' / 'logo.png').write_bytes(b'\x89PNG fake image')
+    (source / 'css' / 'site.css').write_text(
+        'body { background: url("../img/logo.png"); }\n'
+        '.mockup { background: url("../img/missing.png"); }\n'
+        + '.padding { margin: 0; }\n' * 200
+    )
+    root = tmp_path / 'root'
+    with override_settings(
+        STATICFILES_DIRS=[str(source)],
+        STATIC_ROOT=str(root),
+        STATICFILES_FINDERS=['django.contrib.staticfiles.finders.FileSystemFinder'],
+    ):
+        yield root
+
+
+class TestImmutableStaticFilesStorage:
+    """Test cases for the hashed, compressed static files storage."""
+
+    def test_collectstatic_writes_hashed_and_compressed_files(self, static_dirs):
+        """Test that files are hashed, compressed and listed in the manifest."""
+        call_command('collectstatic', '--noinput', '--skip-css-purge', verbosity=0)
+
+        manifest = json.loads((static_dirs / 'staticfiles.json').read_text())
+        hashed_css = manifest['paths']['css/site.css']
+        assert hashed_css != 'css/site.css'
+        assert (static_dirs / hashed_css).exists()
+        assert (static_dirs / f'{hashed_css}.gz').exists()
+
+        content = (static_dirs / hashed_css).read_text()
+        # Existing references are rewritten, missing ones are kept as is
+        assert manifest['paths']['img/logo.png'].split('/')[-1] in content
+        assert '../img/missing.png' in content
+
+    def test_hashed_files_are_served_immutable(self, static_dirs):
+        """Test that WhiteNoise serves hashed files with a far-future header."""
+        call_command('collectstatic', '--noinput', '--skip-css-purge', verbosity=0)
+        manifest = json.loads((static_dirs / 'staticfiles.json').read_text())
+
+        client = Client()
+        response = client.get(f"/static/{manifest['paths']['css/site.css']}")
+
+        assert response.status_code == 200
+        assert 'immutable' in response['Cache-Control']
+
+    def test_missing_file_keeps_its_name(self, tmp_path):
+        """Test that hashing a missing file returns its original name."""
+        storage = ImmutableStaticFilesStorage(location=str(tmp_path))
+
+        assert storage.hashed_name('css/missing.css') == 'css/missing.css'
+
+    def test_stored_name_without_manifest_is_memoized(self, tmp_path):
+        """Test that names are only hashed once when no manifest exists."""
+        (tmp_path / 'app.js').write_text('console.log(1);')
+        storage = ImmutableStaticFilesStorage(location=str(tmp_path))
+
+        first = storage.stored_name('app.js')
+        (tmp_path / 'app.js').write_text('console.log(2);')
+
+        assert first.startswith('app.') and first != 'app.js'
+        assert storage.stored_name('app.js') == first
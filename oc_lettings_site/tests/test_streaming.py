@@ -0,0 +1,75 @@
+"""
+Tests for the streamed rendering of the list pages.
+
+This module checks that streamed pages match the pages rendered in full,
+that their head is sent before any query and that empty lists are handled.
+"""
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from lettings.models import Letting
+from oc_lettings_site.query_plans import check_query_plans
+from oc_lettings_site.streaming import stream_list
+
+
+def pages(client, settings, path):
+    """Return the full and the streamed page of a path."""
+    settings.STREAMING_RENDER = False
+    full = client.get(path)
+    settings.STREAMING_RENDER = True
+    streamed = client.get(path)
+    assert not full.streaming
+    assert streamed.streaming
+    return full.content.decode(), b''.join(streamed.streaming_content).decode()
+
+
+class TestStreaming:
+    """Test cases for stream_list and the streamed index views."""
+
+    @pytest.mark.parametrize('path, last_row', [
+        ('/lettings/', 'Letting 3'), ('/profiles/', 'user3'),
+    ])
+    def test_same_page(self, client, settings, catalogue, path, last_row):
+        """Test that a streamed page is identical to the full page."""
+        full, streamed = pages(client, settings, path)
+
+        assert streamed == full
+        assert last_row in streamed
+
+    @pytest.mark.parametrize('path', ['/lettings/', '/profiles/'])
+    def test_empty_list(self, client, settings, db, path):
+        """Test that an empty list streams the page without rows."""
+        full, streamed = pages(client, settings, path)
+
+        assert streamed == full
+        assert 'are available.' in streamed
+
+    def test_head_sent_before_queries(self, rf, catalogue):
+        """Test that the head is sent first and rows are read in chunks."""
+        rows = Letting.objects.values_list('id', 'title', named=True)
+        request = rf.get('/lettings/')
+
+        with CaptureQueriesContext(connection) as captured:
+            response = stream_list(request, 'lettings/index.html', 'lettings_list', rows,
+                                   'lettings/index_rows.html', chunk_size=2)
+            parts = iter(response.streaming_content)
+            head = next(parts).decode()
+            assert len(captured) == 0
+            rest = [part.decode() for part in parts]
+
+        assert head.rstrip().endswith('</head>')
+        assert '<title>Lettings</title>' in head
+        # Navbar, two chunks of rows and the end of the page
+        assert len(rest) == 4
+        assert sum(part.count('<li') for part in rest) == 3
+        assert rest[-1].rstrip().endswith('</html>')
+
+    def test_query_plans_of_streamed_views(self, settings, catalogue):
+        """Test that the queries of streamed pages are still explained."""
+        settings.STREAMING_RENDER = True
+
+        reports = check_query_plans(views=['lettings:index'])
+
+        assert any('lettings_letting' in report['sql'] for report in reports)
+        assert all(not report['problems'] for report in reports)
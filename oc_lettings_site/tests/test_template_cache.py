@@ -0,0 +1,95 @@
+"""
+Tests for the template caching.
+
+This module checks the layout cache version context processor, the cached
+``base.html`` fragments and the ``bench_templates`` command.
+"""
+import pytest
+from django.core.cache import caches
+from django.core.management import call_command
+from django.test import override_settings
+
+from oc_lettings_site import context_processors
+
+FRAGMENT_CACHES = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+    'template_fragments': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'test-fragments',
+    },
+}
+
+
+@pytest.fixture(autouse=True)
+def clear_version():
+    """Forget the layout version computed by other tests."""
+    context_processors.layout_cache_version.cache_clear()
+    yield
+    context_processors.layout_cache_version.cache_clear()
+
+
+class TestLayoutCacheVersion:
+    """Test cases for the layout cache version context processor."""
+
+    def test_version_from_settings(self, settings):
+        """Test that an explicit release version is used as is."""
+        settings.LAYOUT_CACHE_VERSION = 'release-42'
+
+        assert context_processors.layout(None) == {'layout_cache_version': 'release-42'}
+
+    def test_version_follows_static_manifest(self, settings, tmp_path):
+        """Test that a new static files manifest changes the version."""
+        settings.LAYOUT_CACHE_VERSION = ''
+        settings.STATIC_ROOT = str(tmp_path)
+        (tmp_path / 'staticfiles.json').write_text('{"paths": {"a.css": "a.1.css"}}')
+        first = context_processors.layout_cache_version()
+
+        context_processors.layout_cache_version.cache_clear()
+        (tmp_path / 'staticfiles.json').write_text('{"paths": {"a.css": "a.2.css"}}')
+
+        assert context_processors.layout_cache_version() != first
+
+
+@pytest.mark.django_db
+class TestLayoutFragments:
+    """Test cases for the cached head, navbar and footer of the layout."""
+
+    @override_settings(CACHES=FRAGMENT_CACHES, LAYOUT_CACHE_VERSION='v1')
+    def test_fragments_are_cached_once(self, client):
+        """Test that the layout fragments are stored and reused."""
+        first = client.get('/').content.decode()
+        fragments = caches['template_fragments']
+        keys = list(fragments._cache)
+
+        second = client.get('/lettings/').content.decode()
+
+        assert len(keys) == 3
+        assert list(fragments._cache) == keys
+        assert 'href="/profiles/"' in first and 'href="/profiles/"' in second
+        assert '<title>Lettings</title>' in second
+
+    @override_settings(CACHES=FRAGMENT_CACHES)
+    def test_new_version_renders_new_fragments(self, client, settings):
+        """Test that changing the version bypasses the stored fragments."""
+        settings.LAYOUT_CACHE_VERSION = 'v1'
+        client.get('/')
+        context_processors.layout_cache_version.cache_clear()
+        settings.LAYOUT_CACHE_VERSION = 'v2'
+
+        client.get('/')
+
+        assert len(caches['template_fragments']._cache) == 6
+
+
+class TestBenchTemplatesCommand:
+    """Test cases for the bench_templates command."""
+
+    def test_reports_each_configuration(self, capsys):
+        """Test that every page is measured under every configuration."""
+        call_command('bench_templates', '--iterations', '2', '--rows', '3')
+
+        output = capsys.readouterr().out
+        assert 'cached loader + fragments' in output
+        for path in ('/lettings/1/', '/profiles/user1/', 'mean'):
+            assert path in output
+        assert 'faster' in output
@@ -10,6 +10,7 @@ URL Patterns:
     'lettings/': Include all lettings app URLs with namespace
     'profiles/': Include all profiles app URLs with namespace
     'admin/': Django admin interface
+    'sitemap.xml': Sitemap index, pointing to the chunked section sitemaps
 
 Custom Error Handlers:
     handler404: Custom 404 (Not Found) error page
@@ -20,13 +21,16 @@ from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
 
-from . import views
+from . import sitemaps, views
 
 urlpatterns = [
     path('', views.index, name='index'),
     path('lettings/', include('lettings.urls')),
     path('profiles/', include('profiles.urls')),
     path('admin/', admin.site.urls),
+    path('sitemap.xml', sitemaps.sitemap_index, name='sitemap'),
+    path('sitemap-<str:section>-<int:number>.xml', sitemaps.sitemap_section,
+         name='sitemap-section'),
 ]
 
 # Serve media and static files in development
@@ -8,14 +8,80 @@ The views handle:
 - Home page rendering with navigation to lettings and profiles
 - Custom 404, 500, and 403 error pages with user-friendly messaging
 - Error testing views for development purposes
+
+The home page and the error pages do not depend on the request or on the
+database, so outside DEBUG they are rendered once per worker and served
+from memory afterwards. A plain HTML file is served for 500 errors when the
+template engine itself fails.
 """
 import logging
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.http import HttpResponse
 from django.shortcuts import render
 
+from .query_budget import query_budget
+
 # Configure logger for this module
 logger = logging.getLogger(__name__)
 
+# Served when the 500 template itself cannot be rendered
+STATIC_500_PAGE = settings.BASE_DIR / 'templates' / '500_static.html'
+
+# Rendered page bodies by template name, filled on first use
+_prerendered_pages = {}
+
+
+def clear_prerendered_pages():
+    """Forget the pre-rendered pages so they are rendered again on next use."""
+    _prerendered_pages.clear()
+
+
+@receiver(setting_changed)
+def _settings_changed(**kwargs):
+    """Drop the pre-rendered pages when settings are overridden (tests)."""
+    clear_prerendered_pages()
+
+
+def prerendered(request, template_name, status=200):
+    """
+    Return a static page, rendering its template only on first use.
+
+    Pages are rendered on every request in DEBUG so template edits show up.
+
+    Args:
+        request (HttpRequest): The Django HTTP request object.
+        template_name (str): Template of a page without request-specific data.
+        status (int): HTTP status code of the response.
+
+    Returns:
+        HttpResponse: Response with the pre-rendered page body.
+    """
+    content = _prerendered_pages.get(template_name)
+    if content is None:
+        content = render(request, template_name).content
+        if not settings.DEBUG:
+            _prerendered_pages[template_name] = content
+    return HttpResponse(content, status=status)
+
+
+def static_500_page():
+    """
+    Return the body of the plain HTML 500 page.
+
+    Returns:
+        bytes: Content of ``STATIC_500_PAGE``, or a minimal page if missing.
+    """
+    try:
+        return STATIC_500_PAGE.read_bytes()
+    except OSError:
+        return (b'<!DOCTYPE html><title>Server Error - 500</title>'
+                b'<h1>500 Internal Server Error</h1>')
 
+
+@query_budget(0)
 def index(request):
     """
     Render the main home page of the OC Lettings Site application.
@@ -42,7 +108,7 @@ def index(request):
 
         # Log successful homepage rendering
         logger.info("Homepage rendered successfully")
-        return render(request, 'index.html')
+        return prerendered(request, 'index.html')
 
     except Exception as e:
         # Log any unexpected errors in homepage
@@ -73,11 +139,11 @@ def custom_404(request, exception):
     referer = request.META.get('HTTP_REFERER', 'unknown')
     user_agent = request.META.get('HTTP_USER_AGENT', 'unknown')
 
-    logger.warning(f"404 Error: URL='{requested_url}', IP={client_ip}, "
-                   f"Referer='{referer}', Exception='{exception}'")
-    logger.debug(f"404 User-Agent: {user_agent}")
+    logger.warning("404 Error: URL='%s', IP=%s, Referer='%s', Exception='%s'",
+                   requested_url, client_ip, referer, exception)
+    logger.debug("404 User-Agent: %s", user_agent)
 
-    return render(request, '404.html', status=404)
+    return prerendered(request, '404.html', status=404)
 
 
 def custom_500(request):
@@ -92,7 +158,8 @@ def custom_500(request):
         request (HttpRequest): The Django HTTP request object.
 
     Returns:
-        HttpResponse: Rendered HTML response with custom 500 error page.
+        HttpResponse: Rendered HTML response with custom 500 error page,
+                     or the plain HTML page if rendering fails.
                      Status code 500 (Internal Server Error).
     """
     # Log 500 errors with detailed context
@@ -103,7 +170,12 @@ def custom_500(request):
     logger.error(f"500 Internal Server Error: URL='{requested_url}', IP={client_ip}")
     logger.debug(f"500 User-Agent: {user_agent}")
 
-    return render(request, '500.html', status=500)
+    try:
+        return prerendered(request, '500.html', status=500)
+    except Exception as e:
+        logger.critical(f"500 template rendering failed, serving static page: {str(e)}",
+                        exc_info=True)
+        return HttpResponse(static_500_page(), status=500)
 
 
 def custom_403(request, exception):
@@ -127,8 +199,8 @@ def custom_403(request, exception):
     requested_url = request.get_full_path()
     user_agent = request.META.get('HTTP_USER_AGENT', 'unknown')
 
-    logger.warning(f"403 Forbidden: URL='{requested_url}', IP={client_ip}, "
-                   f"Exception='{exception}'")
-    logger.debug(f"403 User-Agent: {user_agent}")
+    logger.warning("403 Forbidden: URL='%s', IP=%s, Exception='%s'",
+                   requested_url, client_ip, exception)
+    logger.debug("403 User-Agent: %s", user_agent)
 
-    return render(request, '403.html', status=403)
+    return prerendered(request, '403.html', status=403)
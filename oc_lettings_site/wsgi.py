@@ -2,6 +2,11 @@ import os
 
 from django.core.wsgi import get_wsgi_application
 
+from oc_lettings_site import membership
+
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'oc_lettings_site.settings')
 
 application = get_wsgi_application()
+
+# Build the membership indexes of this worker before its first requests
+membership.build_in_background()
@@ -6,12 +6,26 @@ to provide a web-based administrative interface for managing user profiles.
 The admin interface allows authorized users to view and manage user profile
 information including favorite cities and associated user accounts.
 
+The table may hold millions of rows, so the admin derives from
+``ScalableModelAdmin``, and the user is picked by ID instead of from a
+``<select>`` of every user.
+
 Registered Models:
     Profile: For managing user profile information and favorite cities
 """
 from django.contrib import admin
 
+from oc_lettings_site.admin_tools import ScalableModelAdmin
 from .models import Profile
 
-# Register Profile model with Django admin
-admin.site.register(Profile)
+
+@admin.register(Profile)
+class ProfileAdmin(ScalableModelAdmin):
+    """Admin of the profiles, with their user fetched in the same query."""
+
+    list_display = ('id', 'user', 'favorite_city', 'updated_at')
+    # The string of a profile (and of its user) is the username
+    list_select_related = ('user',)
+    search_fields = ('id', 'user__username', 'favorite_city')
+    sortable_by = ('id', 'updated_at')
+    raw_id_fields = ('user',)
@@ -21,3 +21,7 @@ class ProfilesConfig(AppConfig):
     """
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'profiles'
+
+    def ready(self):
+        """Connect the signal handlers keeping the membership index and counters current."""
+        from . import signals  # noqa: F401
@@ -0,0 +1,19 @@
+"""
+Membership index of the usernames having a profile.
+
+The profile detail view consults ``usernames`` before querying the
+database, so requests for unknown usernames are answered 404 without the
+profile/user join. See ``oc_lettings_site.membership`` for the
+invalidation rules.
+"""
+from oc_lettings_site.membership import BloomFilter, MembershipIndex
+
+from .models import Profile
+
+
+def _usernames():
+    """Return an iterator over the usernames of the existing profiles."""
+    return Profile.objects.values_list('user__username', flat=True).iterator()
+
+
+usernames = MembershipIndex('profiles.username', _usernames, BloomFilter)
@@ -0,0 +1,41 @@
+# Generated by Django 4.2.30 on 2026-10-19 14:02
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+import oc_lettings_site.fields
+
+
+class Migration(migrations.Migration):
+    """Créer directement le schéma final sur une base neuve"""
+
+    # Les bases existantes gardent les migrations remplacées : le transfert
+    # depuis oc_lettings_site n'a rien à copier sur une base neuve
+    replaces = [
+        ('profiles', '0001_initial'),
+        ('profiles', '0002_transfer_data'),
+        ('profiles', '0003_updated_at'),
+        ('profiles', '0004_search_indexes'),
+    ]
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Profile',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('favorite_city', models.CharField(blank=True, db_index=True, max_length=64)),
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+                ('updated_at', oc_lettings_site.fields.ModificationDateTimeField(db_index=True, default=django.utils.timezone.now, editable=False)),
+            ],
+            options={
+                'verbose_name_plural': 'profiles',
+            },
+        ),
+    ]
@@ -2,31 +2,14 @@
 
 from django.db import migrations
 
-
-def transfer_data_forward(apps, schema_editor):
-    """Transférer les données de oc_lettings_site vers profiles"""
-    # Récupérer les anciens modèles  
-    OldProfile = apps.get_model('oc_lettings_site', 'Profile')
-    
-    # Récupérer les nouveaux modèles
-    NewProfile = apps.get_model('profiles', 'Profile')
-    
-    # Transférer les profils avec préservation des IDs et relations User
-    for old_profile in OldProfile.objects.all():
-        NewProfile.objects.create(
-            id=old_profile.id,
-            user=old_profile.user,  # Relation User préservée
-            favorite_city=old_profile.favorite_city,
-        )
-
-
-def transfer_data_reverse(apps, schema_editor):
-    """Fonction de rollback - supprime les données transférées"""
-    NewProfile = apps.get_model('profiles', 'Profile')
-    NewProfile.objects.all().delete()
+from oc_lettings_site.data_migrations import CopyModels
 
 
 class Migration(migrations.Migration):
+    """Transférer les données de oc_lettings_site vers profiles"""
+
+    # Chaque lot est validé à part, pour qu'une copie interrompue reprenne
+    atomic = False
 
     dependencies = [
         ('profiles', '0001_initial'),
@@ -34,8 +17,8 @@ class Migration(migrations.Migration):
     ]
 
     operations = [
-        migrations.RunPython(
-            transfer_data_forward,
-            transfer_data_reverse,
-        ),
+        # IDs et relations User préservés
+        CopyModels([
+            ('oc_lettings_site.Profile', 'profiles.Profile'),
+        ]),
     ]
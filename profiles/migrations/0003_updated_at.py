@@ -0,0 +1,24 @@
+# Generated by Django 4.2.30 on 2026-10-19 11:15
+
+from django.db import migrations
+import django.utils.timezone
+import oc_lettings_site.fields
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('profiles', '0002_transfer_data'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='profile',
+            options={'verbose_name_plural': 'profiles'},
+        ),
+        migrations.AddField(
+            model_name='profile',
+            name='updated_at',
+            field=oc_lettings_site.fields.ModificationDateTimeField(db_index=True, default=django.utils.timezone.now, editable=False),
+        ),
+    ]
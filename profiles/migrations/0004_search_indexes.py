@@ -0,0 +1,18 @@
+# Generated by Django 4.2.30 on 2026-10-19 11:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('profiles', '0003_updated_at'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='profile',
+            name='favorite_city',
+            field=models.CharField(blank=True, db_index=True, max_length=64),
+        ),
+    ]
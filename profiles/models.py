@@ -11,8 +11,11 @@ Models:
 from django.db import models
 from django.contrib.auth.models import User
 
+from oc_lettings_site.fields import ModificationDateTimeField
+from oc_lettings_site.models import CountedModel
 
-class Profile(models.Model):
+
+class Profile(CountedModel):
     """
     Model representing a user profile with extended information.
 
@@ -25,9 +28,13 @@ class Profile(models.Model):
                             When the User is deleted, the Profile is also deleted.
         favorite_city (CharField): User's favorite city (max 64 characters).
                                   This field is optional and can be blank.
+                                  Indexed for the admin search.
+        updated_at (ModificationDateTimeField): Date of the last change of the
+                                               profile or of its user.
     """
     user = models.OneToOneField(User, on_delete=models.CASCADE)
-    favorite_city = models.CharField(max_length=64, blank=True)
+    favorite_city = models.CharField(max_length=64, blank=True, db_index=True)
+    updated_at = ModificationDateTimeField()
 
     class Meta:
         """Meta configuration for Profile model."""
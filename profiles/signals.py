@@ -0,0 +1,75 @@
+"""
+Signal handlers for the profiles application.
+
+Functions:
+    profile_saved: Record the username of a saved profile and count it
+    profile_deleted: Count a deleted profile out
+    user_saved: Record the new username of a renamed user and touch its profile
+"""
+from django.contrib.auth.models import User
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from oc_lettings_site import counters
+from .membership import usernames
+from .models import Profile
+
+
+@receiver(post_save, sender=Profile)
+def profile_saved(sender, instance, created, using, **kwargs):
+    """
+    Record the username of a saved profile in the membership index, and
+    count the profile if new.
+
+    Args:
+        sender (type): The Profile model.
+        instance (Profile): The saved profile.
+        created (bool): Whether the profile was just inserted.
+        using (str): Database alias used for the save.
+    """
+    usernames.add(instance.user.username, using=using)
+    if created:
+        counters.add(sender, 1, using=using)
+
+
+@receiver(post_delete, sender=Profile)
+def profile_deleted(sender, instance, using, **kwargs):
+    """
+    Count a deleted profile out, in the transaction of the deletion.
+
+    Profiles deleted with their user are counted out too.
+
+    Args:
+        sender (type): The Profile model.
+        instance (Profile): The deleted profile.
+        using (str): Database alias used for the deletion.
+    """
+    counters.add(sender, -1, using=using)
+
+
+# User fields displayed on the profile page
+PROFILE_USER_FIELDS = frozenset({'username', 'first_name', 'last_name', 'email'})
+
+
+@receiver(post_save, sender=User)
+def user_saved(sender, instance, created, update_fields, using, **kwargs):
+    """
+    Reflect a change of the user in its profile.
+
+    The username is recorded in the membership index and the profile
+    ``updated_at`` is refreshed, so the sitemap reports the profile page as
+    modified. New users have no profile yet, and saves limited to fields
+    not displayed (such as ``last_login`` at each login) are ignored.
+
+    Args:
+        sender (type): The User model.
+        instance (User): The saved user.
+        created (bool): Whether the user was just created.
+        update_fields (frozenset): Fields saved, None when all were.
+        using (str): Database alias used for the save.
+    """
+    if created or (update_fields is not None and not update_fields & PROFILE_USER_FIELDS):
+        return
+    usernames.add(instance.username, using=using)
+    Profile.objects.using(using).filter(user=instance).update(updated_at=timezone.now())
@@ -0,0 +1,55 @@
+"""
+Tests for the profiles admin.
+
+This module checks that the profile admin pages run a bounded number of
+queries and never list every user in a form.
+"""
+import pytest
+from django.contrib.auth.models import User
+from django.urls import reverse
+
+from profiles.models import Profile
+
+
+@pytest.fixture
+def admin_client(db, client):
+    """Return a client logged in as a superuser."""
+    client.force_login(User.objects.create_superuser('admin', password=None))
+    return client
+
+
+@pytest.fixture
+def profiles(db):
+    """Create ten profiles."""
+    return [
+        Profile.objects.create(user=User.objects.create_user(f'user{i}'), favorite_city='Lyon')
+        for i in range(10)
+    ]
+
+
+class TestProfilesAdmin:
+    """Test cases for the profile admin."""
+
+    def test_changelist(self, admin_client, profiles, django_assert_max_num_queries):
+        """Test that the users are fetched with the profiles."""
+        with django_assert_max_num_queries(5):
+            response = admin_client.get(reverse('admin:profiles_profile_changelist'))
+
+        assert response.status_code == 200
+        assert b'user9' in response.content
+
+    def test_search_by_username(self, admin_client, profiles):
+        """Test the search of profiles by username."""
+        response = admin_client.get(reverse('admin:profiles_profile_changelist'),
+                                    {'q': 'user3'})
+
+        assert list(response.context['cl'].result_list) == [profiles[3]]
+
+    def test_form_raw_id_user(self, admin_client, profiles):
+        """Test that the profile form does not list every user."""
+        url = reverse('admin:profiles_profile_change', args=[profiles[0].id])
+
+        content = admin_client.get(url).content.decode()
+
+        assert 'vForeignKeyRawIdAdminField' in content
+        assert 'user9' not in content
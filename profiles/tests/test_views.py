@@ -52,8 +52,8 @@ class TestProfilesViews:
         assert response.status_code == 200
         assert 'profiles_list' in response.context
         assert len(response.context['profiles_list']) == 2
-        assert profile1 in response.context['profiles_list']
-        assert profile2 in response.context['profiles_list']
+        usernames = [row.username for row in response.context['profiles_list']]
+        assert sorted(usernames) == [profile1.user.username, profile2.user.username]
         assert 'user1' in response.content.decode()
         assert 'user2' in response.content.decode()
 
@@ -179,3 +179,19 @@ class TestProfilesViews:
         assert response.status_code == 200
         assert response.context['profile'] == profile
         assert 'emptycityuser' in response.content.decode()
+
+    @pytest.mark.django_db
+    def test_unknown_username_answered_without_query(self, client, django_assert_num_queries):
+        """Test that the membership index answers 404 for unknown usernames."""
+        user = User.objects.create_user(username='knownuser')
+        Profile.objects.create(user=user, favorite_city='Paris')
+        # Build the index before counting the queries
+        client.get(reverse('profiles:profile', kwargs={'username': 'warmup'}))
+
+        with django_assert_num_queries(0):
+            response = client.get(reverse('profiles:profile',
+                                          kwargs={'username': 'wp-admin'}))
+
+        assert response.status_code == 404
+        assert client.get(reverse('profiles:profile',
+                                  kwargs={'username': 'knownuser'})).status_code == 200
@@ -10,14 +10,22 @@ Functions:
     profile: Display detailed information for a specific user profile
 """
 import logging
+from django.conf import settings
+from django.db.models import F
 from django.shortcuts import render, get_object_or_404
 from django.http import Http404
+from oc_lettings_site import counters
+from oc_lettings_site.query_budget import query_budget
+from oc_lettings_site.streaming import stream_list
+from .membership import usernames
 from .models import Profile
 
 # Configure logger for this module
 logger = logging.getLogger(__name__)
 
 
+# Counter and rows, plus a count while the counter is missing
+@query_budget(3)
 def index(request):
     """
     Display a list of all user profiles.
@@ -31,8 +39,10 @@ def index(request):
 
     Returns:
         HttpResponse: Rendered HTML response displaying the profiles list.
-                     Includes context with 'profiles_list' containing all
-                     Profile objects ordered by default model ordering.
+                     Includes context with 'profiles_list' containing a
+                     ``(username,)`` named tuple per profile.
+                     Streamed, head first, when ``STREAMING_RENDER`` is
+                     enabled.
                      Status code 200 (OK) on success.
     """
     try:
@@ -41,8 +51,20 @@ def index(request):
         user_agent = request.META.get('HTTP_USER_AGENT', 'unknown')
         logger.info(f"Profiles index accessed from IP: {client_ip}, User-Agent: {user_agent}")
 
-        profiles_list = Profile.objects.all()
-        profiles_count = profiles_list.count()
+        # The template only shows usernames: a named tuple per row instead
+        # of a Profile and a User instance, password hash included
+        profiles_list = (
+            Profile.objects.annotate(username=F('user__username'))
+            .values_list('username', named=True)
+        )
+        # Head sent at once, rows read and rendered chunk by chunk
+        if settings.STREAMING_RENDER:
+            logger.info("Profiles index page streamed")
+            return stream_list(request, 'profiles/index.html', 'profiles_list', profiles_list,
+                               'profiles/index_rows.html')
+
+        # Read from the maintained counter instead of counting the table
+        profiles_count = counters.value(Profile)
 
         # Log the number of profiles returned
         logger.debug(f"Retrieved {profiles_count} profiles for index page")
@@ -59,6 +81,8 @@ def index(request):
         raise
 
 
+# One query, plus one when the membership index is built in the request
+@query_budget(2)
 def profile(request, username):
     """
     Display detailed information for a specific user profile.
@@ -87,8 +111,13 @@ def profile(request, username):
         client_ip = request.META.get('REMOTE_ADDR', 'unknown')
         logger.info(f"Profile detail accessed: username='{username}', IP={client_ip}")
 
+        # Unknown usernames are answered without querying the database
+        if not usernames.might_contain(username):
+            raise Http404(f"No profile for username='{username}'")
+
         # Attempt to get the profile - this may raise Http404
-        profile = get_object_or_404(Profile, user__username=username)
+        profile = get_object_or_404(Profile.objects.select_related('user'),
+                                    user__username=username)
 
         # Log successful retrieval with profile details
         logger.info(f"Profile found: username='{username}', "
@@ -103,7 +132,7 @@ def profile(request, username):
 
     except Http404:
         # Log 404 errors with relevant information
-        logger.warning(f"Profile not found: username='{username}', IP={client_ip}")
+        logger.warning("Profile not found: username='%s', IP=%s", username, client_ip)
         raise
 
     except Exception as e: